@@ -6,51 +6,128 @@ Generated By: Claude Code (Claude Sonnet 4.5)
 
 __version__ = "0.1.0"
 
-# Import constants from ap-common
-from ap_common.constants import (
-    NORMALIZED_HEADER_TYPE,
-    NORMALIZED_HEADER_CAMERA,
-    NORMALIZED_HEADER_SETTEMP,
-    NORMALIZED_HEADER_GAIN,
-    NORMALIZED_HEADER_OFFSET,
-    NORMALIZED_HEADER_READOUTMODE,
-    NORMALIZED_HEADER_EXPOSURESECONDS,
-    NORMALIZED_HEADER_DATE,
-    NORMALIZED_HEADER_FILTER,
-    TYPE_LIGHT,
-    TYPE_DARK,
-    TYPE_FLAT,
-    TYPE_BIAS,
-)
-
-# Import module-specific config constants
-from .config import (
-    LIGHT_REQUIRED_KEYWORDS,
-    DARK_MATCH_KEYWORDS,
-    FLAT_MATCH_KEYWORDS,
-    SUPPORTED_EXTENSIONS,
-)
-
-from .matching import (
-    get_light_frames,
-    find_all_light_directories,
-    check_calibration_for_light,
-    is_file_inside_tree,
-)
-
-from .move_lights_to_data import (
-    EXIT_SUCCESS,
-    EXIT_ERROR,
-    build_search_dirs,
-    is_group_complete_and_self_contained,
-    filter_by_pattern,
-    check_light_directories,
-    find_calibration_directories,
-    organize_into_movable_groups,
-    process_light_directories,
-    print_summary,
-    main,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Exports resolved on first access (PEP 562), so importing the package or its
+# CLI does not load ap-common and its image readers until they are needed
+_EXPORTS = {
+    # Constants from ap-common
+    "NORMALIZED_HEADER_TYPE": "ap_common.constants",
+    "NORMALIZED_HEADER_CAMERA": "ap_common.constants",
+    "NORMALIZED_HEADER_SETTEMP": "ap_common.constants",
+    "NORMALIZED_HEADER_GAIN": "ap_common.constants",
+    "NORMALIZED_HEADER_OFFSET": "ap_common.constants",
+    "NORMALIZED_HEADER_READOUTMODE": "ap_common.constants",
+    "NORMALIZED_HEADER_EXPOSURESECONDS": "ap_common.constants",
+    "NORMALIZED_HEADER_DATE": "ap_common.constants",
+    "NORMALIZED_HEADER_FILTER": "ap_common.constants",
+    "TYPE_LIGHT": "ap_common.constants",
+    "TYPE_DARK": "ap_common.constants",
+    "TYPE_FLAT": "ap_common.constants",
+    "TYPE_BIAS": "ap_common.constants",
+    # Module-specific config constants
+    "LIGHT_REQUIRED_KEYWORDS": ".config",
+    "DARK_MATCH_KEYWORDS": ".config",
+    "FLAT_MATCH_KEYWORDS": ".config",
+    "SUPPORTED_EXTENSIONS": ".config",
+    # Matching functions
+    "get_light_frames": ".matching",
+    "find_all_light_directories": ".matching",
+    "check_calibration_for_light": ".matching",
+    "is_file_inside_tree": ".matching",
+    # Typed results
+    "CalibrationStatus": ".status",
+    "DirectoryStatus": ".status",
+    "GroupStatus": ".status",
+    "MovableGroup": ".status",
+    "BlockedIndex": ".blocked",
+    # Main functions
+    "EXIT_SUCCESS": ".move_lights_to_data",
+    "EXIT_ERROR": ".move_lights_to_data",
+    "build_search_dirs": ".move_lights_to_data",
+    "is_group_complete_and_self_contained": ".move_lights_to_data",
+    "filter_by_pattern": ".move_lights_to_data",
+    "check_light_directories": ".move_lights_to_data",
+    "check_light_directories_parallel": ".move_lights_to_data",
+    "find_calibration_directories": ".move_lights_to_data",
+    "organize_into_movable_groups": ".move_lights_to_data",
+    "process_light_directories": ".move_lights_to_data",
+    "print_summary": ".move_lights_to_data",
+    "main": ".cli",
+}
+
+if TYPE_CHECKING:
+    # Import constants from ap-common
+    from ap_common.constants import (
+        NORMALIZED_HEADER_TYPE,
+        NORMALIZED_HEADER_CAMERA,
+        NORMALIZED_HEADER_SETTEMP,
+        NORMALIZED_HEADER_GAIN,
+        NORMALIZED_HEADER_OFFSET,
+        NORMALIZED_HEADER_READOUTMODE,
+        NORMALIZED_HEADER_EXPOSURESECONDS,
+        NORMALIZED_HEADER_DATE,
+        NORMALIZED_HEADER_FILTER,
+        TYPE_LIGHT,
+        TYPE_DARK,
+        TYPE_FLAT,
+        TYPE_BIAS,
+    )
+
+    # Import module-specific config constants
+    from .config import (
+        LIGHT_REQUIRED_KEYWORDS,
+        DARK_MATCH_KEYWORDS,
+        FLAT_MATCH_KEYWORDS,
+        SUPPORTED_EXTENSIONS,
+    )
+
+    from .matching import (
+        get_light_frames,
+        find_all_light_directories,
+        check_calibration_for_light,
+        is_file_inside_tree,
+    )
+
+    from .status import (
+        CalibrationStatus,
+        DirectoryStatus,
+        GroupStatus,
+        MovableGroup,
+    )
+
+    from .blocked import BlockedIndex
+
+    from .move_lights_to_data import (
+        EXIT_SUCCESS,
+        EXIT_ERROR,
+        build_search_dirs,
+        is_group_complete_and_self_contained,
+        filter_by_pattern,
+        check_light_directories,
+        check_light_directories_parallel,
+        find_calibration_directories,
+        organize_into_movable_groups,
+        process_light_directories,
+        print_summary,
+    )
+    from .cli import main
+
+
+def __getattr__(name: str) -> Any:
+    """Import an export's module on first access and cache the value."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "__version__",
@@ -77,6 +154,12 @@ __all__ = [
     "find_all_light_directories",
     "check_calibration_for_light",
     "is_file_inside_tree",
+    # Typed results
+    "CalibrationStatus",
+    "DirectoryStatus",
+    "GroupStatus",
+    "MovableGroup",
+    "BlockedIndex",
     # Exit codes
     "EXIT_SUCCESS",
     "EXIT_ERROR",
@@ -85,6 +168,7 @@ __all__ = [
     "is_group_complete_and_self_contained",
     "filter_by_pattern",
     "check_light_directories",
+    "check_light_directories_parallel",
     "find_calibration_directories",
     "organize_into_movable_groups",
     "process_light_directories",
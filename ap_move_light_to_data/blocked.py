@@ -0,0 +1,262 @@
+"""
+Reverse index from missing calibration to the light directories it blocks.
+
+A light directory is incomplete when no frame of some calibration type matches
+its lights in any of its search directories. BlockedIndex records each such
+requirement as (frame type, signature, search directory), where the signature
+is the light's values for that type's match keywords. A new calibration frame
+can only unblock directories waiting on its own type and signature in its own
+directory, so new frames need one lookup each instead of a re-check of every
+incomplete directory.
+
+The index is a filter: signatures compare header values exactly, and the
+directories it returns are re-checked with the full matching rules.
+
+Between runs the blocked directories are saved with write_index: what each
+was missing, its search directories, a fingerprint of its lights and a digest
+of every calibration frame then in those search directories. The next run
+compares the saved state with its metadata (see reuse_blocked_statuses in
+move_lights_to_data) and re-checks only directories whose lights changed or
+that new, changed or removed calibration may affect.
+"""
+
+import hashlib
+import json
+import os
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+INDEX_VERSION = 1
+
+# (frame type, signature, search directory)
+RequirementKey = Tuple[str, Tuple[Any, ...], str]
+
+# Missing-calibration name to the (frame type, match keywords) of each kind
+# of frame that may satisfy it
+Requirements = Mapping[str, Sequence[Tuple[str, Sequence[str]]]]
+
+
+def signature(metadata: Mapping[str, Any], keywords: Sequence[str]) -> Tuple:
+    """
+    Values of the match keywords, in keyword order.
+
+    Args:
+        metadata: Normalized frame metadata
+        keywords: Match keywords for one calibration type
+
+    Returns:
+        Tuple of values (None where a keyword is missing)
+    """
+    return tuple(metadata.get(keyword) for keyword in keywords)
+
+
+def digest(metadata: Mapping[str, Any], keywords: Sequence[str]) -> str:
+    """
+    Short hash of a frame's values for keywords, to notice rewritten headers.
+
+    Args:
+        metadata: Normalized frame metadata
+        keywords: Keywords to include
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256(repr(signature(metadata, keywords)).encode()).hexdigest()[:16]
+
+
+class BlockedIndex:
+    """
+    Index of light directories waiting on missing calibration.
+
+    Args:
+        requirements: Missing-calibration name (e.g. "darks") to the frame
+            types and match keywords that may satisfy it (see
+            config.CALIBRATION_REQUIREMENTS)
+        type_key: Metadata keyword holding a frame's type
+    """
+
+    __slots__ = ("requirements", "type_key", "_keywords_by_type", "_waiting", "_keys")
+
+    def __init__(self, requirements: Requirements, type_key: str):
+        self.requirements = requirements
+        self.type_key = type_key
+        self._keywords_by_type: Dict[str, List[Sequence[str]]] = {}
+        for alternatives in requirements.values():
+            for frame_type, keywords in alternatives:
+                known = self._keywords_by_type.setdefault(frame_type, [])
+                if keywords not in known:
+                    known.append(keywords)
+        self._waiting: Dict[RequirementKey, Set[str]] = {}
+        self._keys: Dict[str, List[RequirementKey]] = {}
+
+    def record(
+        self,
+        light_dir: str,
+        light_metadata: Mapping[str, Any],
+        search_dirs: Sequence[str],
+        missing: Iterable[str],
+    ) -> None:
+        """
+        Record what a light directory is missing, replacing earlier entries.
+
+        Args:
+            light_dir: Light directory
+            light_metadata: Metadata of the light used for the check
+            search_dirs: Directories searched for its calibration
+            missing: Missing calibration names (e.g. ("darks", "flats"))
+        """
+        self.discard(light_dir)
+        keys = []
+        for name in missing:
+            for frame_type, keywords in self.requirements[name]:
+                light_signature = signature(light_metadata, keywords)
+                for search_dir in search_dirs:
+                    key = (frame_type, light_signature, os.path.normpath(search_dir))
+                    self._waiting.setdefault(key, set()).add(light_dir)
+                    keys.append(key)
+        if keys:
+            self._keys[light_dir] = keys
+
+    def discard(self, light_dir: str) -> None:
+        """Forget a light directory (e.g. once it is complete or moved)."""
+        for key in self._keys.pop(light_dir, ()):
+            waiting = self._waiting.get(key)
+            if waiting is None:
+                continue
+            waiting.discard(light_dir)
+            if not waiting:
+                del self._waiting[key]
+
+    def blocked_by(self, path: str, metadata: Mapping[str, Any]) -> Set[str]:
+        """
+        Light directories a new calibration frame might unblock.
+
+        Args:
+            path: Path of the new frame
+            metadata: Its normalized metadata
+
+        Returns:
+            Light directories waiting on this frame's type and signature in
+            the frame's directory
+        """
+        frame_type: str = metadata.get(self.type_key, "")
+        directory = os.path.dirname(os.path.normpath(path))
+        light_dirs: Set[str] = set()
+        for keywords in self._keywords_by_type.get(frame_type, ()):
+            key = (frame_type, signature(metadata, keywords), directory)
+            light_dirs |= self._waiting.get(key, set())
+        return light_dirs
+
+    def affected(self, files: Iterable[Tuple[str, Mapping[str, Any]]]) -> Set[str]:
+        """
+        Light directories any of the new frames might unblock.
+
+        Args:
+            files: (path, metadata) pairs for newly ingested frames
+
+        Returns:
+            Union of blocked_by over all frames
+        """
+        light_dirs: Set[str] = set()
+        for path, metadata in files:
+            light_dirs |= self.blocked_by(path, metadata)
+        return light_dirs
+
+    def __len__(self) -> int:
+        """Number of blocked light directories."""
+        return len(self._keys)
+
+    def __contains__(self, light_dir: object) -> bool:
+        return light_dir in self._keys
+
+
+def write_index(state: Dict[str, Any], path: str, scale_darks: bool) -> None:
+    """
+    Write saved blocked directories as JSON, replacing any file atomically.
+
+    Args:
+        state: Dict with "directories" (light dir -> {"missing", "search_dirs",
+            "lights"}) and "calibration" (search dir -> {file name: digest})
+        path: Output file path
+        scale_darks: Whether the checks allowed shorter darks with bias
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": INDEX_VERSION,
+                "scale_darks": scale_darks,
+                "directories": state["directories"],
+                "calibration": state["calibration"],
+            },
+            f,
+            indent=1,
+            sort_keys=True,
+        )
+        f.write("\n")
+    os.replace(temp_path, path)
+
+
+def load_index(path: str, scale_darks: bool) -> Dict[str, Any]:
+    """
+    Read blocked directories saved by write_index.
+
+    Args:
+        path: Index file path
+        scale_darks: Whether this run allows shorter darks with bias; an index
+            saved with the other setting does not apply
+
+    Returns:
+        Dict with "directories" and "calibration" (see write_index)
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not an index for this version and
+            scale_darks setting, or an entry is malformed
+    """
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    if not isinstance(saved, dict) or saved.get("version") != INDEX_VERSION:
+        raise ValueError(f"Unsupported blocked-directory index: {path}")
+    if saved.get("scale_darks") is not scale_darks:
+        raise ValueError(
+            f"Blocked-directory index {path} was saved with a different "
+            "--scale-dark setting"
+        )
+    directories = saved.get("directories")
+    calibration = saved.get("calibration")
+    if not isinstance(directories, dict) or not isinstance(calibration, dict):
+        raise ValueError(f"Blocked-directory index {path} is corrupt")
+    for light_dir, entry in directories.items():
+        if not (
+            isinstance(entry, dict)
+            and isinstance(entry.get("lights"), str)
+            and _is_str_list(entry.get("missing"))
+            and _is_str_list(entry.get("search_dirs"))
+        ):
+            raise ValueError(
+                f"Blocked-directory index {path} is corrupt: bad entry for "
+                f"{light_dir}"
+            )
+    for search_dir, frames in calibration.items():
+        if not (
+            isinstance(frames, dict)
+            and all(isinstance(value, str) for value in frames.values())
+        ):
+            raise ValueError(
+                f"Blocked-directory index {path} is corrupt: bad calibration "
+                f"for {search_dir}"
+            )
+    return {"directories": directories, "calibration": calibration}
+
+
+def _is_str_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
@@ -0,0 +1,270 @@
+"""
+Pre-flight capacity planning for a move.
+
+Totals the bytes each movable group will copy and compares the space the move
+needs against what is free on the destination device, before any bytes move.
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from . import config
+
+logger = logging.getLogger("ap_move_light_to_data.capacity")
+
+
+def existing_ancestor(path: Path) -> Path:
+    """
+    Find the path itself or its nearest existing parent.
+
+    Args:
+        path: Path that may not exist yet (e.g. a new destination)
+
+    Returns:
+        Closest existing path on the way to the filesystem root
+    """
+    current = path
+    while not current.exists() and current.parent != current:
+        current = current.parent
+    return current
+
+
+def plan_capacity(
+    files: Iterable[Dict[str, Any]],
+    movable_groups: List[Dict],
+    source_dir: Path,
+    dest_dir: Path,
+    mirror_dirs: Sequence[Path] = (),
+) -> Dict[str, Any]:
+    """
+    Determine how much space a move needs and whether the destinations have it.
+
+    Groups are committed one at a time and each group's source is deleted while
+    the next group copies, with at most one deletion pending (see move_groups).
+    On the same device that means at most two consecutive groups exist twice
+    at any moment; across devices every byte is new on the destination.
+    Mirrors are permanent extra copies, so they need the full total even on
+    the source's device. Destinations sharing a device need their combined
+    space. A failed group's copied files are not freed; move_groups checks
+    room_for before each group for that.
+
+    A file whose dict carries "to_copy" only needs those bytes at each
+    destination (files already copied by an earlier run need none); without
+    it, every destination needs the file's size.
+
+    Files are consumed in a single pass and not retained, so a streaming
+    iterator keeps memory bounded however many files the plan holds.
+
+    Args:
+        files: File dicts with "group", "size", "device" and optionally
+            "to_copy" (bytes still needed per destination, in dest_dir,
+            *mirror_dirs order; see iter_files_to_copy)
+        movable_groups: Group plans in the order they will be processed
+        source_dir: Source root directory
+        dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
+
+    Returns:
+        Dict with:
+            - group_bytes: Dict[str, int] (bytes per group relative path)
+            - file_count: int (files in the groups)
+            - total_bytes: int (bytes in the groups, including files already
+              at the destination)
+            - required_bytes: int (peak additional space needed on dest_dir)
+            - free_bytes: int (free space on the dest_dir device)
+            - same_device: bool (source and dest_dir share a device)
+            - destinations: List[Dict] (dest, copy_bytes, required_bytes,
+              free_bytes, same_device and fits for dest_dir and each mirror)
+            - fits: bool (every destination has its required space plus
+              reserve available)
+    """
+    roots = [dest_dir, *mirror_dirs]
+    group_bytes = {str(g["relative_path"]): 0 for g in movable_groups}
+    # Bytes still to copy per destination, per group
+    copy_bytes: List[Dict[str, int]] = [dict(group_bytes) for _ in roots]
+    devices: Set[int] = set()
+    file_count = 0
+    for file_info in files:
+        group = str(file_info["group"])
+        group_bytes[group] += file_info["size"]
+        to_copy = file_info.get("to_copy")
+        for index, per_group in enumerate(copy_bytes):
+            per_group[group] += file_info["size"] if to_copy is None else to_copy[index]
+        if file_info["device"] is not None:
+            devices.add(file_info["device"])
+        file_count += 1
+    total_bytes = sum(group_bytes.values())
+    if not devices:
+        devices.add(os.stat(source_dir).st_dev)
+
+    destinations: List[Dict[str, Any]] = []
+    required_by_device: Dict[int, int] = {}
+    for index, directory in enumerate(roots):
+        anchor = existing_ancestor(directory)
+        device = os.stat(anchor).st_dev
+        same_device = devices == {device}
+        sizes = [copy_bytes[index][str(g["relative_path"])] for g in movable_groups]
+        if same_device and index == 0:
+            # At most two consecutive groups exist twice at once
+            required = max(
+                (a + b for a, b in zip(sizes, sizes[1:])), default=sum(sizes)
+            )
+        else:
+            required = sum(sizes)
+        required_by_device[device] = required_by_device.get(device, 0) + required
+        destinations.append(
+            {
+                "dest": directory,
+                "device": device,
+                "copy_bytes": sum(sizes),
+                "free_bytes": shutil.disk_usage(anchor).free,
+                "same_device": same_device,
+            }
+        )
+
+    for destination in destinations:
+        required_bytes = required_by_device[destination["device"]]
+        destination["required_bytes"] = required_bytes
+        destination["fits"] = has_room(required_bytes, destination["free_bytes"])
+        logger.debug(
+            f"Capacity plan for {destination['dest']}: "
+            f"{format_bytes(total_bytes)} to copy, "
+            f"{format_bytes(required_bytes)} required, "
+            f"{format_bytes(destination['free_bytes'])} free "
+            f"({'same' if destination['same_device'] else 'different'} device)"
+        )
+
+    primary = destinations[0]
+    return {
+        "group_bytes": group_bytes,
+        "file_count": file_count,
+        "total_bytes": total_bytes,
+        "required_bytes": primary["required_bytes"],
+        "free_bytes": primary["free_bytes"],
+        "same_device": primary["same_device"],
+        "destinations": destinations,
+        "fits": all(destination["fits"] for destination in destinations),
+    }
+
+
+def combine_plans(plans: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Check several capacity plans that will run in the same invocation.
+
+    Each plan only accounts for its own groups; plans whose destinations share
+    a device need their combined space on that device.
+
+    Args:
+        plans: Results of plan_capacity, one per source
+
+    Returns:
+        Dict with:
+            - file_count: int (files to copy across all plans)
+            - total_bytes: int (bytes to copy across all plans)
+            - destinations: List[Dict] (every plan's destinations, with
+              required_bytes and fits recomputed over all plans)
+            - fits: bool (every destination device has room for all plans)
+    """
+    required_by_device: Dict[int, int] = {}
+    for plan in plans:
+        # A plan's required_bytes is already summed over its own destinations
+        # on the same device, so count each device once per plan
+        plan_devices = {d["device"]: d["required_bytes"] for d in plan["destinations"]}
+        for device, required_bytes in plan_devices.items():
+            required_by_device[device] = (
+                required_by_device.get(device, 0) + required_bytes
+            )
+
+    destinations = []
+    for plan in plans:
+        for destination in plan["destinations"]:
+            required_bytes = required_by_device[destination["device"]]
+            destinations.append(
+                {
+                    **destination,
+                    "required_bytes": required_bytes,
+                    "fits": has_room(required_bytes, destination["free_bytes"]),
+                }
+            )
+
+    return {
+        "file_count": sum(plan["file_count"] for plan in plans),
+        "total_bytes": sum(plan["total_bytes"] for plan in plans),
+        "destinations": destinations,
+        "fits": all(destination["fits"] for destination in destinations),
+    }
+
+
+def room_for(
+    directories: Sequence[Path], required_bytes: Sequence[int]
+) -> Optional[Dict[str, Any]]:
+    """
+    Check free space right before copying, when earlier copies may have used it.
+
+    Args:
+        directories: Destination root directories
+        required_bytes: Bytes about to be copied to each of them, in order
+
+    Returns:
+        None if every destination has room, otherwise a dict with the "dest"
+        lacking it, its "required_bytes" and its "free_bytes"
+    """
+    for directory, required in zip(directories, required_bytes):
+        free_bytes = shutil.disk_usage(existing_ancestor(Path(directory))).free
+        if not has_room(required, free_bytes):
+            return {
+                "dest": directory,
+                "required_bytes": required,
+                "free_bytes": free_bytes,
+            }
+    return None
+
+
+def has_room(required_bytes: int, free_bytes: int) -> bool:
+    """True when free space covers the required bytes plus the reserve."""
+    return (
+        required_bytes == 0
+        or required_bytes + config.FREE_SPACE_RESERVE_BYTES <= free_bytes
+    )
+
+
+def estimate_duration(total_bytes: int, bytes_per_sec: float) -> float:
+    """
+    Estimate how long copying a number of bytes takes.
+
+    Args:
+        total_bytes: Bytes to copy
+        bytes_per_sec: Expected sustained throughput
+
+    Returns:
+        Estimated duration in seconds
+    """
+    if bytes_per_sec <= 0:
+        return 0.0
+    return total_bytes / bytes_per_sec
+
+
+def format_bytes(count: float) -> str:
+    """Format a byte count with a decimal unit (e.g. "1.5 GB")."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(count) < 1000 or unit == "TB":
+            break
+        count /= 1000
+    if unit == "B":
+        return f"{int(count)} B"
+    return f"{count:.1f} {unit}"
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as hours/minutes/seconds (e.g. "1h 02m")."""
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
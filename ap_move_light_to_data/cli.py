@@ -0,0 +1,266 @@
+"""
+Command-line entry point.
+
+The parser is built without importing ap-common, and the processing modules
+are imported only once the arguments are valid, so --help and usage errors
+return quickly. Scripts that invoke the tool many times a day pay the import
+cost of ap-common and its image readers only for real runs.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from . import defaults
+
+logger = logging.getLogger("ap_move_light_to_data.cli")
+
+
+def positive_int(value: str) -> int:
+    """Argparse type for integers greater than zero."""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero: {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser (imports nothing from ap-common)."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Move complete directory groups containing "
+            "light frames and calibration atomically."
+        )
+    )
+
+    parser.add_argument("source_dir", help="source directory containing lights")
+    parser.add_argument(
+        "dest_dir",
+        nargs="+",
+        help="destination directory for lights; additional directories (e.g. a "
+        "backup disk) receive the same files from a single source read",
+    )
+    parser.add_argument(
+        "--debug", "-d", action="store_true", help="Enable debug output"
+    )
+    parser.add_argument(
+        "--dryrun", "-n", action="store_true", help="Preview without moving"
+    )
+    parser.add_argument(
+        "--quiet", "-q", action="store_true", help="Suppress progress output"
+    )
+    parser.add_argument(
+        "--scale-dark",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="scale dark frames using bias compensation (allows shorter exposures). "
+        "Default: exact exposure match only",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="hash files while copying and verify the destination before "
+        "deleting any source files",
+    )
+    parser.add_argument(
+        "--max-bytes-per-sec",
+        type=positive_int,
+        default=None,
+        help="limit copy bandwidth across all workers (bytes per second)",
+    )
+    parser.add_argument(
+        "--max-iops",
+        type=positive_int,
+        default=None,
+        help="limit copy read/write operations per second across all workers",
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=defaults.DEFAULT_WORKERS,
+        help="worker threads for parallel file operations "
+        f"(default: {defaults.DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--check-workers",
+        type=positive_int,
+        default=1,
+        help="processes for the calibration check, sharded by target (default: 1)",
+    )
+    parser.add_argument(
+        "--io-priority",
+        choices=sorted(defaults.IO_PRIORITY_CLASSES),
+        default=None,
+        help="lower this process's I/O priority (Linux only)",
+    )
+    parser.add_argument(
+        "--plan-out",
+        metavar="FILE",
+        default=None,
+        help="write the analyzed move plan (groups, files, fingerprints) to FILE",
+    )
+    parser.add_argument(
+        "--apply-plan",
+        metavar="FILE",
+        default=None,
+        help="move the groups in a plan written by --plan-out without "
+        "re-analyzing; groups whose files changed are skipped",
+    )
+    parser.add_argument(
+        "--blocked-index",
+        metavar="FILE",
+        default=None,
+        help="save light directories missing calibration to FILE; later runs "
+        "re-check them only when their lights or nearby calibration change",
+    )
+    parser.add_argument(
+        "--pair",
+        nargs=2,
+        action="append",
+        metavar=("SOURCE", "DEST"),
+        default=None,
+        help="also move complete groups from SOURCE to DEST (may be repeated); "
+        "metadata for all sources is loaded in one pass and sources on "
+        "separate devices move concurrently",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print the time spent in each phase after the summary",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        default=None,
+        help="write run metrics to FILE in Prometheus text format (e.g. for "
+        "node-exporter's textfile collector), replacing it atomically",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        default=None,
+        help="profile the run with cProfile, write the stats to FILE and print "
+        "the top hotspots after the summary",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=None,
+        help="write a Chrome trace-event timeline of the run (phases, checks, "
+        "file copies and deletes per thread) to FILE",
+    )
+    parser.add_argument(
+        "--path-pattern",
+        type=str,
+        default=defaults.DEFAULT_PATH_PATTERN,
+        help=(
+            "Regex pattern to filter paths "
+            f'(default: "{defaults.DEFAULT_PATH_PATTERN}")'
+        ),
+    )
+    return parser
+
+
+def main() -> int:
+    """Main entry point for CLI."""
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.pair and (args.plan_out or args.apply_plan):
+        parser.error("--pair cannot be combined with --plan-out or --apply-plan")
+
+    # Deferred until the arguments are valid: these load ap-common and its
+    # FITS/XISF readers, which --help and usage errors never need
+    import ap_common
+    from ap_common import setup_logging
+    from ap_common.progress import ProgressTracker
+
+    from . import metrics, profiling, transfer
+    from . import move_lights_to_data as app
+    from .tracing import Tracer
+
+    # Set default description width for aligned progress bars
+    ProgressTracker.set_default_desc_width(20)
+
+    # Setup logging
+    setup_logging(name="ap_move_light_to_data", debug=args.debug, quiet=args.quiet)
+
+    extra_pairs = [(source, dest) for source, dest in args.pair or []]
+
+    # Validate directories
+    for source_dir in [args.source_dir, *(source for source, _ in extra_pairs)]:
+        source_path = Path(ap_common.replace_env_vars(source_dir))
+        if not source_path.exists():
+            print(f"ERROR: Source directory does not exist: {source_path}")
+            return app.EXIT_ERROR
+        if not source_path.is_dir():
+            print(f"ERROR: Source path is not a directory: {source_path}")
+            return app.EXIT_ERROR
+
+    for dest_dir in [*args.dest_dir, *(dest for _, dest in extra_pairs)]:
+        dest_path = Path(ap_common.replace_env_vars(dest_dir))
+        if dest_path.exists() and not dest_path.is_dir():
+            print(f"ERROR: Destination exists but is not a directory: {dest_path}")
+            return app.EXIT_ERROR
+
+    print(f"Source directory: {args.source_dir}")
+    for dest_dir in args.dest_dir:
+        print(f"Destination directory: {dest_dir}")
+    for source_dir, dest_dir in extra_pairs:
+        print(f"Source directory: {source_dir} -> {dest_dir}")
+
+    if args.dryrun:
+        print("\n*** DRY RUN - No files will be moved ***\n")
+
+    if args.io_priority:
+        transfer.set_io_priority(args.io_priority)
+
+    tracer = Tracer() if args.trace else None
+    with profiling.profiled(args.profile) as profiler:
+        results = app.process_light_directories(
+            args.source_dir,
+            args.dest_dir[0],
+            args.path_pattern,
+            args.debug,
+            args.dryrun,
+            args.quiet,
+            args.scale_dark,
+            verify=args.verify,
+            max_bytes_per_sec=args.max_bytes_per_sec,
+            max_iops=args.max_iops,
+            workers=args.workers,
+            mirror_dirs=args.dest_dir[1:],
+            plan_out=args.plan_out,
+            apply_plan=args.apply_plan,
+            extra_pairs=extra_pairs,
+            tracer=tracer,
+            check_workers=args.check_workers,
+            blocked_index=args.blocked_index,
+        )
+
+    if tracer is not None:
+        try:
+            tracer.write(args.trace)
+        except OSError as e:
+            logger.error(f"Failed to write trace file {args.trace}: {e}")
+            results["errors"] += 1
+    if args.metrics_file:
+        try:
+            metrics.write_metrics_file(args.metrics_file, results, dry_run=args.dryrun)
+        except OSError as e:
+            logger.error(f"Failed to write metrics file {args.metrics_file}: {e}")
+            results["errors"] += 1
+
+    if not args.quiet:
+        app.print_summary(
+            results, scale_darks=args.scale_dark, show_timings=args.timings
+        )
+        if profiler is not None:
+            profiling.print_hotspots(profiler, args.profile)
+
+    return app.EXIT_ERROR if results["errors"] > 0 else app.EXIT_SUCCESS
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -15,8 +15,14 @@ from ap_common.constants import (
     NORMALIZED_HEADER_EXPOSURESECONDS,
     NORMALIZED_HEADER_FILTER,
     DEFAULT_IMAGE_PATTERNS,
+    TYPE_DARK,
+    TYPE_FLAT,
+    TYPE_BIAS,
 )
 
+# Defaults the CLI parser needs without importing ap-common
+from .defaults import DEFAULT_PATH_PATTERN, DEFAULT_WORKERS  # noqa: F401
+
 # Skip reason codes for structured error handling
 SKIP_REASON_NONE = ""
 SKIP_REASON_NO_LIGHTS = "no_lights"
@@ -62,10 +68,49 @@ ALL_REQUIRED_KEYWORDS = list(
     set(LIGHT_REQUIRED_KEYWORDS + DARK_MATCH_KEYWORDS + FLAT_MATCH_KEYWORDS)
 )
 
-# Default path pattern to match accept directories
-# Matches paths containing an "accept" directory component
-DEFAULT_PATH_PATTERN = r".*[/\\]accept[/\\].*"
+# Frame types and match keywords that may satisfy each missing calibration
+# name reported by check_calibration_for_light. Bias matches like darks; with
+# --scale-dark a dark of the light's exact exposure also removes the need
+CALIBRATION_REQUIREMENTS = {
+    "darks": ((TYPE_DARK, DARK_MATCH_KEYWORDS),),
+    "flats": ((TYPE_FLAT, FLAT_MATCH_KEYWORDS),),
+    "bias": (
+        (TYPE_BIAS, DARK_MATCH_KEYWORDS),
+        (TYPE_DARK, DARK_MATCH_KEYWORDS + [NORMALIZED_HEADER_EXPOSURESECONDS]),
+    ),
+}
 
 # Supported file extensions (regex patterns for file matching)
 # Use ap-common's DEFAULT_IMAGE_PATTERNS for all supported image types
 SUPPORTED_EXTENSIONS = DEFAULT_IMAGE_PATTERNS
+
+# Hash algorithm used for --verify (any hashlib algorithm name)
+# BLAKE2b is in the standard library and fast on 64-bit hosts
+VERIFY_HASH_ALGORITHM = "blake2b"
+
+# Chunk size for streaming copies and hashing (bytes)
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Maximum modification time difference (seconds) for a destination file to be
+# treated as identical to its source. Covers coarse timestamps on FAT and SMB.
+IDENTICAL_MTIME_WINDOW_SECONDS = 2.0
+
+# Free space (bytes) to leave on the destination when planning capacity
+FREE_SPACE_RESERVE_BYTES = 512 * 1024 * 1024
+
+# Assumed sustained copy throughput (bytes/second) for dry-run estimates
+ESTIMATED_COPY_BYTES_PER_SEC = 100 * 1000 * 1000
+
+# Sliding window for the copy throughput moving average (seconds)
+PROGRESS_RATE_WINDOW_SECONDS = 10.0
+
+# Minimum interval between copy progress redraws (seconds)
+PROGRESS_REFRESH_SECONDS = 0.5
+
+# Hidden directory, next to the final location on the destination, that a
+# group is copied into before being renamed into place ({name}: group dir name)
+STAGING_DIR_TEMPLATE = ".{name}.ap-staging"
+
+# Hidden directory, under the source and each destination root, holding the
+# per-target lock files that keep concurrent instances apart
+LOCK_DIR_NAME = ".ap_move_light_to_data.locks"
@@ -0,0 +1,20 @@
+"""
+Defaults the command-line parser needs.
+
+Kept free of ap-common imports so building the parser (for --help or a usage
+error) does not load ap-common and its image readers. config and transfer
+re-export these.
+"""
+
+# Default path pattern to match accept directories
+# Matches paths containing an "accept" directory component
+DEFAULT_PATH_PATTERN = r".*[/\\]accept[/\\].*"
+
+# Default number of worker threads for parallel file operations
+DEFAULT_WORKERS = 8
+
+# ioprio classes that may be requested (only ones that lower priority)
+IO_PRIORITY_CLASSES = {
+    "best-effort": (2, 7),  # IOPRIO_CLASS_BE at its lowest level
+    "idle": (3, 0),  # IOPRIO_CLASS_IDLE: only when the disk is otherwise idle
+}
@@ -0,0 +1,183 @@
+"""
+Advisory per-target locks for running several instances at once.
+
+Before a group is copied, the instance locks the group's target (its
+first-level directory) under the source root and under every destination root,
+in <root>/.ap_move_light_to_data.locks/<target>.lock. Instances moving the same
+source exclude each other through the source lock; instances moving different
+sources into one destination (or one backup) through the destination lock. A
+target locked by another instance is skipped for this run; the lock file names
+the host and process holding it.
+
+Locks are POSIX record locks (fcntl.lockf), which NFS and SMB forward to the
+server, so instances on different machines sharing a NAS exclude each other.
+POSIX locks belong to the process, so one TargetLocks is shared by every move
+of a run and each lock file is opened once. Lock files are left in place:
+removing one while another instance waits on it would let two instances hold
+"the same" lock. A root where no lock file can be created (read-only or full)
+is logged and not locked, as on platforms without fcntl.
+"""
+
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+from . import config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger("ap_move_light_to_data.locking")
+
+# Lock name for a group that is the source root itself (no target component)
+ROOT_TARGET = "__root__"
+
+
+def group_target(relative_path: Union[str, Path]) -> str:
+    """
+    Target a group belongs to: the first component of its relative path.
+
+    Args:
+        relative_path: Group path relative to the source root
+
+    Returns:
+        Target directory name (ROOT_TARGET for the source root itself)
+    """
+    parts = Path(relative_path).parts
+    return parts[0] if parts else ROOT_TARGET
+
+
+def lock_path(root: Union[str, Path], target: str) -> Path:
+    """Lock file for a target under a source or destination root."""
+    return Path(root) / config.LOCK_DIR_NAME / f"{target}.lock"
+
+
+class TargetLocks:
+    """
+    Per-target locks held by this process until release_all.
+
+    Thread-safe; concurrent moves of one run share an instance.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Lock file path -> open descriptor holding its lock
+        self._held: Dict[str, int] = {}
+        # Target -> lock file another process held when acquire was refused
+        self._refused: Dict[str, Path] = {}
+        # Roots where lock files could not be created (warned once each)
+        self._unlockable: Set[str] = set()
+        self._warned = False
+
+    def acquire(self, roots: Sequence[Union[str, Path]], target: str) -> bool:
+        """
+        Lock a target under every root, without waiting.
+
+        Either all locks are taken or, when another instance holds any of
+        them, none are kept.
+
+        Args:
+            roots: Source and destination roots the target is moved between
+            target: Target name (see group_target)
+
+        Returns:
+            True if this process holds the target, False if another instance
+            holds it under any root
+        """
+        if fcntl is None:
+            if not self._warned:
+                logger.warning(
+                    "File locking is not available on this platform; "
+                    "concurrent instances are not prevented"
+                )
+                self._warned = True
+            return True
+        with self._lock:
+            taken: List[str] = []
+            for root in roots:
+                lock_file = lock_path(root, target)
+                path = str(lock_file)
+                if path in self._held:
+                    continue
+                fd = self._open(root, lock_file)
+                if fd is None:
+                    continue
+                try:
+                    fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    # EAGAIN/EACCES: held by another process
+                    os.close(fd)
+                    for held in taken:
+                        self._close(held)
+                    self._refused[target] = lock_file
+                    return False
+                os.ftruncate(fd, 0)
+                os.write(fd, f"{socket.gethostname()} {os.getpid()}\n".encode())
+                self._held[path] = fd
+                taken.append(path)
+            return True
+
+    def _open(self, root: Union[str, Path], lock_file: Path) -> Optional[int]:
+        """Open (creating) a lock file; None if the root cannot hold one."""
+        try:
+            lock_file.parent.mkdir(parents=True, exist_ok=True)
+            return os.open(str(lock_file), os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError as e:
+            if str(root) not in self._unlockable:
+                self._unlockable.add(str(root))
+                logger.warning(
+                    f"Cannot create lock files under {root}: {e}; concurrent "
+                    "instances are not prevented there"
+                )
+            return None
+
+    def holder(self, target: str) -> str:
+        """
+        Describe who holds a target that acquire refused.
+
+        Args:
+            target: Target name
+
+        Returns:
+            "host pid" recorded in the refused lock file, or "another
+            instance" if it cannot be read
+        """
+        path = self._refused.get(target)
+        if path is not None:
+            try:
+                text = path.read_text(encoding="utf-8").strip()
+            except OSError:
+                text = ""
+            if text:
+                return text
+        return "another instance"
+
+    def _close(self, path: str) -> None:
+        """Unlock and close one held lock file (lock held)."""
+        fd = self._held.pop(path)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def release_all(self) -> None:
+        """Release every lock this process holds."""
+        with self._lock:
+            for path in list(self._held):
+                self._close(path)
+
+    def __len__(self) -> int:
+        """Number of lock files held."""
+        return len(self._held)
+
+    def __enter__(self) -> "TargetLocks":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release_all()
@@ -6,7 +6,7 @@ Generated By: Claude Code (Claude Sonnet 4.5)
 
 import logging
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping, Tuple
 from ap_common.constants import TYPE_LIGHT, NORMALIZED_HEADER_FILENAME
 from ap_common.calibration import (
     find_matching_darks_from_cache,
@@ -15,13 +15,14 @@ from ap_common.calibration import (
 )
 
 from . import config
+from .status import CalibrationStatus
 
 logger = logging.getLogger("ap_move_light_to_data.matching")
 
 
 def get_light_frames(
     directory: str,
-    metadata_cache: Dict[str, Dict[str, Any]],
+    metadata_cache: Mapping[str, Dict[str, Any]],
     debug: bool = False,
 ) -> Dict[str, Dict[str, Any]]:
     """
@@ -52,7 +53,7 @@ def get_light_frames(
 
 def find_all_light_directories(
     root_dir: str,
-    metadata_cache: Dict[str, Dict[str, Any]],
+    metadata_cache: Mapping[str, Dict[str, Any]],
     debug: bool = False,
 ) -> List[str]:
     """
@@ -87,11 +88,11 @@ def find_all_light_directories(
 def check_calibration_for_light(
     light_metadata: Dict[str, Any],
     search_dirs: List[str],
-    metadata_cache: Dict[str, Dict[str, Any]],
+    metadata_cache: Mapping[str, Dict[str, Any]],
     scale_darks: bool,
     debug: bool,
     quiet: bool,
-) -> Dict[str, Any]:
+) -> CalibrationStatus:
     """
     Check if a light frame has required calibration in search directories.
 
@@ -104,28 +105,14 @@ def check_calibration_for_light(
         quiet: Suppress progress output
 
     Returns:
-        Dict with:
-            - has_darks: bool
-            - has_flats: bool
-            - has_bias: bool (only checked if needs_bias)
-            - needs_bias: bool
-            - is_complete: bool
-            - matched_darks: List[str] (file paths)
-            - matched_flats: List[str] (file paths)
-            - matched_bias: List[str] (file paths)
-            - missing: List[str] (names of missing types)
+        CalibrationStatus with has_darks, has_flats, has_bias (only checked if
+        needs_bias), needs_bias, is_complete, matched_darks, matched_flats,
+        matched_bias (file paths) and missing (names of missing types)
     """
-    result: Dict[str, Any] = {
-        "has_darks": False,
-        "has_flats": False,
-        "has_bias": False,
-        "needs_bias": False,
-        "is_complete": False,
-        "matched_darks": [],
-        "matched_flats": [],
-        "matched_bias": [],
-        "missing": [],
-    }
+    matched_darks: Tuple[str, ...] = ()
+    matched_flats: Tuple[str, ...] = ()
+    matched_bias: Tuple[str, ...] = ()
+    needs_bias = False
 
     # Filter cache to search_dirs
     calibration_metadata = {}
@@ -163,8 +150,7 @@ def check_calibration_for_light(
         )
 
         if darks:
-            result["matched_darks"] = [d[NORMALIZED_HEADER_FILENAME] for d in darks]
-            result["has_darks"] = True
+            matched_darks = tuple(d[NORMALIZED_HEADER_FILENAME] for d in darks)
 
             # Check if exact exposure match exists
             light_exp = float(
@@ -174,7 +160,7 @@ def check_calibration_for_light(
                 float(d.get(config.NORMALIZED_HEADER_EXPOSURESECONDS, -1)) == light_exp
                 for d in darks
             )
-            result["needs_bias"] = scale_darks and not exact_match
+            needs_bias = scale_darks and not exact_match
             break
 
     # Search for flats
@@ -197,12 +183,11 @@ def check_calibration_for_light(
         )
 
         if flats:
-            result["matched_flats"] = [f[NORMALIZED_HEADER_FILENAME] for f in flats]
-            result["has_flats"] = True
+            matched_flats = tuple(f[NORMALIZED_HEADER_FILENAME] for f in flats)
             break
 
     # Search for bias if needed
-    if result["needs_bias"]:
+    if needs_bias:
         for search_dir in search_dirs:
             # Filter cache to this search_dir (non-recursive: parent == search_path)
             dir_cache = {
@@ -222,22 +207,28 @@ def check_calibration_for_light(
             )
 
             if bias:
-                result["matched_bias"] = [b[NORMALIZED_HEADER_FILENAME] for b in bias]
-                result["has_bias"] = True
+                matched_bias = tuple(b[NORMALIZED_HEADER_FILENAME] for b in bias)
                 break
 
     # Determine completeness
-    missing: List[str] = result["missing"]  # type: ignore[assignment]
-    if not result["has_darks"]:
+    missing: List[str] = []
+    if not matched_darks:
         missing.append("darks")
-    if not result["has_flats"]:
+    if not matched_flats:
         missing.append("flats")
-    if result["needs_bias"] and not result["has_bias"]:
+    if needs_bias and not matched_bias:
         missing.append("bias")
 
-    result["is_complete"] = len(missing) == 0
-
-    return result
+    return CalibrationStatus(
+        has_darks=bool(matched_darks),
+        has_flats=bool(matched_flats),
+        has_bias=bool(matched_bias),
+        needs_bias=needs_bias,
+        matched_darks=matched_darks,
+        matched_flats=matched_flats,
+        matched_bias=matched_bias,
+        missing=tuple(missing),
+    )
 
 
 def is_file_inside_tree(filepath: str, tree_path: str) -> bool:
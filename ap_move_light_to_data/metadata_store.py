@@ -0,0 +1,233 @@
+"""
+Compact in-memory store for normalized frame metadata.
+
+ap_common.get_metadata returns a dict per file, keyed by full path, holding
+every header it normalized. At a million frames those dicts, the repeated path
+prefixes and the repeated header values dominate memory. MetadataStore keeps
+only the keywords matching needs, interns every value, splits each path into
+an entry in a shared directory table plus a basename, and stores identical
+records once (frames from one session usually differ only in their name).
+
+The store is a read-only Mapping of path to metadata dict, so code written
+against the plain dict keeps working. Dicts are rebuilt on access and are not
+cached.
+"""
+
+import os
+import sys
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    ItemsView,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Marks a keyword the file did not have; never returned to callers
+_MISSING = object()
+
+
+class MetadataStore(Mapping[str, Dict[str, Any]]):
+    """
+    Read-only mapping of file path to normalized metadata, stored compactly.
+
+    Args:
+        keys: Metadata keywords to keep; any other keyword is dropped
+        path_key: Keyword set to the file path in returned dicts (e.g. the
+            normalized filename header), or None to leave it out
+    """
+
+    __slots__ = (
+        "keys_kept",
+        "path_key",
+        "_dir_ids",
+        "_dirs",
+        "_files",
+        "_values",
+        "_record_ids",
+        "_records",
+        "_count",
+    )
+
+    def __init__(self, keys: Sequence[str], path_key: Optional[str] = None):
+        self.keys_kept: Tuple[str, ...] = tuple(sys.intern(k) for k in keys)
+        self.path_key = path_key
+        self._dir_ids: Dict[str, int] = {}
+        self._dirs: List[str] = []
+        # Per directory: basename -> record id
+        self._files: List[Dict[str, int]] = []
+        # Canonical object per (type, value), so equal values are shared
+        self._values: Dict[Tuple[type, Any], Any] = {}
+        self._record_ids: Dict[Tuple[int, ...], int] = {}
+        self._records: List[Tuple[Any, ...]] = []
+        self._count = 0
+
+    @classmethod
+    def from_metadata(
+        cls,
+        metadata: Mapping[str, Mapping[str, Any]],
+        keys: Sequence[str],
+        path_key: Optional[str] = None,
+    ) -> "MetadataStore":
+        """
+        Build a store from a path -> metadata mapping.
+
+        Args:
+            metadata: Metadata per file path (e.g. from ap_common.get_metadata)
+            keys: Metadata keywords to keep
+            path_key: See MetadataStore
+
+        Returns:
+            MetadataStore holding every file in metadata
+        """
+        store = cls(keys, path_key)
+        store.update(metadata.items())
+        return store
+
+    def add(self, path: str, metadata: Mapping[str, Any]) -> None:
+        """
+        Add or replace one file's metadata.
+
+        Args:
+            path: File path
+            metadata: Normalized metadata; keywords not kept are ignored and
+                kept values must be hashable (headers are strings and numbers)
+        """
+        directory, name = _split(path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            directory = sys.intern(directory)
+            self._dir_ids[directory] = dir_id
+            self._dirs.append(directory)
+            self._files.append({})
+
+        record = tuple(
+            self._canonical(metadata.get(key, _MISSING)) for key in self.keys_kept
+        )
+        # Values are canonical objects, so identity tells records apart even
+        # where equality would not (1 == 1.0)
+        identity = tuple(map(id, record))
+        record_id = self._record_ids.get(identity)
+        if record_id is None:
+            record_id = len(self._records)
+            self._record_ids[identity] = record_id
+            self._records.append(record)
+
+        files = self._files[dir_id]
+        if name not in files:
+            self._count += 1
+        files[sys.intern(name)] = record_id
+
+    def update(self, items: Iterable[Tuple[str, Mapping[str, Any]]]) -> None:
+        """Add (path, metadata) pairs; see add."""
+        for path, metadata in items:
+            self.add(path, metadata)
+
+    def consume(self, metadata: MutableMapping[str, Mapping[str, Any]]) -> None:
+        """
+        Add every file of a path -> metadata dict, emptying the dict.
+
+        Each file is removed from metadata once it is stored, so its dict can
+        be freed while the store grows.
+
+        Args:
+            metadata: Metadata per file path (e.g. one get_metadata batch);
+                empty on return
+        """
+        for path in list(metadata):
+            self.add(path, metadata.pop(path))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Summarize how much sharing the store achieved.
+
+        Returns:
+            Dict with:
+                - files: int (stored files)
+                - directories: int (distinct directories)
+                - records: int (distinct metadata records)
+                - values: int (distinct metadata values)
+        """
+        return {
+            "files": self._count,
+            "directories": len(self._dirs),
+            "records": len(self._records),
+            "values": len(self._values),
+        }
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        if not isinstance(path, str):
+            raise KeyError(path)
+        directory, name = _split(path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None or name not in self._files[dir_id]:
+            raise KeyError(path)
+        return self._build(path, self._files[dir_id][name])
+
+    def __contains__(self, path: object) -> bool:
+        if not isinstance(path, str):
+            return False
+        directory, name = _split(path)
+        dir_id = self._dir_ids.get(directory)
+        return dir_id is not None and name in self._files[dir_id]
+
+    def __iter__(self) -> Iterator[str]:
+        for directory, files in zip(self._dirs, self._files):
+            for name in files:
+                yield _join(directory, name)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> ItemsView[str, Dict[str, Any]]:
+        return _StoreItems(self)
+
+    def _iter_items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for directory, files in zip(self._dirs, self._files):
+            for name, record_id in files.items():
+                path = _join(directory, name)
+                yield path, self._build(path, record_id)
+
+    def _canonical(self, value: Any) -> Any:
+        if value is _MISSING:
+            return value
+        if isinstance(value, str):
+            value = sys.intern(value)
+        return self._values.setdefault((type(value), value), value)
+
+    def _build(self, path: str, record_id: int) -> Dict[str, Any]:
+        metadata = {
+            key: value
+            for key, value in zip(self.keys_kept, self._records[record_id])
+            if value is not _MISSING
+        }
+        if self.path_key is not None:
+            metadata[self.path_key] = path
+        return metadata
+
+
+class _StoreItems(ItemsView[str, Dict[str, Any]]):
+    """Items view that walks the store directly instead of looking up each path."""
+
+    _mapping: MetadataStore
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self._mapping._iter_items()
+
+
+def _split(path: str) -> Tuple[str, str]:
+    directory, sep, name = path.rpartition(os.sep)
+    if not sep and os.altsep:
+        directory, sep, name = path.rpartition(os.altsep)
+    return directory + sep, name
+
+
+def _join(directory: str, name: str) -> str:
+    return directory + name
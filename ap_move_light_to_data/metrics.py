@@ -0,0 +1,154 @@
+"""
+Run metrics in the Prometheus text exposition format.
+
+--metrics-file writes the results of a run for node-exporter's textfile
+collector. Every value describes the last run (the file is replaced each
+time), so all metrics are gauges. Alerting on the last-run timestamp catches
+runs that stall or stop happening; copy throughput catches a degrading link.
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+PREFIX = "ap_move_light_to_data"
+
+# (metric name, results key, help text)
+RESULT_GAUGES = (
+    ("light_directories", "dir_count", "Light directories checked"),
+    ("files_scanned", "files_scanned", "Files whose metadata was loaded"),
+    ("groups_moved", "moved", "Directory groups moved (or to move, in a dry run)"),
+    ("files_copied", "copied", "Files copied to the destination"),
+    (
+        "files_skipped_identical",
+        "skipped_identical",
+        "Files already identical at the destination",
+    ),
+    ("files_verified", "verified", "Files verified against their source hash"),
+    ("groups_stale", "skipped_stale", "Planned groups skipped as changed"),
+    ("groups_locked", "skipped_locked", "Groups skipped as locked by another instance"),
+    ("bytes_copied", "bytes_copied", "Bytes copied to the destination"),
+    ("copy_seconds", "copy_seconds", "Seconds spent copying"),
+    ("errors", "errors", "Errors during the run"),
+)
+
+# Missing calibration name -> results key counting directories missing it
+INCOMPLETE_KEYS = {
+    "darks": "skipped_no_darks",
+    "flats": "skipped_no_flats",
+    "bias": "skipped_no_bias",
+}
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _value(value: Any) -> str:
+    """Format a sample value (integers stay exact)."""
+    if isinstance(value, int):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _gauge(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    samples: List[tuple],
+) -> None:
+    """Append one gauge family: HELP, TYPE and (labels, value) samples."""
+    full_name = f"{PREFIX}_{name}"
+    lines.append(f"# HELP {full_name} {help_text}")
+    lines.append(f"# TYPE {full_name} gauge")
+    for labels, value in samples:
+        label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        suffix = f"{{{label_str}}}" if label_str else ""
+        lines.append(f"{full_name}{suffix} {_value(value)}")
+
+
+def format_metrics(
+    results: Mapping[str, Any],
+    dry_run: bool = False,
+    timestamp: Optional[float] = None,
+) -> str:
+    """
+    Render run results as Prometheus text.
+
+    Args:
+        results: Results dict from process_light_directories
+        dry_run: Whether the run was a dry run (nothing copied)
+        timestamp: Unix time the run finished (default: now)
+
+    Returns:
+        Metrics text, ending with a newline
+    """
+    finished = time.time() if timestamp is None else timestamp
+    lines: List[str] = []
+    _gauge(
+        lines,
+        "last_run_timestamp_seconds",
+        "Unix time the last run finished",
+        [({}, finished)],
+    )
+    _gauge(
+        lines,
+        "last_run_success",
+        "1 if the last run had no errors",
+        [({}, 1 if results.get("errors", 0) == 0 else 0)],
+    )
+    _gauge(lines, "dry_run", "1 if the last run was a dry run", [({}, int(dry_run))])
+    for name, key, help_text in RESULT_GAUGES:
+        _gauge(lines, name, help_text, [({}, results.get(key, 0))])
+
+    seconds = results.get("copy_seconds", 0.0)
+    throughput = results.get("bytes_copied", 0) / seconds if seconds > 0 else 0.0
+    _gauge(
+        lines,
+        "copy_bytes_per_second",
+        "Average copy throughput",
+        [({}, throughput)],
+    )
+    _gauge(
+        lines,
+        "incomplete_directories",
+        "Light directories left in place, by missing calibration",
+        [
+            ({"missing": name}, results.get(key, 0))
+            for name, key in INCOMPLETE_KEYS.items()
+        ],
+    )
+    timings: Dict[str, float] = results.get("timings", {})
+    if timings:
+        _gauge(
+            lines,
+            "phase_seconds",
+            "Seconds spent in each processing phase",
+            [({"phase": phase}, seconds) for phase, seconds in timings.items()],
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(
+    path: str,
+    results: Mapping[str, Any],
+    dry_run: bool = False,
+    timestamp: Optional[float] = None,
+) -> None:
+    """
+    Write run metrics, replacing any existing file atomically.
+
+    The temporary file does not end in .prom, so the textfile collector never
+    reads a partly written file.
+
+    Args:
+        path: Output file (e.g. /var/lib/node_exporter/ap_move.prom)
+        results: Results dict from process_light_directories
+        dry_run: Whether the run was a dry run
+        timestamp: Unix time the run finished (default: now)
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(format_metrics(results, dry_run=dry_run, timestamp=timestamp))
+    os.replace(temp_path, path)
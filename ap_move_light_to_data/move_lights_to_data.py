@@ -4,34 +4,63 @@ Move light frames to data directory when calibration frames are available.
 Generated By: Claude Code (Claude Sonnet 4.5)
 """
 
-import argparse
+import hashlib
 import logging
+import multiprocessing
 import os
 import re
-import shutil
+import sys
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import (
+    List,
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import ap_common
-from ap_common import setup_logging, progress_iter
-from ap_common.progress import ProgressTracker
+from ap_common import progress_iter
+from ap_common.constants import NORMALIZED_HEADER_FILENAME, TYPE_LIGHT
 
+from . import blocked as blocked_dirs
+from . import capacity
 from . import config
+from . import locking
+from . import plan as move_plan
+from . import progress as byte_progress
+from . import transfer
 from .matching import (
     get_light_frames,
     find_all_light_directories,
     check_calibration_for_light,
     is_file_inside_tree,
 )
+from .cli import main  # noqa: F401 (entry point, kept importable from here)
+from .metadata_store import MetadataStore
+from .timing import PhaseTimer
+from .tracing import Tracer
+from .status import DirectoryStatus, GroupStatus, MovableGroup, intern_paths
 
 EXIT_SUCCESS = 0
 EXIT_ERROR = 1
 
 logger = logging.getLogger("ap_move_light_to_data.move_lights_to_data")
 
-# Set default description width for aligned progress bars
-ProgressTracker.set_default_desc_width(20)
-
 
 def build_search_dirs(directory: str, source_dir: str) -> List[str]:
     """
@@ -65,8 +94,8 @@ def is_group_complete_and_self_contained(
     scale_darks: bool,
     debug: bool,
     quiet: bool,
-    metadata_cache: Optional[Dict[str, Dict[str, Any]]] = None,
-) -> Dict[str, Any]:
+    metadata_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+) -> GroupStatus:
     """
     Check if a directory group is complete (all lights have calibration)
     and self-contained (all calibration is inside the group).
@@ -80,38 +109,28 @@ def is_group_complete_and_self_contained(
         metadata_cache: Optional pre-loaded metadata dict
 
     Returns:
-        Dict with:
+        GroupStatus with:
             - is_complete: bool (all lights have calibration)
             - is_self_contained: bool (all calibration inside group)
             - can_move: bool (complete AND self-contained)
-            - light_directories: List[str] (all light dirs in group)
-            - calibration_files: Set[str] (all required calibration file paths)
-            - incomplete_dirs: List[str] (light dirs missing calibration)
+            - light_directories: Tuple[str, ...] (all light dirs in group)
+            - calibration_files: FrozenSet[str] (all required calibration paths)
+            - incomplete_dirs: Tuple of (light dir, missing types) pairs
     """
     resolved_group_path = Path(group_path).resolve()
 
-    result = {
-        "is_complete": False,
-        "is_self_contained": False,
-        "can_move": False,
-        "light_directories": [],
-        "calibration_files": set(),
-        "incomplete_dirs": [],
-    }
-
     # Find all light directories in this group
     light_dirs = find_all_light_directories(
         root_dir=str(resolved_group_path),
         metadata_cache=metadata_cache if metadata_cache is not None else {},
         debug=debug,
     )
-    result["light_directories"] = light_dirs
 
     if not light_dirs:
-        return result
+        return GroupStatus()
 
     # Check calibration for each light directory
-    all_calibration_files = set()
+    all_calibration_files: List[str] = []
     incomplete_dirs = []
 
     for light_dir in light_dirs:
@@ -140,27 +159,29 @@ def is_group_complete_and_self_contained(
         )
 
         if not cal_status["is_complete"]:
-            incomplete_dirs.append((light_dir, cal_status["missing"]))
+            incomplete_dirs.append((light_dir, tuple(cal_status["missing"])))
         else:
             # Collect all calibration file paths
-            all_calibration_files.update(cal_status["matched_darks"])
-            all_calibration_files.update(cal_status["matched_flats"])
-            all_calibration_files.update(cal_status["matched_bias"])
+            all_calibration_files.extend(cal_status["matched_darks"])
+            all_calibration_files.extend(cal_status["matched_flats"])
+            all_calibration_files.extend(cal_status["matched_bias"])
 
-    result["incomplete_dirs"] = incomplete_dirs
-    result["calibration_files"] = all_calibration_files
-    result["is_complete"] = len(incomplete_dirs) == 0
+    calibration_files = intern_paths(all_calibration_files)
+    is_complete = len(incomplete_dirs) == 0
 
     # Check if self-contained (all calibration inside group)
-    if result["is_complete"]:
-        all_inside = all(
-            is_file_inside_tree(cal_file, str(resolved_group_path))
-            for cal_file in all_calibration_files
-        )
-        result["is_self_contained"] = all_inside
-        result["can_move"] = all_inside
+    is_self_contained = is_complete and all(
+        is_file_inside_tree(cal_file, str(resolved_group_path))
+        for cal_file in calibration_files
+    )
 
-    return result
+    return GroupStatus(
+        is_complete=is_complete,
+        is_self_contained=is_self_contained,
+        light_directories=tuple(light_dirs),
+        calibration_files=calibration_files,
+        incomplete_dirs=tuple(incomplete_dirs),
+    )
 
 
 def filter_by_pattern(light_dirs: List[str], path_pattern: Optional[str]) -> List[str]:
@@ -190,8 +211,9 @@ def check_light_directories(
     scale_darks: bool,
     debug: bool,
     quiet: bool,
-    metadata_cache: Optional[Dict[str, Dict[str, Any]]] = None,
-) -> Dict[str, Dict[str, Any]]:
+    metadata_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> Dict[str, DirectoryStatus]:
     """
     Step 3: Check calibration status for each light directory.
 
@@ -202,55 +224,376 @@ def check_light_directories(
         debug: Enable debug output
         quiet: Suppress progress output
         metadata_cache: Optional pre-loaded metadata dict
+        timer: Optional timer whose tracer records a span per directory
 
     Returns:
-        Dict mapping light_dir -> calibration status dict
+        Dict mapping light_dir -> DirectoryStatus
     """
+    if timer is None:
+        timer = PhaseTimer()
     status_map = {}
 
     for light_dir in progress_iter(
         light_dirs, desc="Checking calibration", enabled=not quiet
     ):
-        # Get one light frame as reference
-        lights = get_light_frames(
-            directory=light_dir,
-            metadata_cache=metadata_cache if metadata_cache is not None else {},
-            debug=debug,
+        with timer.span("check_dir", category="check", dir=light_dir):
+            # Get one light frame as reference
+            lights = get_light_frames(
+                directory=light_dir,
+                metadata_cache=metadata_cache if metadata_cache is not None else {},
+                debug=debug,
+            )
+            if not lights:
+                continue
+
+            light_metadata = next(iter(lights.values()))
+
+            # Build search directories (light dir + parents up to source)
+            search_dirs = build_search_dirs(light_dir, str(source_dir))
+
+            # Check calibration
+            cal_status = check_calibration_for_light(
+                light_metadata=light_metadata,
+                search_dirs=search_dirs,
+                metadata_cache=metadata_cache if metadata_cache is not None else {},
+                scale_darks=scale_darks,
+                debug=debug,
+                quiet=quiet,
+            )
+
+            # Add directory info
+            status_map[light_dir] = DirectoryStatus(
+                is_complete=cal_status["is_complete"],
+                missing=tuple(cal_status["missing"]),
+                calibration_files=intern_paths(
+                    chain(
+                        cal_status["matched_darks"],
+                        cal_status["matched_flats"],
+                        cal_status["matched_bias"],
+                    )
+                ),
+            )
+
+    return status_map
+
+
+def shard_by_target(light_dirs: List[str], source_dir: Path) -> List[List[str]]:
+    """
+    Split light directories by their first-level target under source_dir.
+
+    Args:
+        light_dirs: Light directory paths
+        source_dir: Source root directory
+
+    Returns:
+        One list per target, in order of each target's first directory;
+        directories keep their order within a shard
+    """
+    shards: Dict[str, List[str]] = {}
+    for light_dir in light_dirs:
+        try:
+            parts = Path(light_dir).relative_to(source_dir).parts
+        except ValueError:
+            parts = ()
+        shards.setdefault(parts[0] if parts else "", []).append(light_dir)
+    return list(shards.values())
+
+
+# Read-only state of a check worker process, set by _init_check_worker. With
+# the fork start method it is shared copy-on-write rather than pickled.
+_check_worker_state: Dict[str, Any] = {}
+
+
+def _init_check_worker(
+    metadata_cache: Mapping[str, Dict[str, Any]],
+    source_dir: Path,
+    scale_darks: bool,
+    debug: bool,
+) -> None:
+    """Process pool initializer for check_light_directories_parallel."""
+    _check_worker_state.update(
+        metadata_cache=metadata_cache,
+        source_dir=source_dir,
+        scale_darks=scale_darks,
+        debug=debug,
+    )
+
+
+def _check_shard(light_dirs: List[str]) -> Dict[str, DirectoryStatus]:
+    """Check one shard in a worker process."""
+    state = _check_worker_state
+    return check_light_directories(
+        light_dirs,
+        state["source_dir"],
+        state["scale_darks"],
+        state["debug"],
+        True,
+        state["metadata_cache"],
+    )
+
+
+def check_light_directories_parallel(
+    light_dirs: List[str],
+    source_dir: Path,
+    scale_darks: bool,
+    debug: bool,
+    quiet: bool,
+    metadata_cache: Mapping[str, Dict[str, Any]],
+    workers: int,
+    timer: Optional[PhaseTimer] = None,
+) -> Dict[str, DirectoryStatus]:
+    """
+    Step 3 on a process pool: check light directories sharded by target.
+
+    Each light directory's check only reads the metadata cache, so targets
+    are checked in separate processes and the results merged. On Linux the
+    workers are forked and share the cache copy-on-write; elsewhere it is
+    pickled to each worker once. Falls back to check_light_directories with
+    one worker or a single target.
+
+    Args:
+        light_dirs: List of light directory paths
+        source_dir: Source root directory
+        scale_darks: Allow shorter darks with bias frames
+        debug: Enable debug output
+        quiet: Suppress progress output
+        metadata_cache: Pre-loaded metadata
+        workers: Maximum worker processes
+        timer: Optional timer (per-directory spans are only traced when
+            checking in this process)
+
+    Returns:
+        Dict mapping light_dir -> DirectoryStatus, in light_dirs order as for
+        check_light_directories
+    """
+    shards = shard_by_target(light_dirs, source_dir)
+    if workers <= 1 or len(shards) <= 1:
+        return check_light_directories(
+            light_dirs,
+            source_dir,
+            scale_darks,
+            debug,
+            quiet,
+            metadata_cache,
+            timer=timer,
         )
-        if not lights:
+
+    processes = min(workers, len(shards))
+    logger.debug(
+        f"Checking {len(light_dirs):,} light directories in {len(shards):,} "
+        f"targets on {processes} processes"
+    )
+    context = multiprocessing.get_context(
+        "fork" if sys.platform.startswith("linux") else None
+    )
+    checked: Dict[str, DirectoryStatus] = {}
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=context,
+        initializer=_init_check_worker,
+        initargs=(metadata_cache, source_dir, scale_darks, debug),
+    ) as pool:
+        # Largest targets first so one big target does not finish last
+        futures = [
+            pool.submit(_check_shard, shard)
+            for shard in sorted(shards, key=len, reverse=True)
+        ]
+        for future in progress_iter(
+            futures, desc="Checking calibration", enabled=not quiet
+        ):
+            checked.update(future.result())
+
+    # Same order as a serial check, whichever shard finished first
+    return {d: checked[d] for d in light_dirs if d in checked}
+
+
+def summarize_lights(
+    light_dirs: Sequence[str], metadata_cache: Mapping[str, Dict[str, Any]]
+) -> Dict[str, Tuple[Dict[str, Any], str]]:
+    """
+    Reference light and lights fingerprint of each light directory, in one
+    pass over the metadata cache.
+
+    Args:
+        light_dirs: Light directories, named as find_all_light_directories
+            names them
+        metadata_cache: Pre-loaded metadata
+
+    Returns:
+        Dict mapping light_dir -> (metadata of the light check_light_directories
+        uses, hash of every light's file name and header values)
+    """
+    wanted = set(light_dirs)
+    lights_by_dir: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for filename, metadata in metadata_cache.items():
+        if metadata.get(config.NORMALIZED_HEADER_TYPE) != TYPE_LIGHT:
             continue
+        light_dir = str(Path(filename).resolve().parent)
+        if light_dir in wanted:
+            lights_by_dir.setdefault(light_dir, []).append((filename, metadata))
+
+    keywords = sorted(config.ALL_REQUIRED_KEYWORDS)
+    summaries = {}
+    for light_dir, lights in lights_by_dir.items():
+        hasher = hashlib.sha256()
+        for filename, metadata in sorted(lights, key=lambda light: light[0]):
+            frame_digest = blocked_dirs.digest(metadata, keywords)
+            hasher.update(f"{os.path.basename(filename)}\0{frame_digest}\n".encode())
+        summaries[light_dir] = (lights[0][1], hasher.hexdigest())
+    return summaries
+
+
+def snapshot_calibration(
+    directories: Iterable[str],
+    metadata_cache: Mapping[str, Dict[str, Any]],
+    saved: Optional[Mapping[str, Mapping[str, str]]] = None,
+) -> Tuple[Dict[str, Dict[str, str]], List[Tuple[str, Dict[str, Any]]]]:
+    """
+    Digest the calibration frames directly inside each directory.
 
-        light_metadata = next(iter(lights.values()))
+    Args:
+        directories: Search directories to snapshot
+        metadata_cache: Pre-loaded metadata
+        saved: Optional earlier snapshot to compare against
 
-        # Build search directories (light dir + parents up to source)
-        search_dirs = build_search_dirs(light_dir, str(source_dir))
+    Returns:
+        Tuple of (directory -> {file name: digest}, (path, metadata) of the
+        frames absent from or changed since saved)
+    """
+    frame_types = {
+        frame_type
+        for alternatives in config.CALIBRATION_REQUIREMENTS.values()
+        for frame_type, _ in alternatives
+    }
+    keywords = sorted(config.ALL_REQUIRED_KEYWORDS)
+    snapshot: Dict[str, Dict[str, str]] = {os.path.normpath(d): {} for d in directories}
+    changed = []
+    for filename, metadata in metadata_cache.items():
+        if metadata.get(config.NORMALIZED_HEADER_TYPE) not in frame_types:
+            continue
+        directory = os.path.dirname(os.path.normpath(filename))
+        frames = snapshot.get(directory)
+        if frames is None:
+            continue
+        name = os.path.basename(filename)
+        frames[name] = blocked_dirs.digest(metadata, keywords)
+        if saved is not None and saved.get(directory, {}).get(name) != frames[name]:
+            changed.append((filename, metadata))
+    return snapshot, changed
+
+
+def reuse_blocked_statuses(
+    blocked_state: Dict[str, Any],
+    lights: Mapping[str, Tuple[Dict[str, Any], str]],
+    metadata_cache: Mapping[str, Dict[str, Any]],
+) -> Dict[str, DirectoryStatus]:
+    """
+    Statuses of saved blocked directories that need no new check.
 
-        # Check calibration
-        cal_status = check_calibration_for_light(
-            light_metadata=light_metadata,
-            search_dirs=search_dirs,
-            metadata_cache=metadata_cache if metadata_cache is not None else {},
-            scale_darks=scale_darks,
-            debug=debug,
-            quiet=quiet,
+    A saved directory is still blocked when its lights are unchanged and no
+    calibration frame in its search directories was added, rewritten or
+    removed in a way that may affect it. New and rewritten frames are looked
+    up in a BlockedIndex, so only the directories they may unblock are
+    checked again; a removed frame re-checks every directory searching there.
+
+    Args:
+        blocked_state: Saved state (see blocked.load_index)
+        lights: Output of summarize_lights for this run's light directories
+        metadata_cache: Pre-loaded metadata
+
+    Returns:
+        Dict mapping light_dir -> incomplete DirectoryStatus as saved
+    """
+    index = blocked_dirs.BlockedIndex(
+        config.CALIBRATION_REQUIREMENTS, config.NORMALIZED_HEADER_TYPE
+    )
+    saved_dirs = blocked_state["directories"]
+    for light_dir, entry in saved_dirs.items():
+        summary = lights.get(light_dir)
+        if (
+            summary is not None
+            and summary[1] == entry["lights"]
+            and entry["missing"]
+            and set(entry["missing"]) <= config.CALIBRATION_REQUIREMENTS.keys()
+        ):
+            index.record(light_dir, summary[0], entry["search_dirs"], entry["missing"])
+    if not len(index):
+        return {}
+
+    saved_calibration = blocked_state["calibration"]
+    current, changed = snapshot_calibration(
+        (d for entry in saved_dirs.values() for d in entry["search_dirs"]),
+        metadata_cache,
+        saved=saved_calibration,
+    )
+    removed = {
+        directory
+        for directory, frames in saved_calibration.items()
+        if any(current.get(directory, {}).get(n) != v for n, v in frames.items())
+    }
+    unblocked = index.affected(changed)
+
+    carried = {}
+    for light_dir, entry in saved_dirs.items():
+        if light_dir not in index or light_dir in unblocked:
+            continue
+        if removed.intersection(os.path.normpath(d) for d in entry["search_dirs"]):
+            continue
+        carried[light_dir] = DirectoryStatus(
+            is_complete=False,
+            missing=tuple(entry["missing"]),
+            calibration_files=frozenset(),
         )
+    logger.debug(f"Reusing {len(carried):,} of {len(saved_dirs):,} blocked directories")
+    return carried
 
-        # Add directory info
-        status_map[light_dir] = {
-            "is_complete": cal_status["is_complete"],
-            "missing": cal_status["missing"],
-            "calibration_files": set(
-                cal_status["matched_darks"]
-                + cal_status["matched_flats"]
-                + cal_status["matched_bias"]
-            ),
+
+def update_blocked_state(
+    blocked_state: Dict[str, Any],
+    source_path: Path,
+    status_map: Mapping[str, DirectoryStatus],
+    lights: Mapping[str, Tuple[Dict[str, Any], str]],
+    metadata_cache: Mapping[str, Dict[str, Any]],
+) -> None:
+    """
+    Replace the saved blocked directories under source_path with this run's.
+
+    Args:
+        blocked_state: Saved state, updated in place (see blocked.write_index)
+        source_path: Resolved source directory
+        status_map: This run's statuses for the source's light directories
+        lights: Output of summarize_lights for those directories
+        metadata_cache: Pre-loaded metadata
+    """
+    directories = {
+        light_dir: entry
+        for light_dir, entry in blocked_state["directories"].items()
+        if not is_file_inside_tree(light_dir, str(source_path))
+    }
+    kept = {d for entry in directories.values() for d in entry["search_dirs"]}
+
+    own_search_dirs: Set[str] = set()
+    for light_dir, status in status_map.items():
+        if status.is_complete or light_dir not in lights:
+            continue
+        search_dirs = build_search_dirs(light_dir, str(source_path))
+        directories[light_dir] = {
+            "missing": list(status.missing),
+            "search_dirs": search_dirs,
+            "lights": lights[light_dir][1],
         }
+        own_search_dirs.update(search_dirs)
 
-    return status_map
+    calibration = {
+        d: frames for d, frames in blocked_state["calibration"].items() if d in kept
+    }
+    calibration.update(snapshot_calibration(own_search_dirs, metadata_cache)[0])
+    blocked_state["directories"] = directories
+    blocked_state["calibration"] = calibration
 
 
 def find_calibration_directories(
-    status_map: Dict[str, Dict[str, Any]],
+    status_map: Dict[str, DirectoryStatus],
 ) -> Dict[str, str]:
     """
     Step 4a: Find where calibration exists for each light directory.
@@ -294,7 +637,7 @@ def find_calibration_directories(
 
 
 def organize_into_movable_groups(
-    status_map: Dict[str, Dict[str, Any]], source_dir: Path
+    status_map: Dict[str, DirectoryStatus], source_dir: Path
 ) -> Dict[str, Any]:
     """
     Step 4b: Determine which directories can be moved atomically.
@@ -309,7 +652,7 @@ def organize_into_movable_groups(
         source_dir: Source root directory
 
     Returns:
-        Dict with 'movable_dirs' and 'incomplete_dirs'
+        Dict with 'movable_groups' (List[MovableGroup]) and 'incomplete_dirs'
     """
     # Separate complete and incomplete
     complete_lights = {
@@ -356,50 +699,219 @@ def organize_into_movable_groups(
     movable_groups = []
     for cal_dir in sorted(deduplicated_dirs, key=lambda x: x.count(os.sep)):
         movable_groups.append(
-            {
-                "path": Path(cal_dir),
-                "relative_path": Path(cal_dir).relative_to(source_dir),
-            }
+            MovableGroup(
+                path=Path(cal_dir),
+                relative_path=Path(cal_dir).relative_to(source_dir),
+            )
         )
 
     return {"movable_groups": movable_groups, "incomplete_dirs": incomplete_lights}
 
 
-def collect_all_files_in_groups(
-    movable_groups: List[Dict], dest_dir: Path
-) -> List[Dict[str, str]]:
+def iter_group_files(
+    group_plan: Dict, dest_dir: Path, mirror_dirs: Sequence[Path] = ()
+) -> Iterator[Dict[str, Any]]:
     """
-    Collect all files across all groups with source and destination paths.
+    Stream the files of one group with source and destination paths.
+
+    Uses os.scandir and keeps each file's stat values so later stages (skip
+    checks, capacity planning, progress) need no further stat calls. Symlinked
+    directories are not descended into, and the lock directory (see locking)
+    is left out.
 
     Args:
-        movable_groups: List of group_plan dicts with "path" and "relative_path"
+        group_plan: Group plan dict with "path" and "relative_path"
         dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
 
-    Returns:
-        List of dicts with:
+    Yields:
+        Dicts with:
             - "source": source file path
             - "dest": destination file path
+            - "mirrors": destination file paths under each mirror_dirs root
             - "group": which group this file belongs to (for error reporting)
+            - "size": file size in bytes
+            - "mtime_ns": modification time in nanoseconds
+            - "inode": inode number
+            - "device": device id of the source file
+            - "error": OSError, only when the file could not be stat'ed
+              (size, mtime_ns and inode are then 0 and device is None)
+    """
+    source_group = Path(group_plan["path"])
+    source_prefix_len = len(str(source_group)) + 1
+    dest_group = str(dest_dir / group_plan["relative_path"])
+    mirror_groups = [str(Path(m) / group_plan["relative_path"]) for m in mirror_dirs]
+    pending = [str(source_group)]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f"Cannot list {directory}: {e}")
+            continue
+        for entry in entries:
+            if entry.name == config.LOCK_DIR_NAME:
+                # Lock files of a group at the source root stay behind
+                continue
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    pending.append(entry.path)
+                continue
+            relative = entry.path[source_prefix_len:]
+            file_info = {
+                "source": entry.path,
+                "dest": os.path.join(dest_group, relative),
+                "mirrors": [os.path.join(m, relative) for m in mirror_groups],
+                "group": group_plan["relative_path"],
+            }
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                # Broken symlink or file removed since listing: copying it
+                # fails, which keeps the group in place
+                logger.warning(f"Cannot stat {entry.path}: {e}")
+                file_info.update(size=0, mtime_ns=0, inode=0, device=None, error=e)
+                yield file_info
+                continue
+            file_info.update(
+                size=stat.st_size,
+                mtime_ns=stat.st_mtime_ns,
+                inode=stat.st_ino,
+                device=stat.st_dev,
+            )
+            yield file_info
+
+
+def iter_files_in_groups(
+    movable_groups: List[Dict], dest_dir: Path, mirror_dirs: Sequence[Path] = ()
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the files of every group in order (see iter_group_files).
+
+    Args:
+        movable_groups: List of group_plan dicts with "path" and "relative_path"
+        dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
+
+    Yields:
+        File dicts as produced by iter_group_files
     """
-    files = []
     for group_plan in movable_groups:
-        source_group = Path(group_plan["path"])
-        for root, dirs, filenames in os.walk(source_group):
-            for filename in filenames:
-                source_file = Path(root) / filename
-                # Calculate relative path within this group
-                rel_to_group = source_file.relative_to(source_group)
-                # Build destination path
-                dest_file = dest_dir / group_plan["relative_path"] / rel_to_group
-
-                files.append(
-                    {
-                        "source": str(source_file),
-                        "dest": str(dest_file),
-                        "group": group_plan["relative_path"],
-                    }
-                )
-    return files
+        yield from iter_group_files(group_plan, dest_dir, mirror_dirs)
+
+
+def set_bytes_to_copy(
+    group_plan: Dict,
+    files: List[Dict[str, Any]],
+    dest_dir: Path,
+    mirror_dirs: Sequence[Path] = (),
+) -> List[int]:
+    """
+    Record how many bytes each file of a group still needs at each destination.
+
+    copy_group writes into the group's directory when it exists and into its
+    staging directory otherwise, skipping files already identical there (size
+    and mtime, see transfer.is_identical). Such files need no space, so a
+    re-run after a partial move is not refused for bytes it will not copy.
+
+    Args:
+        group_plan: Group plan dict with "relative_path"
+        files: The group's files (see iter_group_files), with final paths;
+            each gets "to_copy", bytes needed per destination
+        dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
+
+    Returns:
+        Bytes the group still needs per destination, in dest_dir,
+        *mirror_dirs order
+    """
+    for file_info in files:
+        file_info["to_copy"] = []
+    totals = []
+    for index, root in enumerate([dest_dir, *mirror_dirs]):
+        final = str(Path(root) / group_plan["relative_path"])
+        copy_dir = final if os.path.lexists(final) else str(staging_path(Path(final)))
+        # A group never copied before needs every byte; skip per-file stats
+        present = os.path.isdir(copy_dir)
+        total = 0
+        for file_info in files:
+            needed = file_info["size"]
+            if present and "error" not in file_info:
+                target = [file_info["dest"], *file_info["mirrors"]][index]
+                if transfer.is_identical(
+                    file_info["source"],
+                    copy_dir + target[len(final) :],
+                    source_size=file_info["size"],
+                    source_mtime_ns=file_info["mtime_ns"],
+                ):
+                    needed = 0
+            file_info["to_copy"].append(needed)
+            total += needed
+        totals.append(total)
+    return totals
+
+
+def iter_files_to_copy(
+    movable_groups: List[Dict], dest_dir: Path, mirror_dirs: Sequence[Path] = ()
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the files of every group with the bytes each still needs.
+
+    Lists one group at a time, so memory is bounded by the largest group.
+
+    Args:
+        movable_groups: List of group_plan dicts with "path" and "relative_path"
+        dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
+
+    Yields:
+        File dicts as produced by iter_group_files, plus "to_copy" (see
+        set_bytes_to_copy)
+    """
+    for group_plan in movable_groups:
+        files = list(iter_group_files(group_plan, dest_dir, mirror_dirs))
+        set_bytes_to_copy(group_plan, files, dest_dir, mirror_dirs)
+        yield from files
+
+
+def collect_all_files_in_groups(
+    movable_groups: List[Dict], dest_dir: Path, mirror_dirs: Sequence[Path] = ()
+) -> List[Dict[str, Any]]:
+    """
+    Collect all files across all groups with source and destination paths.
+
+    Prefer iter_files_in_groups for large plans; this materializes every file.
+
+    Args:
+        movable_groups: List of group_plan dicts with "path" and "relative_path"
+        dest_dir: Destination root directory
+        mirror_dirs: Additional destination root directories
+
+    Returns:
+        List of file dicts as produced by iter_group_files
+    """
+    return list(iter_files_in_groups(movable_groups, dest_dir, mirror_dirs))
+
+
+def create_destination_directories(all_files: List[Dict[str, Any]]) -> int:
+    """
+    Create every destination directory needed by a move, once per directory.
+
+    Args:
+        all_files: File dicts with "dest" and optional "mirrors" paths (see
+            collect_all_files_in_groups)
+
+    Returns:
+        Number of directories created
+    """
+    directories = {
+        os.path.dirname(path)
+        for file_info in all_files
+        for path in [file_info["dest"], *file_info.get("mirrors", ())]
+    }
+    created = transfer.create_directories(directories)
+    logger.debug(f"Created {created:,} of {len(directories):,} destination directories")
+    return created
 
 
 def sort_groups_leaf_first(movable_groups: List[Dict]) -> List[Dict]:
@@ -422,96 +934,611 @@ def sort_groups_leaf_first(movable_groups: List[Dict]) -> List[Dict]:
     )
 
 
-def process_light_directories(
-    source_dir: str,
-    dest_dir: str,
-    path_pattern: str,
-    debug: bool = False,
-    dry_run: bool = False,
+def copy_group_file(
+    file_info: Dict[str, Any],
+    verify: bool,
+    results: dict,
+    throttle: Optional[transfer.Throttle] = None,
+    progress: Optional[byte_progress.ByteProgress] = None,
+    sync: bool = False,
+    mirror_writer: Optional[Executor] = None,
+) -> None:
+    """
+    Copy one planned file to its destination, updating result counters.
+
+    Files already identical at every destination are skipped; otherwise the
+    file is read once and written to each destination that differs. The
+    destination directories must already exist (see
+    create_destination_directories).
+
+    Args:
+        file_info: Dict with "source", "dest" and optional "mirrors" paths
+        verify: Hash while copying and verify the destination read-back
+        results: Results dict to update (copied, skipped_identical, verified)
+        throttle: Optional shared bandwidth/IOPS limits
+        progress: Optional byte progress advanced as chunks are written
+        sync: Flush copied files to disk before returning
+        mirror_writer: Optional pool shared across files for mirror writes
+            (see transfer.copy_file)
+
+    Raises:
+        Exception: Any error from the copy or verification
+    """
+    source = file_info["source"]
+    hash_algorithm = config.VERIFY_HASH_ALGORITHM if verify else None
+    targets = [
+        dest
+        for dest in [file_info["dest"], *file_info.get("mirrors", ())]
+        if not transfer.is_identical(
+            source,
+            dest,
+            hash_algorithm,
+            throttle,
+            source_size=file_info.get("size"),
+            source_mtime_ns=file_info.get("mtime_ns"),
+        )
+    ]
+    if not targets:
+        results["skipped_identical"] += 1
+        if progress is not None:
+            progress.skip(file_info.get("size", 0))
+        return
+    dest, mirrors = targets[0], targets[1:]
+    on_chunk = progress.update if progress is not None else None
+    if verify:
+        transfer.copy_file_verified(
+            source,
+            dest,
+            config.VERIFY_HASH_ALGORITHM,
+            throttle,
+            make_parents=False,
+            progress=on_chunk,
+            mirrors=mirrors,
+            mirror_writer=mirror_writer,
+        )
+        results["verified"] += 1
+    else:
+        transfer.copy_file(
+            source,
+            dest,
+            throttle=throttle,
+            make_parents=False,
+            progress=on_chunk,
+            mirrors=mirrors,
+            sync=sync,
+            mirror_writer=mirror_writer,
+        )
+    results["copied"] += 1
+
+
+def prune_empty_ancestors(removed_paths: List[Path], source_dir: Path) -> int:
+    """
+    Remove directories left empty by deleted groups.
+
+    Walks upward from each removed group toward source_dir (which is never
+    removed) and stops at the first directory that is not empty, so the cost
+    scales with what moved rather than with the size of the source tree.
+
+    Args:
+        removed_paths: Group directories that were deleted
+        source_dir: Source root directory (boundary, not removed)
+
+    Returns:
+        Number of directories removed
+    """
+    source = Path(source_dir)
+    removed = 0
+    # Deepest first so shared ancestors are tried after all their children
+    for path in sorted(removed_paths, key=lambda p: len(p.parts), reverse=True):
+        current = Path(path).parent
+        while current != source and source in current.parents:
+            try:
+                os.rmdir(current)
+            except OSError:
+                break  # Not empty (or not removable): ancestors are not empty
+            removed += 1
+            logger.debug(f"Removed empty directory: {current}")
+            current = current.parent
+    return removed
+
+
+def delete_group(
+    group_plan: Dict, workers: int, timer: Optional[PhaseTimer] = None
+) -> int:
+    """
+    Delete a committed group's source tree, reporting progress as it finishes.
+
+    Args:
+        group_plan: Group plan dict with "path" and "relative_path"
+        workers: Worker threads for unlinking files in parallel
+        timer: Optional timer whose tracer records a span per unlinked file
+
+    Returns:
+        Number of files removed
+
+    Raises:
+        OSError: If any part of the tree could not be removed
+    """
+    if timer is not None and timer.tracer is not None:
+
+        def traced_unlink(path: str) -> None:
+            with timer.span("unlink", category="file", path=path):
+                os.unlink(path)
+
+        removed = transfer.remove_tree(
+            str(group_plan["path"]), workers, unlink=traced_unlink
+        )
+    else:
+        removed = transfer.remove_tree(str(group_plan["path"]), workers)
+    logger.info(
+        f"Deleted source group: {group_plan['relative_path']} ({removed:,} files)"
+    )
+    return removed
+
+
+def staging_path(final: Path) -> Path:
+    """
+    Get the hidden staging directory used while copying a group to final.
+
+    The staging directory sits next to final so the two share a filesystem
+    and the finished group can be renamed into place.
+
+    Args:
+        final: Final destination directory of a group
+
+    Returns:
+        Staging directory path
+    """
+    return final.parent / config.STAGING_DIR_TEMPLATE.format(name=final.name)
+
+
+def stage_group_files(
+    files: List[Dict[str, Any]],
+    finals: List[Path],
+    stagings: List[Optional[Path]],
+) -> None:
+    """
+    Redirect planned destination paths into staging directories, in place.
+
+    Args:
+        files: File dicts with "dest" and "mirrors" (see iter_group_files)
+        finals: Final group directory per destination (dest first, then mirrors)
+        stagings: Staging directory per destination, or None to copy in place
+    """
+    for file_info in files:
+        targets = [file_info["dest"], *file_info["mirrors"]]
+        staged = [
+            (str(staging) + path[len(str(final)) :] if staging is not None else path)
+            for path, final, staging in zip(targets, finals, stagings)
+        ]
+        file_info["dest"], file_info["mirrors"] = staged[0], staged[1:]
+
+
+def copy_group(
+    group_plan: Dict,
+    dest_dir: Path,
+    results: dict,
+    verify: bool = False,
+    throttle: Optional[transfer.Throttle] = None,
+    progress: Optional[byte_progress.ByteProgress] = None,
+    mirror_dirs: Sequence[Path] = (),
+    files: Optional[List[Dict[str, Any]]] = None,
+    timer: Optional[PhaseTimer] = None,
+) -> List[str]:
+    """
+    Copy every file of one group to the destination.
+
+    The group's files are listed once; destination directories are created in
+    one batch before any file is copied. When the group's directory does not
+    exist at a destination yet, the group is copied into a hidden staging
+    directory, flushed to disk and renamed into place only once every file
+    copied, so the group appears complete or not at all. A staging directory
+    left by an interrupted run is resumed. An existing group directory (e.g.
+    from a partial earlier move) is completed in place.
+
+    Args:
+        group_plan: Group plan dict with "path" and "relative_path"
+        dest_dir: Destination root directory
+        results: Results dict to update (see copy_group_file)
+        verify: Hash while copying and verify the destination read-back
+        throttle: Optional shared bandwidth/IOPS limits
+        progress: Optional byte progress advanced as chunks are written
+        mirror_dirs: Additional destination root directories
+        files: The group's files if already listed (see iter_group_files)
+        timer: Optional timer whose tracer records a span per file copied and
+            per directory published
+
+    Returns:
+        Error messages for files that failed to copy or publish (empty on
+        success)
+    """
+    if timer is None:
+        timer = PhaseTimer()
+    if files is None:
+        files = list(iter_group_files(group_plan, dest_dir, mirror_dirs))
+    finals = [
+        Path(root) / group_plan["relative_path"] for root in [dest_dir, *mirror_dirs]
+    ]
+    stagings: List[Optional[Path]] = [
+        None if os.path.lexists(final) else staging_path(final) for final in finals
+    ]
+    staged = any(staging is not None for staging in stagings)
+    if staged:
+        stage_group_files(files, finals, stagings)
+    # Files whose directory could not be created fail individually below
+    create_destination_directories(files)
+
+    errors = []
+    with ExitStack() as stack:
+        # One mirror-writer pool for the whole group, not one per file
+        mirror_writer = (
+            stack.enter_context(ThreadPoolExecutor(max_workers=len(mirror_dirs)))
+            if mirror_dirs
+            else None
+        )
+        for file_info in files:
+            try:
+                if "error" in file_info:
+                    raise file_info["error"]
+                with timer.span("copy", category="file", path=file_info["source"]):
+                    copy_group_file(
+                        file_info,
+                        verify,
+                        results,
+                        throttle,
+                        progress,
+                        sync=staged,
+                        mirror_writer=mirror_writer,
+                    )
+            except Exception as e:
+                error_msg = f"Failed to copy {file_info['source']}: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                # Continue copying other files even if one fails
+    if errors:
+        return errors
+
+    for final, staging in zip(finals, stagings):
+        if staging is None:
+            # Completed in place
+            continue
+        if not staging.is_dir():
+            # Nothing to publish; deleting the source would lose the group
+            error_msg = (
+                f"Failed to publish {final}: staging directory {staging} is missing"
+            )
+            logger.error(error_msg)
+            errors.append(error_msg)
+            continue
+        try:
+            with timer.span("publish", category="file", path=str(final)):
+                transfer.publish_directory(str(staging), str(final))
+            logger.debug(f"Published {final}")
+        except OSError as e:
+            error_msg = f"Failed to publish {final}: {e}"
+            logger.error(error_msg)
+            errors.append(error_msg)
+    return errors
+
+
+def move_groups(
+    movable_groups: List[Dict],
+    source_dir: Path,
+    dest_dir: Path,
+    results: dict,
+    verify: bool = False,
+    throttle: Optional[transfer.Throttle] = None,
+    workers: int = config.DEFAULT_WORKERS,
     quiet: bool = False,
-    scale_darks: bool = False,
-) -> dict:
+    total_bytes: int = 0,
+    mirror_dirs: Sequence[Path] = (),
+    progress: Optional[byte_progress.ByteProgress] = None,
+    timer: Optional[PhaseTimer] = None,
+    locks: Optional[locking.TargetLocks] = None,
+) -> None:
     """
-    Move complete directory groups atomically using discrete steps:
-    1. Collect: Find all light directories recursively
-    2. Filter: Apply pattern to collected directories
-    3. Check: Determine calibration status for each
-    4. Organize: Find movable calibration directories (exclude parents of incomplete)
-    5. Move: Execute atomic directory moves
-    6. Report: Track results and incomplete directories
+    Move groups one at a time: copy (and verify) a group, then delete its source.
+
+    Groups loaded from a move plan carry a "fingerprint" of their files; a
+    group whose files changed since the plan was made is skipped.
+
+    With mirror_dirs, each group is copied to every destination and its source
+    is deleted only when all of them succeeded.
+
+    With locks, a group's target is locked under the source root and every
+    destination root before the group is copied. A group whose target another
+    instance holds, or whose source another instance has already moved, is
+    skipped.
+
+    Deletion of a committed group runs on a background thread while the next
+    group copies. At most one deletion is pending: a group does not start
+    copying until the deletion of the group before the previous one finished,
+    so no more than two consecutive groups exist twice at once. Free space is
+    re-checked before each group, and the move stops when a destination no
+    longer has room (e.g. after failed groups left their copies). A copy error
+    only keeps the affected group in place; healthy groups keep moving. Empty
+    ancestors of deleted groups are pruned at the end.
 
     Args:
-        source_dir: Source directory (e.g., 10_Blink)
-        dest_dir: Destination directory (e.g., 20_Data)
-        path_pattern: Regex pattern to filter paths
-        debug: Enable debug output
-        dry_run: Preview without moving
+        movable_groups: Group plans in processing order (leaf-first)
+        source_dir: Source root directory
+        dest_dir: Destination root directory
+        results: Results dict to update (moved, errors and copy counters)
+        verify: Hash while copying and verify the destination read-back
+        throttle: Optional shared bandwidth/IOPS limits
+        workers: Worker threads for deleting source files
         quiet: Suppress progress output
-        scale_darks: Allow shorter darks with bias frames
+        total_bytes: Bytes planned for the move, for progress and ETA
+        mirror_dirs: Additional destination root directories
+        progress: Progress shared with other moves; the caller closes it and
+            records bytes_copied and copy_seconds. When None, progress for
+            total_bytes is reported and recorded here.
+        timer: Optional timer for the move.copy, move.delete and
+            move.cleanup sub-phases (and per-file trace spans)
+        locks: Optional per-target locks shared with other moves of the run;
+            the caller releases them
+    """
+    if timer is None:
+        timer = PhaseTimer()
+    deletions: List[Tuple[Dict, Future]] = []
+
+    def timed_delete(group_plan: Dict) -> int:
+        with timer.phase("move.delete"):
+            return delete_group(group_plan, workers, timer)
+
+    deleted_groups: List[Path] = []
+    failed_groups = 0
+
+    owns_progress = progress is None
+    if progress is None:
+        progress = byte_progress.ByteProgress(
+            total_bytes, desc="Copying files", enabled=not quiet
+        )
+    with ThreadPoolExecutor(max_workers=1) as deleter:
+        for group_plan in movable_groups:
+            key = str(group_plan["relative_path"])
+            if locks is not None:
+                target = locking.group_target(group_plan["relative_path"])
+                if not locks.acquire([source_dir, dest_dir, *mirror_dirs], target):
+                    holder = locks.holder(target)
+                    logger.warning(
+                        f"Skipping {key}: target {target} is locked by {holder}"
+                    )
+                    results["skipped_locked"] += 1
+                    continue
+                if not Path(group_plan["path"]).is_dir():
+                    logger.warning(f"Skipping {key}: moved by another instance")
+                    results["skipped_locked"] += 1
+                    continue
+            files = list(iter_group_files(group_plan, dest_dir, mirror_dirs))
+            expected = group_plan.get("fingerprint")
+            if expected is not None and expected != move_plan.fingerprint(
+                move_plan.group_entries(Path(group_plan["path"]), files)
+            ):
+                logger.warning(
+                    f"Skipping {key}: files changed since the move plan was made"
+                )
+                results["skipped_stale"] += 1
+                continue
+            if len(deletions) > 1:
+                # Bound the deletion backlog (see capacity.plan_capacity)
+                wait([deletions[-2][1]])
+            copy_bytes = set_bytes_to_copy(group_plan, files, dest_dir, mirror_dirs)
+            short = capacity.room_for([dest_dir, *mirror_dirs], copy_bytes)
+            if short is not None:
+                # Failed groups keep their copies, so the plan can fall short
+                logger.error(
+                    f"Not enough space left on {short['dest']} for {key}: "
+                    f"needs {capacity.format_bytes(short['required_bytes'])}, "
+                    f"{capacity.format_bytes(short['free_bytes'])} free"
+                )
+                logger.error("Stopping; remaining groups were not copied.")
+                results["errors"] += 1
+                break
+            with timer.phase("move.copy"):
+                errors = copy_group(
+                    group_plan,
+                    dest_dir,
+                    results,
+                    verify,
+                    throttle,
+                    progress,
+                    mirror_dirs,
+                    files=files,
+                    timer=timer,
+                )
+            if errors:
+                failed_groups += 1
+                results["errors"] += len(errors)
+                logger.error(f"Group {key} had {len(errors)} copy errors")
+                for error in errors[:10]:  # Show first 10 errors
+                    logger.error(f"  {error}")
+                if len(errors) > 10:
+                    logger.error(f"  ... and {len(errors) - 10} more errors")
+                logger.warning(f"Skipping source deletion for {key}")
+                continue
+            future = deleter.submit(timed_delete, group_plan)
+            deletions.append((group_plan, future))
+        if owns_progress:
+            copy_stats = progress.close()
+            results["bytes_copied"] += copy_stats["bytes"]
+            results["copy_seconds"] += copy_stats["seconds"]
+
+    for group_plan, future in deletions:
+        try:
+            future.result()
+            results["moved"] += 1
+            deleted_groups.append(Path(group_plan["path"]))
+        except Exception as e:
+            error_msg = f"Failed to delete {group_plan['relative_path']}: {e}"
+            logger.error(error_msg)
+            results["errors"] += 1
+
+    if failed_groups:
+        logger.warning(
+            f"Source files for {failed_groups} group(s) remain intact. "
+            "Fix errors and re-run to complete move."
+        )
+
+    if deleted_groups:
+        # Clean up empty parent directories of the groups that moved
+        logger.info("Cleaning up empty directories...")
+        with timer.phase("move.cleanup"):
+            pruned = prune_empty_ancestors(deleted_groups, source_dir)
+        logger.debug(f"Removed {pruned:,} empty directories")
+
+
+def metadata_batches(source_paths: Sequence[Path]) -> List[Tuple[str, bool]]:
+    """
+    Split metadata loading into one batch per first-level directory.
+
+    Args:
+        source_paths: Resolved source directories
 
     Returns:
-        Dict with counts: moved, skipped_*, errors
+        (directory, recursive) pairs: each source root on its own (its
+        top-level files only), then each of its first-level directories
+        with everything below it
     """
-    source_path = Path(ap_common.replace_env_vars(source_dir)).resolve()
-    dest_path = Path(ap_common.replace_env_vars(dest_dir)).resolve()
+    batches = []
+    for source_path in source_paths:
+        batches.append((str(source_path), False))
+        try:
+            entries = sorted(os.scandir(source_path), key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(f"Cannot list {source_path}: {e}")
+            continue
+        batches.extend(
+            (entry.path, True)
+            for entry in entries
+            if entry.name != config.LOCK_DIR_NAME and entry.is_dir()
+        )
+    return batches
 
-    results = {
-        "dir_count": 0,
-        "target_count": 0,
-        "date_count": 0,
-        "filter_count": 0,
-        "moved": 0,
-        "skipped_no_darks": 0,
-        "skipped_no_flats": 0,
-        "skipped_no_bias": 0,
-        "biases_needed": 0,
-        "errors": 0,
-    }
 
-    if not source_path.exists():
-        logger.error(f"Source directory does not exist: {source_path}")
-        return results
+def load_metadata(
+    source_paths: Sequence[Path], debug: bool = False, quiet: bool = False
+) -> Optional[MetadataStore]:
+    """
+    Load metadata for every file under the source directories.
 
-    # Phase 0: Load all metadata upfront (single pass)
-    logger.info("Loading all metadata from source directory...")
+    Metadata is read one first-level directory (usually a target) at a time
+    and each batch is emptied into the store before the next is read, so the
+    peak follows the store's size plus one batch rather than the loader's
+    dict for the whole archive.
+
+    Args:
+        source_paths: Resolved source directories
+        debug: Enable debug output
+        quiet: Suppress progress output
+
+    Returns:
+        MetadataStore covering all sources, or None if loading failed
+    """
+    if len(source_paths) == 1:
+        logger.info("Loading all metadata from source directory...")
+    else:
+        logger.info(
+            f"Loading all metadata from {len(source_paths)} source directories..."
+        )
+    metadata_cache = MetadataStore(
+        config.ALL_REQUIRED_KEYWORDS, path_key=NORMALIZED_HEADER_FILENAME
+    )
     try:
-        metadata_cache = ap_common.get_metadata(
-            dirs=[str(source_path)],
-            profileFromPath=True,
-            patterns=config.SUPPORTED_EXTENSIONS,
-            recursive=True,
-            # Request union of all properties needed for any frame type matching
-            # This ensures ALL files get enriched with actual FITS/XISF headers
-            # (not just filename metadata), even if the filename
-            # contains some properties
-            required_properties=config.ALL_REQUIRED_KEYWORDS,
-            debug=debug,
-            printStatus=not quiet,
+        for directory, recursive in progress_iter(
+            metadata_batches(source_paths), desc="Loading metadata", enabled=not quiet
+        ):
+            loaded = ap_common.get_metadata(
+                dirs=[directory],
+                profileFromPath=True,
+                patterns=config.SUPPORTED_EXTENSIONS,
+                recursive=recursive,
+                # Request union of all properties needed for any frame type
+                # matching. This ensures ALL files get enriched with actual
+                # FITS/XISF headers (not just filename metadata), even if the
+                # filename contains some properties
+                required_properties=config.ALL_REQUIRED_KEYWORDS,
+                debug=debug,
+                printStatus=False,
+            )
+            # Keep only the matching keywords, compactly
+            metadata_cache.consume(loaded)
+        logger.debug(
+            f"Loaded metadata for {len(metadata_cache):,} files "
+            f"({metadata_cache.stats()['records']:,} distinct records)"
         )
-        logger.debug(f"Loaded metadata for {len(metadata_cache):,} files")
+        return metadata_cache
     except (OSError, ValueError) as e:
         # If metadata loading fails (e.g., corrupt files), fall back to lazy loading
         logger.warning(f"Failed to load metadata cache: {e}")
         logger.warning("Falling back to lazy metadata loading (will be slower)")
-        metadata_cache = None
+        return None
+
+
+def analyze_light_directories(
+    source_path: Path,
+    path_pattern: Optional[str],
+    results: dict,
+    debug: bool = False,
+    quiet: bool = False,
+    scale_darks: bool = False,
+    metadata_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+    timer: Optional[PhaseTimer] = None,
+    check_workers: int = 1,
+    blocked_state: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run the analysis steps of a move: load metadata, collect, filter, check
+    and organize light directories into movable groups.
+
+    Args:
+        source_path: Resolved source directory
+        path_pattern: Regex pattern to filter paths
+        results: Results dict to update with directory and calibration counts
+        debug: Enable debug output
+        quiet: Suppress progress output
+        scale_darks: Allow shorter darks with bias frames
+        metadata_cache: Metadata already loaded for source_path (e.g. shared
+            with other sources); loaded here when None
+        timer: Optional timer for the load, collect, filter, check and
+            organize phases
+        check_workers: Processes for the calibration check (sharded by
+            target); 1 checks in this process
+        blocked_state: Optional saved blocked directories (see
+            blocked.load_index); those still blocked are not checked again,
+            and the state is updated with this run's incomplete directories
+
+    Returns:
+        Dict from organize_into_movable_groups, or None when there is nothing
+        to analyze
+    """
+    if timer is None:
+        timer = PhaseTimer()
+
+    # Phase 0: Load all metadata upfront (single pass)
+    if metadata_cache is None:
+        with timer.phase("load"):
+            metadata_cache = load_metadata([source_path], debug, quiet)
 
     # Step 1: COLLECT
-    all_light_dirs = find_all_light_directories(
-        root_dir=str(source_path),
-        metadata_cache=metadata_cache if metadata_cache is not None else {},
-        debug=debug,
-    )
+    with timer.phase("collect"):
+        all_light_dirs = find_all_light_directories(
+            root_dir=str(source_path),
+            metadata_cache=metadata_cache if metadata_cache is not None else {},
+            debug=debug,
+        )
 
     if not all_light_dirs:
         logger.warning(f"No light directories found in {source_path}")
-        return results
+        return None
 
     # Step 2: FILTER
-    filtered_light_dirs = filter_by_pattern(all_light_dirs, path_pattern)
+    with timer.phase("filter"):
+        filtered_light_dirs = filter_by_pattern(all_light_dirs, path_pattern)
 
     if not filtered_light_dirs:
         logger.warning(f"No light directories matched pattern in {source_path}")
-        return results
+        return None
 
     results["dir_count"] = len(filtered_light_dirs)
 
@@ -527,17 +1554,37 @@ def process_light_directories(
     results["target_count"] = len(targets)
 
     # Step 3: CHECK
-    status_map = check_light_directories(
-        filtered_light_dirs, source_path, scale_darks, debug, quiet, metadata_cache
-    )
+    with timer.phase("check"):
+        cache = metadata_cache if metadata_cache is not None else {}
+        lights: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        carried: Dict[str, DirectoryStatus] = {}
+        if blocked_state is not None:
+            lights = summarize_lights(filtered_light_dirs, cache)
+            carried = reuse_blocked_statuses(blocked_state, lights, cache)
+        checked = check_light_directories_parallel(
+            [d for d in filtered_light_dirs if d not in carried],
+            source_path,
+            scale_darks,
+            debug,
+            quiet,
+            cache,
+            check_workers,
+            timer=timer,
+        )
+        status_map = {
+            d: carried[d] if d in carried else checked[d]
+            for d in filtered_light_dirs
+            if d in carried or d in checked
+        }
+        if blocked_state is not None:
+            update_blocked_state(blocked_state, source_path, status_map, lights, cache)
 
     # Step 4: ORGANIZE
-    organized = organize_into_movable_groups(status_map, source_path)
-    movable_groups = organized["movable_groups"]
-    incomplete_dirs = organized["incomplete_dirs"]
+    with timer.phase("organize"):
+        organized = organize_into_movable_groups(status_map, source_path)
 
     # Process incomplete dirs for metrics
-    for light_dir, missing in incomplete_dirs:
+    for light_dir, missing in organized["incomplete_dirs"]:
         if "darks" in missing:
             results["skipped_no_darks"] += 1
         if "flats" in missing:
@@ -546,105 +1593,500 @@ def process_light_directories(
             results["skipped_no_bias"] += 1
             results["biases_needed"] += 1
 
-    # Step 5: MOVE groups atomically
+    return organized
+
+
+def load_move_plan(
+    plan_path: str, source_path: Path, dest_path: Path, results: dict
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a saved move plan in place of the analysis steps.
+
+    Args:
+        plan_path: Plan file written with plan_out
+        source_path: Resolved source directory, which must match the plan
+        dest_path: Resolved destination directory, which must match the plan
+        results: Results dict to restore analysis counts into
+
+    Returns:
+        Dict shaped like organize_into_movable_groups output, or None if the
+        plan cannot be used (an error is logged and counted)
+    """
+    try:
+        saved_plan = move_plan.load_plan(plan_path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot load move plan {plan_path}: {e}")
+        results["errors"] += 1
+        return None
+
+    for key, path in (("source_dir", source_path), ("dest_dir", dest_path)):
+        if Path(saved_plan[key]) != path:
+            logger.error(
+                f"Move plan {plan_path} was made for {key} {saved_plan[key]}, "
+                f"not {path}"
+            )
+            results["errors"] += 1
+            return None
+
+    results.update(saved_plan["analysis"])
+    logger.info(
+        f"Applying move plan {plan_path} ({len(saved_plan['groups']):,} groups)"
+    )
+    return {
+        "movable_groups": move_plan.plan_groups(saved_plan),
+        "incomplete_dirs": [
+            (light_dir, missing) for light_dir, missing in saved_plan["incomplete_dirs"]
+        ],
+    }
+
+
+def new_results() -> dict:
+    """Zeroed results dict (see process_light_directories)."""
+    return {
+        "dir_count": 0,
+        "target_count": 0,
+        "date_count": 0,
+        "filter_count": 0,
+        "moved": 0,
+        "skipped_no_darks": 0,
+        "skipped_no_flats": 0,
+        "skipped_no_bias": 0,
+        "biases_needed": 0,
+        "copied": 0,
+        "skipped_identical": 0,
+        "bytes_planned": 0,
+        "verified": 0,
+        "bytes_copied": 0,
+        "copy_seconds": 0.0,
+        "skipped_stale": 0,
+        "skipped_locked": 0,
+        "files_scanned": 0,
+        "errors": 0,
+    }
+
+
+def prepare_source_move(
+    source_path: Path,
+    dest_path: Path,
+    mirror_paths: Sequence[Path],
+    path_pattern: Optional[str],
+    results: dict,
+    debug: bool = False,
+    quiet: bool = False,
+    scale_darks: bool = False,
+    metadata_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+    plan_out: Optional[str] = None,
+    apply_plan: Optional[str] = None,
+    timer: Optional[PhaseTimer] = None,
+    check_workers: int = 1,
+    blocked_state: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Steps 1-4 for one source: analyze (or load a plan), order the groups and
+    plan capacity.
+
+    Args:
+        source_path: Resolved source directory
+        dest_path: Resolved destination directory
+        mirror_paths: Resolved additional destination directories
+        path_pattern: Regex pattern to filter paths
+        results: Results dict for this source
+        debug: Enable debug output
+        quiet: Suppress progress output
+        scale_darks: Allow shorter darks with bias frames
+        metadata_cache: Metadata already loaded for source_path
+        plan_out: Write the analyzed move plan to this JSON file
+        apply_plan: Use the groups of this plan instead of analyzing
+        timer: Optional timer for the analysis and capacity planning phases
+        check_workers: Processes for the calibration check
+        blocked_state: Optional saved blocked directories, read and updated
+            by the analysis (see analyze_light_directories)
+
+    Returns:
+        Dict with source, dest, mirrors, source_device, results,
+        movable_groups (leaf-first), incomplete_dirs and capacity (from
+        plan_capacity), or None when there is nothing to move
+    """
+    if timer is None:
+        timer = PhaseTimer()
+
+    if apply_plan is not None:
+        with timer.phase("load_plan"):
+            organized = load_move_plan(apply_plan, source_path, dest_path, results)
+    else:
+        organized = analyze_light_directories(
+            source_path,
+            path_pattern,
+            results,
+            debug,
+            quiet,
+            scale_darks,
+            metadata_cache=metadata_cache,
+            timer=timer,
+            check_workers=check_workers,
+            blocked_state=blocked_state,
+        )
+    if organized is None:
+        return None
+    incomplete_dirs = organized["incomplete_dirs"]
+
     # Sort groups in leaf-first order (deepest first)
     # This prevents broken states where calibration exists without lights
-    movable_groups_ordered = sort_groups_leaf_first(movable_groups)
+    movable_groups_ordered = sort_groups_leaf_first(organized["movable_groups"])
 
-    if not dry_run:
-        # Phase 1: Copy all files (leaf-first order)
-        # Collect all files to copy
+    # Plan capacity before any bytes move
+    with timer.phase("capacity"):
         logger.debug("Analyzing files to move...")
-        all_files = collect_all_files_in_groups(movable_groups_ordered, dest_path)
+        planned_files: Iterable[Dict[str, Any]] = iter_files_to_copy(
+            movable_groups_ordered, dest_path, mirror_paths
+        )
+        if plan_out is not None:
+            planned_files = list(planned_files)
+            saved_plan = move_plan.build_plan(
+                source_path,
+                dest_path,
+                movable_groups_ordered,
+                planned_files,
+                incomplete_dirs,
+                results,
+                {"path_pattern": path_pattern, "scale_darks": scale_darks},
+            )
+            try:
+                move_plan.write_plan(saved_plan, plan_out)
+                logger.info(f"Wrote move plan to {plan_out}")
+            except OSError as e:
+                logger.error(f"Failed to write move plan {plan_out}: {e}")
+                results["errors"] += 1
+        capacity_plan = capacity.plan_capacity(
+            planned_files,
+            movable_groups_ordered,
+            source_path,
+            dest_path,
+            mirror_paths,
+        )
+    results["bytes_planned"] = capacity_plan["total_bytes"]
+
+    return {
+        "source": source_path,
+        "dest": dest_path,
+        "mirrors": mirror_paths,
+        "source_device": os.stat(source_path).st_dev,
+        "results": results,
+        "movable_groups": movable_groups_ordered,
+        "incomplete_dirs": incomplete_dirs,
+        "capacity": capacity_plan,
+    }
 
-        logger.debug(
-            f"Copying {len(all_files):,} files "
-            f"across {len(movable_groups):,} directories..."
+
+def group_into_lanes(source_moves: List[Dict[str, Any]]) -> List[List[Dict]]:
+    """
+    Split per-source moves into lanes that can run concurrently.
+
+    Moves sharing a device, as source or as any destination, land in the same
+    lane and run one after another, so concurrent lanes never compete for a
+    disk.
+
+    Args:
+        source_moves: Results of prepare_source_move, in processing order
+
+    Returns:
+        Lanes in order of their first move, each keeping the moves' order
+    """
+    move_devices = []
+    for source_move in source_moves:
+        devices = {source_move["source_device"]}
+        devices.update(d["device"] for d in source_move["capacity"]["destinations"])
+        move_devices.append(devices)
+
+    # Merge overlapping device sets; the sets stay pairwise disjoint
+    device_sets: List[Set[int]] = []
+    for devices in move_devices:
+        merged = set(devices)
+        for other in device_sets:
+            if other & merged:
+                merged |= other
+        device_sets = [other for other in device_sets if not other & merged]
+        device_sets.append(merged)
+
+    lanes: Dict[int, List[Dict[str, Any]]] = {}
+    for source_move, devices in zip(source_moves, move_devices):
+        lane = next(i for i, other in enumerate(device_sets) if other & devices)
+        lanes.setdefault(lane, []).append(source_move)
+    return list(lanes.values())
+
+
+def process_light_directories(
+    source_dir: str,
+    dest_dir: str,
+    path_pattern: str,
+    debug: bool = False,
+    dry_run: bool = False,
+    quiet: bool = False,
+    scale_darks: bool = False,
+    verify: bool = False,
+    max_bytes_per_sec: Optional[int] = None,
+    max_iops: Optional[int] = None,
+    workers: int = config.DEFAULT_WORKERS,
+    mirror_dirs: Optional[List[str]] = None,
+    plan_out: Optional[str] = None,
+    apply_plan: Optional[str] = None,
+    extra_pairs: Optional[List[Tuple[str, str]]] = None,
+    tracer: Optional[Tracer] = None,
+    check_workers: int = 1,
+    blocked_index: Optional[str] = None,
+) -> dict:
+    """
+    Move complete directory groups atomically using discrete steps:
+    1. Collect: Find all light directories recursively
+    2. Filter: Apply pattern to collected directories
+    3. Check: Determine calibration status for each
+    4. Organize: Find movable calibration directories (exclude parents of incomplete)
+       and check the destination has room for them
+    5. Move: Copy each group, then delete its source (pipelined per group)
+    6. Report: Track results and incomplete directories
+
+    Steps 1-4 can be saved with plan_out and skipped later with apply_plan.
+    With blocked_index, light directories found incomplete are saved, and the
+    next run re-checks only those whose lights or nearby calibration changed.
+
+    With extra_pairs, each additional source moves to its own destination.
+    Metadata for all sources is loaded in one pass, copies share the bandwidth
+    and IOPS limits, and sources whose devices do not overlap move
+    concurrently.
+
+    Each group's target is locked (see locking) before it moves, so several
+    instances can run at once; groups another instance holds are skipped.
+
+    Args:
+        source_dir: Source directory (e.g., 10_Blink)
+        dest_dir: Destination directory (e.g., 20_Data)
+        path_pattern: Regex pattern to filter paths
+        debug: Enable debug output
+        dry_run: Preview without moving
+        quiet: Suppress progress output
+        scale_darks: Allow shorter darks with bias frames
+        verify: Hash each file while copying and compare against a read-back
+            of the destination before deleting any source group
+        max_bytes_per_sec: Optional bandwidth limit shared by all copies
+        max_iops: Optional limit on read/write operations per second
+        workers: Worker threads for parallel file operations (source deletion)
+        mirror_dirs: Additional destination directories (e.g. a backup disk)
+            written from the same source read as dest_dir
+        plan_out: Write the analyzed move plan to this JSON file
+        apply_plan: Move the groups of a plan written by plan_out instead of
+            analyzing again; groups whose files changed are skipped
+        extra_pairs: Additional (source_dir, dest_dir) pairs; not combinable
+            with plan_out or apply_plan
+        tracer: Optional tracer recording phases, per-directory checks and
+            per-file copies and deletes as trace spans
+        check_workers: Processes for the calibration check, sharded by
+            first-level target (1 checks in this process)
+        blocked_index: JSON file of blocked light directories, read before
+            the check and rewritten after it (not used with apply_plan)
+
+    Returns:
+        Dict with counts: moved, copied, skipped_*, verified, errors (summed
+        over all sources), plus timings (seconds per phase, see PhaseTimer)
+    """
+    results = new_results()
+    timer = PhaseTimer(tracer=tracer)
+
+    if extra_pairs and (plan_out is not None or apply_plan is not None):
+        logger.error("Move plans cover a single source and destination")
+        results["errors"] += 1
+        return results
+
+    pairs = [(source_dir, dest_dir, mirror_dirs or [])]
+    pairs.extend((source, dest, []) for source, dest in extra_pairs or [])
+    resolved = []
+    for source, dest, mirrors in pairs:
+        source_path = Path(ap_common.replace_env_vars(source)).resolve()
+        if not source_path.exists():
+            logger.error(f"Source directory does not exist: {source_path}")
+            continue
+        resolved.append(
+            (
+                source_path,
+                Path(ap_common.replace_env_vars(dest)).resolve(),
+                [
+                    Path(ap_common.replace_env_vars(mirror)).resolve()
+                    for mirror in mirrors
+                ],
+            )
         )
+    if not resolved:
+        return results
 
-        # Copy with file-level progress
-        copy_errors = []
-        for file_info in progress_iter(
-            all_files,
-            desc="Copying files",
-            unit="files",
-            enabled=not quiet,
-        ):
+    # Phase 0: Load metadata for every source in a single pass
+    metadata_cache: Optional[Mapping[str, Dict[str, Any]]] = None
+    if apply_plan is None:
+        with timer.phase("load"):
+            metadata_cache = load_metadata(
+                [source for source, _, _ in resolved], debug, quiet
+            )
+        if metadata_cache is None:
+            metadata_cache = {}
+        results["files_scanned"] = len(metadata_cache)
+
+    blocked_state: Optional[Dict[str, Any]] = None
+    if blocked_index is not None and apply_plan is None:
+        blocked_state = {"directories": {}, "calibration": {}}
+        if os.path.exists(blocked_index):
             try:
-                ap_common.copy_file(
-                    file_info["source"],
-                    file_info["dest"],
-                    debug=debug,
-                    dryrun=dry_run,
-                )
-            except Exception as e:
-                error_msg = f"Failed to copy {file_info['source']}: {e}"
-                logger.error(error_msg)
-                copy_errors.append(error_msg)
-                # Continue copying other files even if one fails
+                blocked_state = blocked_dirs.load_index(blocked_index, scale_darks)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Checking every directory again: {e}")
+
+    # Steps 1-4 per source
+    source_moves = []
+    source_results = []
+    for source_path, dest_path, mirror_paths in resolved:
+        pair_results = new_results()
+        source_results.append(pair_results)
+        source_move = prepare_source_move(
+            source_path,
+            dest_path,
+            mirror_paths,
+            path_pattern,
+            pair_results,
+            debug,
+            quiet,
+            scale_darks,
+            metadata_cache=metadata_cache,
+            plan_out=plan_out,
+            apply_plan=apply_plan,
+            timer=timer,
+            check_workers=check_workers,
+            blocked_state=blocked_state,
+        )
+        if source_move is not None:
+            source_moves.append(source_move)
 
-        # Report copy phase results
-        if copy_errors:
-            logger.error(f"Copy phase had {len(copy_errors)} errors")
-            for error in copy_errors[:10]:  # Show first 10 errors
-                logger.error(f"  {error}")
-            if len(copy_errors) > 10:
-                logger.error(f"  ... and {len(copy_errors) - 10} more errors")
-            results["errors"] += len(copy_errors)
-
-        # Phase 2: Delete source groups (only if copy succeeded)
-        if not copy_errors:
-            logger.info(f"Deleting {len(movable_groups):,} source directories...")
-
-            for group_plan in movable_groups_ordered:
-                source_group = Path(group_plan["path"])
-                try:
-                    shutil.rmtree(source_group)
-                    results["moved"] += 1
-                    logger.debug(f"Deleted source group: {group_plan['relative_path']}")
-                except Exception as e:
-                    error_msg = f"Failed to delete {group_plan['relative_path']}: {e}"
-                    logger.error(error_msg)
-                    results["errors"] += 1
-
-            # Clean up empty parent directories
-            logger.info("Cleaning up empty directories...")
-            ap_common.delete_empty_directories(
-                str(source_path),
-                dryrun=dry_run,
-                printStatus=not quiet,
+    if blocked_state is not None and blocked_index is not None:
+        try:
+            blocked_dirs.write_index(blocked_state, blocked_index, scale_darks)
+            logger.info(
+                f"Saved {len(blocked_state['directories']):,} blocked light "
+                f"directories to {blocked_index}"
             )
-        else:
-            logger.warning("Skipping source deletion due to copy errors")
-            logger.warning(
-                "Source files remain intact. Fix errors and re-run to complete move."
+        except OSError as e:
+            logger.error(
+                f"Failed to write blocked-directory index {blocked_index}: {e}"
             )
-    else:
+            results["errors"] += 1
+
+    # Destinations shared between sources need room for all of them
+    combined = capacity.combine_plans([m["capacity"] for m in source_moves])
+    if not combined["fits"]:
+        for destination in combined["destinations"]:
+            if destination["fits"]:
+                continue
+            logger.error(
+                f"Not enough space on destination {destination['dest']}: "
+                f"move needs "
+                f"{capacity.format_bytes(destination['required_bytes'])} "
+                f"(plus {capacity.format_bytes(config.FREE_SPACE_RESERVE_BYTES)} "
+                f"reserve), {capacity.format_bytes(destination['free_bytes'])} free"
+            )
+        logger.error("Refusing to move; no files were copied or deleted.")
+        results["errors"] += 1
+
+    # Step 5: MOVE groups atomically
+    if not dry_run and combined["fits"] and source_moves:
+        throttle = transfer.Throttle(max_bytes_per_sec, max_iops)
+        progress = byte_progress.ByteProgress(
+            combined["total_bytes"], desc="Copying files", enabled=not quiet
+        )
+        locks = locking.TargetLocks()
+
+        def run_lane(lane: List[Dict[str, Any]]) -> None:
+            for source_move in lane:
+                logger.debug(
+                    f"Copying {source_move['capacity']['file_count']:,} files "
+                    f"across {len(source_move['movable_groups']):,} directories..."
+                )
+                move_groups(
+                    source_move["movable_groups"],
+                    source_move["source"],
+                    source_move["dest"],
+                    source_move["results"],
+                    verify=verify,
+                    throttle=throttle,
+                    workers=workers,
+                    quiet=quiet,
+                    total_bytes=source_move["capacity"]["total_bytes"],
+                    mirror_dirs=source_move["mirrors"],
+                    progress=progress,
+                    timer=timer,
+                    locks=locks,
+                )
+
+        lanes = group_into_lanes(source_moves)
+        with locks, timer.phase("move"):
+            if len(lanes) == 1:
+                run_lane(lanes[0])
+            else:
+                logger.info(
+                    f"Moving {len(source_moves)} sources in {len(lanes)} "
+                    "concurrent lanes (one per set of devices)"
+                )
+                with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+                    for future in [executor.submit(run_lane, lane) for lane in lanes]:
+                        future.result()
+        copy_stats = progress.close()
+        results["bytes_copied"] += copy_stats["bytes"]
+        results["copy_seconds"] += copy_stats["seconds"]
+    elif dry_run:
         # Dry-run: just count what would be moved
-        movable_groups_ordered = sort_groups_leaf_first(movable_groups)
-        all_files = collect_all_files_in_groups(movable_groups_ordered, dest_path)
-        results["moved"] = len(movable_groups)
-        logger.info(
-            f"DRY RUN: Would move {len(all_files):,} files "
-            f"across {len(movable_groups):,} directories"
+        bytes_per_sec = min(
+            config.ESTIMATED_COPY_BYTES_PER_SEC,
+            max_bytes_per_sec or config.ESTIMATED_COPY_BYTES_PER_SEC,
         )
+        for source_move in source_moves:
+            source_move["results"]["moved"] = len(source_move["movable_groups"])
+            capacity_plan = source_move["capacity"]
+            estimate = capacity.estimate_duration(
+                capacity_plan["total_bytes"], bytes_per_sec
+            )
+            mirror_count = len(source_move["mirrors"])
+            fan_out = f" to {mirror_count + 1} destinations" if mirror_count else ""
+            logger.info(
+                f"DRY RUN: Would move {capacity_plan['file_count']:,} files "
+                f"({capacity.format_bytes(capacity_plan['total_bytes'])}) "
+                f"across {len(source_move['movable_groups']):,} "
+                f"directories{fan_out}, "
+                f"estimated {capacity.format_duration(estimate)} at "
+                f"{capacity.format_bytes(bytes_per_sec)}/s"
+            )
 
     # Step 6: REPORT incomplete directories
-    if incomplete_dirs and not quiet:
-        print("\nThe following directories are missing calibration:")
-        for light_dir, missing in incomplete_dirs:
-            try:
-                rel = Path(light_dir).relative_to(source_path)
-                missing_str = ", ".join(missing)
-                print(f"  - {rel} (missing: {missing_str})")
-            except ValueError:
-                pass
-
+    with timer.phase("report"):
+        if not quiet and any(m["incomplete_dirs"] for m in source_moves):
+            print("\nThe following directories are missing calibration:")
+            for source_move in source_moves:
+                source_path = source_move["source"]
+                # Name the source when several share the report
+                base = source_path.parent if len(resolved) > 1 else source_path
+                for light_dir, missing in source_move["incomplete_dirs"]:
+                    try:
+                        rel = Path(light_dir).relative_to(base)
+                        missing_str = ", ".join(missing)
+                        print(f"  - {rel} (missing: {missing_str})")
+                    except ValueError:
+                        pass
+
+    for pair_results in source_results:
+        for key, value in pair_results.items():
+            results[key] += value
+    results["timings"] = timer.as_dict()
+    timer.log()
     return results
 
 
-def print_summary(results: dict, scale_darks: bool = False) -> None:
-    """Print summary of processing results."""
+def print_summary(
+    results: dict, scale_darks: bool = False, show_timings: bool = False
+) -> None:
+    """Print summary of processing results (with per-phase timings if asked)."""
 
     def plural(count: int, singular: str) -> str:
         return f"{count} {singular}{'s' if count != 1 else ''}"
@@ -685,90 +2127,37 @@ def print_summary(results: dict, scale_darks: bool = False) -> None:
         f"{status_indicator(dir_count - results['skipped_no_flats'], dir_count)}"
     )
 
+    if results.get("skipped_identical", 0) > 0:
+        print(f"Already at destination: {plural(results['skipped_identical'], 'file')}")
+    if results.get("bytes_copied", 0) > 0:
+        seconds = results.get("copy_seconds", 0.0)
+        rate = results["bytes_copied"] / seconds if seconds > 0 else 0.0
+        print(
+            f"Copied: {capacity.format_bytes(results['bytes_copied'])} in "
+            f"{capacity.format_duration(seconds)} "
+            f"({capacity.format_bytes(rate)}/s)"
+        )
+    if results.get("skipped_stale", 0) > 0:
+        print(
+            f"Changed since plan: {plural(results['skipped_stale'], 'group')} "
+            "(re-run without --apply-plan to re-analyze)"
+        )
+    if results.get("skipped_locked", 0) > 0:
+        print(
+            f"Locked by another instance: "
+            f"{plural(results['skipped_locked'], 'group')} (re-run to move them)"
+        )
     if results["errors"] > 0:
         print(f"Errors: {results['errors']}")
+    if show_timings and results.get("timings"):
+        print("Timings:")
+        for name, seconds in results["timings"].items():
+            # Sub-phases (e.g. "move.copy") are indented under their phase
+            depth = name.count(".")
+            label = name.rsplit(".", 1)[-1]
+            print(f"  {'  ' * depth}{label:<{14 - 2 * depth}}{seconds:9.2f}s")
     print(f"{'='*70}\n")
 
 
-def main() -> int:
-    """Main entry point for CLI."""
-    parser = argparse.ArgumentParser(
-        description=(
-            "Move complete directory groups containing "
-            "light frames and calibration atomically."
-        )
-    )
-
-    parser.add_argument("source_dir", help="source directory containing lights")
-    parser.add_argument("dest_dir", help="destination directory for lights")
-    parser.add_argument(
-        "--debug", "-d", action="store_true", help="Enable debug output"
-    )
-    parser.add_argument(
-        "--dryrun", "-n", action="store_true", help="Preview without moving"
-    )
-    parser.add_argument(
-        "--quiet", "-q", action="store_true", help="Suppress progress output"
-    )
-    parser.add_argument(
-        "--scale-dark",
-        action=argparse.BooleanOptionalAction,
-        default=False,
-        help="scale dark frames using bias compensation (allows shorter exposures). "
-        "Default: exact exposure match only",
-    )
-    parser.add_argument(
-        "--path-pattern",
-        type=str,
-        default=config.DEFAULT_PATH_PATTERN,
-        help=(
-            "Regex pattern to filter paths "
-            f'(default: "{config.DEFAULT_PATH_PATTERN}")'
-        ),
-    )
-
-    args = parser.parse_args()
-
-    # Setup logging
-    setup_logging(name="ap_move_light_to_data", debug=args.debug, quiet=args.quiet)
-
-    # Validate directories
-    source_path = Path(ap_common.replace_env_vars(args.source_dir))
-    if not source_path.exists():
-        print(f"ERROR: Source directory does not exist: {source_path}")
-        return EXIT_ERROR
-    if not source_path.is_dir():
-        print(f"ERROR: Source path is not a directory: {source_path}")
-        return EXIT_ERROR
-
-    dest_path = Path(ap_common.replace_env_vars(args.dest_dir))
-    if dest_path.exists() and not dest_path.is_dir():
-        print(f"ERROR: Destination exists but is not a directory: {dest_path}")
-        return EXIT_ERROR
-
-    print(f"Source directory: {args.source_dir}")
-    print(f"Destination directory: {args.dest_dir}")
-
-    if args.dryrun:
-        print("\n*** DRY RUN - No files will be moved ***\n")
-
-    results = process_light_directories(
-        args.source_dir,
-        args.dest_dir,
-        args.path_pattern,
-        args.debug,
-        args.dryrun,
-        args.quiet,
-        args.scale_dark,
-    )
-
-    if not args.quiet:
-        print_summary(results, scale_darks=args.scale_dark)
-
-    return EXIT_ERROR if results["errors"] > 0 else EXIT_SUCCESS
-
-
 if __name__ == "__main__":
-    import sys
-
     sys.exit(main())
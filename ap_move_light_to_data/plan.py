@@ -0,0 +1,259 @@
+"""
+Serialized move plans.
+
+A plan records what the analysis phases decided (movable groups, their files
+and sizes, incomplete directories and summary counts) so a move can be
+reviewed and applied later without loading metadata again. Each group carries
+a fingerprint of its files (relative path, size and modification time);
+applying a plan re-lists each group and skips any whose fingerprint changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .status import MovableGroup
+
+PLAN_VERSION = 1
+
+# Result counters produced by analysis, restored when applying a plan
+ANALYSIS_KEYS = (
+    "dir_count",
+    "target_count",
+    "date_count",
+    "filter_count",
+    "skipped_no_darks",
+    "skipped_no_flats",
+    "skipped_no_bias",
+    "biases_needed",
+)
+
+FileEntry = Tuple[str, int, int]
+
+
+def group_entries(group_path: Path, files: Iterable[Dict[str, Any]]) -> List[FileEntry]:
+    """
+    Reduce a group's file dicts to sorted (relative path, size, mtime_ns) entries.
+
+    Args:
+        group_path: Source directory of the group
+        files: File dicts with "source", "size" and "mtime_ns" (see
+            iter_group_files)
+
+    Returns:
+        Entries sorted by relative path, using "/" separators
+    """
+    prefix_len = len(str(group_path)) + 1
+    return sorted(
+        (
+            file_info["source"][prefix_len:].replace(os.sep, "/"),
+            file_info["size"],
+            file_info["mtime_ns"],
+        )
+        for file_info in files
+    )
+
+
+def fingerprint(entries: Sequence[FileEntry]) -> str:
+    """
+    Hash a group's sorted file entries.
+
+    Args:
+        entries: (relative path, size, mtime_ns) tuples in sorted order
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    hasher = hashlib.sha256()
+    for relative, size, mtime_ns in entries:
+        hasher.update(f"{relative}\0{size}\0{mtime_ns}\n".encode())
+    return hasher.hexdigest()
+
+
+def build_plan(
+    source_dir: Path,
+    dest_dir: Path,
+    movable_groups: List[Dict],
+    files: Iterable[Dict[str, Any]],
+    incomplete_dirs: List[Tuple[str, List[str]]],
+    results: Dict[str, Any],
+    options: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Build a serializable plan from analysis output.
+
+    Args:
+        source_dir: Resolved source root directory
+        dest_dir: Resolved destination root directory
+        movable_groups: Group plans in processing order
+        files: File dicts for every group (see iter_files_in_groups)
+        incomplete_dirs: (light_dir, missing) pairs from organization
+        results: Results dict holding the analysis counters
+        options: Analysis options worth recording (e.g. path pattern)
+
+    Returns:
+        Plan dict (see write_plan)
+    """
+    files_by_group: Dict[str, List[Dict[str, Any]]] = {
+        str(g["relative_path"]): [] for g in movable_groups
+    }
+    for file_info in files:
+        files_by_group[str(file_info["group"])].append(file_info)
+
+    groups = []
+    for group_plan in movable_groups:
+        entries = group_entries(
+            Path(group_plan["path"]), files_by_group[str(group_plan["relative_path"])]
+        )
+        groups.append(
+            {
+                "path": str(group_plan["path"]),
+                "relative_path": str(group_plan["relative_path"]),
+                "bytes": sum(size for _, size, _ in entries),
+                "fingerprint": fingerprint(entries),
+                "files": [list(entry) for entry in entries],
+            }
+        )
+
+    return {
+        "version": PLAN_VERSION,
+        "source_dir": str(source_dir),
+        "dest_dir": str(dest_dir),
+        "options": options,
+        "analysis": {key: results[key] for key in ANALYSIS_KEYS},
+        "incomplete_dirs": [[d, list(missing)] for d, missing in incomplete_dirs],
+        "groups": groups,
+    }
+
+
+def write_plan(plan: Dict[str, Any], path: str) -> None:
+    """
+    Write a plan as JSON, replacing any existing file atomically.
+
+    Args:
+        plan: Plan dict from build_plan
+        path: Output file path
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=1)
+        f.write("\n")
+    os.replace(temp_path, path)
+
+
+def load_plan(path: str) -> Dict[str, Any]:
+    """
+    Read and check a plan written by write_plan.
+
+    Args:
+        path: Plan file path
+
+    Returns:
+        Plan dict
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a valid plan for this version, lacks a
+            key or holds one of the wrong type, or a group's file list does
+            not match its fingerprint
+    """
+    with open(path, encoding="utf-8") as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan file: {path}")
+    _check(plan, path, "source_dir", str)
+    _check(plan, path, "dest_dir", str)
+    analysis = _check(plan, path, "analysis", dict)
+    for key in ANALYSIS_KEYS:
+        _check(analysis, path, key, int, "analysis.")
+    for index, item in enumerate(_check(plan, path, "incomplete_dirs", list)):
+        if not (
+            isinstance(item, list)
+            and len(item) == 2
+            and isinstance(item[0], str)
+            and isinstance(item[1], list)
+        ):
+            raise ValueError(
+                f"Plan file {path} is corrupt: incomplete_dirs[{index}] is not "
+                "a [directory, missing] pair"
+            )
+    for index, group in enumerate(_check(plan, path, "groups", list)):
+        where = f"groups[{index}]."
+        if not isinstance(group, dict):
+            raise ValueError(
+                f"Plan file {path} is corrupt: groups[{index}] is not an object"
+            )
+        for key in ("path", "relative_path", "fingerprint"):
+            _check(group, path, key, str, where)
+        entries = []
+        for file_index, entry in enumerate(_check(group, path, "files", list, where)):
+            if not (
+                isinstance(entry, list)
+                and len(entry) == 3
+                and isinstance(entry[0], str)
+                and all(
+                    isinstance(v, int) and not isinstance(v, bool) for v in entry[1:]
+                )
+            ):
+                raise ValueError(
+                    f"Plan file {path} is corrupt: {where}files[{file_index}] is "
+                    "not a [path, size, mtime_ns] entry"
+                )
+            entries.append((entry[0], entry[1], entry[2]))
+        if fingerprint(entries) != group["fingerprint"]:
+            raise ValueError(
+                f"Plan file {path} is corrupt: group {group['relative_path']} "
+                "does not match its fingerprint"
+            )
+    return plan
+
+
+def _check(
+    mapping: Dict[str, Any], path: str, key: str, kind: type, where: str = ""
+) -> Any:
+    """
+    Get a required plan value, refusing the plan if it is missing or mistyped.
+
+    Args:
+        mapping: Plan dict or a nested part of it
+        path: Plan file path, for the error message
+        key: Required key
+        kind: Type the value must have
+        where: Prefix locating mapping in the plan (e.g. "groups[0].")
+
+    Returns:
+        The value
+
+    Raises:
+        ValueError: Naming the key at fault
+    """
+    if key not in mapping:
+        raise ValueError(f"Plan file {path} is corrupt: {where}{key} is missing")
+    value = mapping[key]
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise ValueError(
+            f"Plan file {path} is corrupt: {where}{key} is not {kind.__name__}"
+        )
+    return value
+
+
+def plan_groups(plan: Dict[str, Any]) -> List[MovableGroup]:
+    """
+    Turn a loaded plan's groups back into group plans.
+
+    Args:
+        plan: Plan dict from load_plan
+
+    Returns:
+        MovableGroup per planned group, carrying its fingerprint
+    """
+    return [
+        MovableGroup(
+            path=Path(group["path"]),
+            relative_path=Path(group["relative_path"]),
+            fingerprint=group["fingerprint"],
+        )
+        for group in plan["groups"]
+    ]
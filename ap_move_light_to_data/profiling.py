@@ -0,0 +1,111 @@
+"""
+cProfile hook for diagnosing slow runs from the installed CLI.
+
+--profile runs the whole move under cProfile, writes the stats to a file that
+pstats or snakeviz can open, and prints the functions with the most time of
+their own. cProfile only sees the calling thread: time spent copying or
+deleting on worker threads shows up as the main thread waiting on them.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_HOTSPOTS = 15
+
+logger = logging.getLogger("ap_move_light_to_data.profiling")
+
+
+@dataclass(frozen=True, slots=True)
+class Hotspot:
+    """One function's totals from a profile."""
+
+    function: str
+    calls: int
+    own_seconds: float
+    total_seconds: float
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[Optional[cProfile.Profile]]:
+    """
+    Profile the enclosed block and write its stats file.
+
+    The stats are written even if the block raises, so a run that fails
+    part-way can still be diagnosed. A stats file that cannot be written is
+    logged and does not change the run's outcome.
+
+    Args:
+        path: Stats file to write (pstats format); None disables profiling
+
+    Yields:
+        The profiler, or None when profiling is disabled
+    """
+    if path is None:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        try:
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Failed to write profile stats {path}: {e}")
+
+
+def _label(func: Tuple[str, int, str]) -> str:
+    """Readable name for a pstats function key (filename, line, name)."""
+    filename, line, name = func
+    if filename == "~":
+        # Built-ins have no file, e.g. "<method 'read' of '_io.FileIO' objects>"
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def hotspots(
+    profiler: cProfile.Profile, limit: int = DEFAULT_HOTSPOTS
+) -> List[Hotspot]:
+    """
+    Functions with the most time of their own, largest first.
+
+    Args:
+        profiler: Profiler that has collected a run
+        limit: Number of functions to return
+
+    Returns:
+        Up to limit Hotspots
+    """
+    # pstats keeps its table as {func: (prim calls, calls, own, cumulative, ...)}
+    table = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+    rows = [
+        Hotspot(
+            function=_label(func),
+            calls=calls,
+            own_seconds=own,
+            total_seconds=cumulative,
+        )
+        for func, (_, calls, own, cumulative, _) in table.items()
+    ]
+    rows.sort(key=lambda row: row.own_seconds, reverse=True)
+    return rows[:limit]
+
+
+def print_hotspots(
+    profiler: cProfile.Profile, path: str, limit: int = DEFAULT_HOTSPOTS
+) -> None:
+    """Print the hotspot table and where the full stats were written."""
+    where = f"full stats in {path}" if os.path.exists(path) else "stats not saved"
+    print(f"Profile hotspots (top {limit} by own time; {where}):")
+    print(f"  {'own':>9} {'total':>9} {'calls':>10}  function")
+    for row in hotspots(profiler, limit):
+        print(
+            f"  {row.own_seconds:8.2f}s {row.total_seconds:8.2f}s "
+            f"{row.calls:>10}  {row.function}"
+        )
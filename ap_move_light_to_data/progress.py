@@ -0,0 +1,134 @@
+"""
+Byte-based progress reporting for the copy phase.
+
+Frame files range from a few kilobytes to hundreds of megabytes, so counting
+files misrepresents both completion and speed. ByteProgress counts bytes as the
+copy engine writes them and derives throughput from a sliding window, giving a
+rate and ETA that react to a slowing link within seconds.
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, TextIO, Tuple
+
+from . import config
+from .capacity import format_bytes, format_duration
+
+# Matches the description width used for the other progress bars
+DESC_WIDTH = 20
+
+
+class ByteProgress:
+    """
+    Thread-safe byte counter with a moving-average rate and ETA.
+
+    Progress is redrawn in place on a terminal at most every
+    config.PROGRESS_REFRESH_SECONDS. When the stream is not a terminal only the
+    final line is written.
+    """
+
+    def __init__(
+        self,
+        total_bytes: int,
+        desc: str = "Copying",
+        enabled: bool = True,
+        stream: Optional[TextIO] = None,
+        window_seconds: float = config.PROGRESS_RATE_WINDOW_SECONDS,
+        refresh_seconds: float = config.PROGRESS_REFRESH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.total_bytes = total_bytes
+        self.desc = desc
+        self.enabled = enabled
+        self.stream = stream if stream is not None else sys.stderr
+        self.window_seconds = window_seconds
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.done_bytes = 0
+        self.copied_bytes = 0
+        self.started = clock()
+        self._samples: Deque[Tuple[float, int]] = deque([(self.started, 0)])
+        self._last_render = float("-inf")
+        self._interactive = enabled and self.stream.isatty()
+
+    def update(self, nbytes: int) -> None:
+        """Record bytes written by the copy engine."""
+        with self._lock:
+            self.done_bytes += nbytes
+            self.copied_bytes += nbytes
+            now = self._clock()
+            self._samples.append((now, self.copied_bytes))
+            while (
+                len(self._samples) > 2
+                and now - self._samples[1][0] >= self.window_seconds
+            ):
+                self._samples.popleft()
+            if self._interactive and now - self._last_render >= self.refresh_seconds:
+                self._last_render = now
+                self._render(end="")
+
+    def skip(self, nbytes: int) -> None:
+        """Record bytes that needed no copy; they advance completion only."""
+        with self._lock:
+            self.done_bytes += nbytes
+
+    def rate(self) -> float:
+        """Bytes per second over the recent window."""
+        first_time, first_bytes = self._samples[0]
+        last_time, last_bytes = self._samples[-1]
+        elapsed = last_time - first_time
+        if elapsed <= 0:
+            return 0.0
+        return (last_bytes - first_bytes) / elapsed
+
+    def eta(self) -> Optional[float]:
+        """Seconds until all bytes are done at the current rate, if known."""
+        rate = self.rate()
+        if rate <= 0:
+            return None
+        return max(self.total_bytes - self.done_bytes, 0) / rate
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish reporting and summarize the copy.
+
+        Returns:
+            Dict with:
+                - bytes: int (bytes copied)
+                - seconds: float (elapsed time)
+                - bytes_per_sec: float (average throughput)
+        """
+        seconds = self._clock() - self.started
+        bytes_per_sec = self.copied_bytes / seconds if seconds > 0 else 0.0
+        if self.enabled:
+            with self._lock:
+                self._render(end="\n")
+        return {
+            "bytes": self.copied_bytes,
+            "seconds": seconds,
+            "bytes_per_sec": bytes_per_sec,
+        }
+
+    def format_line(self) -> str:
+        """Render the current state as a single line."""
+        percent = (
+            100.0 * self.done_bytes / self.total_bytes if self.total_bytes else 100
+        )
+        eta = self.eta()
+        eta_str = format_duration(eta) if eta is not None else "--"
+        return (
+            f"{self.desc:<{DESC_WIDTH}}: {percent:5.1f}% "
+            f"{format_bytes(self.done_bytes)}/{format_bytes(self.total_bytes)} "
+            f"{format_bytes(self.rate())}/s ETA {eta_str}"
+        )
+
+    def _render(self, end: str) -> None:
+        if self._interactive:
+            # Return to line start and clear what a longer line left behind
+            self.stream.write(f"\r{self.format_line()}\033[K{end}")
+        else:
+            self.stream.write(f"{self.format_line()}{end}")
+        self.stream.flush()
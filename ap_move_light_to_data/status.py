@@ -0,0 +1,104 @@
+"""
+Typed results for calibration checks and move planning.
+
+Slotted, frozen dataclasses replace the per-call dicts that the checks used to
+build; at tens of thousands of light directories those dicts and the list to
+set conversions showed up in profiles. Calibration paths are interned and kept
+in frozensets, so a calibration frame matched by many light directories is
+stored once.
+
+Each class still supports the old dict-style reads (status["is_complete"],
+group.get("fingerprint")) for callers that have not moved to attributes yet.
+"""
+
+import sys
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+
+
+def intern_paths(paths: Iterable[str]) -> FrozenSet[str]:
+    """
+    Build a frozenset of interned path strings.
+
+    Args:
+        paths: File paths
+
+    Returns:
+        Frozenset sharing one string object per distinct path
+    """
+    return frozenset(sys.intern(path) for path in paths)
+
+
+class _DictCompat:
+    """Read-only dict-style access to dataclass fields (transitional)."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(f.name for f in fields(self))  # type: ignore[arg-type]
+
+
+@dataclass(frozen=True, slots=True)
+class CalibrationStatus(_DictCompat):
+    """Calibration found for one light frame (see check_calibration_for_light)."""
+
+    has_darks: bool = False
+    has_flats: bool = False
+    has_bias: bool = False
+    needs_bias: bool = False
+    matched_darks: Tuple[str, ...] = ()
+    matched_flats: Tuple[str, ...] = ()
+    matched_bias: Tuple[str, ...] = ()
+    missing: Tuple[str, ...] = ()
+
+    @property
+    def is_complete(self) -> bool:
+        """True when no calibration type is missing."""
+        return not self.missing
+
+
+@dataclass(frozen=True, slots=True)
+class DirectoryStatus(_DictCompat):
+    """Calibration status of one light directory (see check_light_directories)."""
+
+    is_complete: bool
+    missing: Tuple[str, ...]
+    calibration_files: FrozenSet[str]
+
+
+@dataclass(frozen=True, slots=True)
+class GroupStatus(_DictCompat):
+    """Completeness of a directory group (see is_group_complete_and_self_contained)."""
+
+    is_complete: bool = False
+    is_self_contained: bool = False
+    light_directories: Tuple[str, ...] = ()
+    calibration_files: FrozenSet[str] = frozenset()
+    incomplete_dirs: Tuple[Tuple[str, Tuple[str, ...]], ...] = ()
+
+    @property
+    def can_move(self) -> bool:
+        """True when the group is complete and self-contained."""
+        return self.is_complete and self.is_self_contained
+
+
+@dataclass(frozen=True, slots=True)
+class MovableGroup(_DictCompat):
+    """A directory that can be moved as a unit (see organize_into_movable_groups)."""
+
+    path: Path
+    relative_path: Path
+    fingerprint: Optional[str] = None
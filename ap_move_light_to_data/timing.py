@@ -0,0 +1,71 @@
+"""
+Lightweight wall-clock timing of processing phases.
+
+PhaseTimer accumulates seconds per named phase so a slow run can be attributed
+to header I/O, matching or copying. Sub-phases use dotted names under their
+phase (e.g. "move.copy"). Sub-phases that run on several threads at once
+report busy time summed over those threads, which can exceed the phase's own
+wall-clock time.
+
+With a Tracer attached, every phase is also recorded as a trace span, and
+span() marks finer units of work (one directory, one file) that are traced
+but not totalled.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+from .tracing import Tracer
+
+logger = logging.getLogger("ap_move_light_to_data.timing")
+
+
+class PhaseTimer:
+    """Thread-safe accumulator of seconds per phase, in the order phases start."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        tracer: Optional[Tracer] = None,
+    ):
+        self._clock = clock
+        self.tracer = tracer
+        self._lock = threading.Lock()
+        self._totals: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the named phase."""
+        with self._lock:
+            # Keep phases in the order they start, parents before sub-phases
+            self._totals.setdefault(name, 0.0)
+        start = self._clock()
+        try:
+            with self.span(name, category="phase"):
+                yield
+        finally:
+            self.add(name, self._clock() - start)
+
+    def span(self, name: str, category: str = "", **args: Any) -> ContextManager:
+        """Trace the enclosed block when a tracer is attached (not totalled)."""
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, category, **args)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add seconds to a phase."""
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """Seconds per phase, in the order phases started."""
+        with self._lock:
+            return dict(self._totals)
+
+    def log(self) -> None:
+        """Write every phase's total to the debug log."""
+        for name, seconds in self.as_dict().items():
+            logger.debug(f"Phase {name}: {seconds:.3f}s")
@@ -0,0 +1,107 @@
+"""
+Chrome trace-event output for a run.
+
+Tracer records complete ("X") events per thread, in the JSON format read by
+chrome://tracing and Perfetto (ui.perfetto.dev). Phases timed by PhaseTimer
+become spans automatically; finer spans (one light directory's check, one
+file's copy or unlink) are added where the work happens, so worker threads
+show their own rows and idle gaps or slow I/O stand out on the timeline.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+PROCESS_NAME = "ap-move-light-to-data"
+
+
+class Tracer:
+    """Thread-safe collector of trace events."""
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns):
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._events: List[Dict[str, Any]] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": 0,
+                "args": {"name": PROCESS_NAME},
+            }
+        ]
+        # Thread ident -> small stable id, in order of first event
+        self._tids: Dict[int, int] = {}
+
+    def _tid(self) -> int:
+        """Id of the current thread, naming it on first use (lock held)."""
+        ident = threading.get_ident()
+        tid = self._tids.get(ident)
+        if tid is None:
+            tid = self._tids[ident] = len(self._tids) + 1
+            self._events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        return tid
+
+    def _now_us(self) -> float:
+        """Microseconds since the tracer was created."""
+        return (self._clock() - self._start) / 1000
+
+    @contextmanager
+    def span(self, name: str, category: str = "", **args: Any) -> Iterator[None]:
+        """
+        Record the enclosed block as a span on the current thread.
+
+        Args:
+            name: Span name shown on the timeline
+            category: Event category (e.g. "phase", "file")
+            **args: Details shown when the span is selected
+        """
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            end = self._now_us()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": end - start,
+                "pid": self._pid,
+                "args": args,
+            }
+            with self._lock:
+                event["tid"] = self._tid()
+                self._events.append(event)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Recorded events, metadata first then spans in completion order."""
+        with self._lock:
+            return list(self._events)
+
+    def write(self, path: str) -> None:
+        """
+        Write the trace as JSON, replacing any existing file atomically.
+
+        Args:
+            path: Output file (open in chrome://tracing or ui.perfetto.dev)
+        """
+        trace = {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+            f.write("\n")
+        os.replace(temp_path, path)
@@ -0,0 +1,535 @@
+"""
+Streaming file transfer with optional content verification.
+
+Copies are performed in fixed-size chunks so the source can be hashed while it
+is written to the destination, keeping verification close to a single read
+per byte. A shared Throttle can cap bandwidth and I/O operations across every
+thread performing transfers.
+"""
+
+import ctypes
+import hashlib
+import logging
+import os
+import platform
+import shutil
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Iterable, List, Optional, Sequence, Set
+
+from . import config
+from . import defaults
+
+logger = logging.getLogger("ap_move_light_to_data.transfer")
+
+# Linux ioprio_set syscall numbers by machine architecture
+_IOPRIO_SET_SYSCALLS = {
+    "x86_64": 251,
+    "amd64": 251,
+    "i386": 289,
+    "i686": 289,
+    "aarch64": 30,
+    "arm64": 30,
+    "riscv64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "s390x": 282,
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+
+# ioprio classes that may be requested (only ones that lower priority)
+IO_PRIORITY_CLASSES = defaults.IO_PRIORITY_CLASSES
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. A
+    consumer that takes more tokens than are available goes into debt and
+    sleeps until the debt would have been repaid, so large requests are
+    allowed but the long-run rate still holds.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive: {rate}")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: float) -> float:
+        """
+        Take tokens, blocking until the bucket can afford them.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Throttle:
+    """
+    Bandwidth and IOPS limits shared by every transfer in a run.
+
+    Each chunk read or written counts as one I/O operation.
+    """
+
+    def __init__(
+        self,
+        max_bytes_per_sec: Optional[int] = None,
+        max_iops: Optional[int] = None,
+    ):
+        self.bytes = TokenBucket(max_bytes_per_sec) if max_bytes_per_sec else None
+        self.ops = TokenBucket(max_iops) if max_iops else None
+
+    def acquire(self, nbytes: int, ops: int = 1) -> None:
+        """
+        Block until `nbytes` and `ops` fit within the configured limits.
+
+        Args:
+            nbytes: Bytes about to be transferred
+            ops: I/O operations about to be issued
+        """
+        if self.ops is not None:
+            self.ops.consume(ops)
+        if self.bytes is not None:
+            self.bytes.consume(nbytes)
+
+
+def set_io_priority(io_class: str) -> bool:
+    """
+    Lower this process's I/O scheduling priority (Linux ioprio).
+
+    Threads started afterwards inherit the priority, so call this before any
+    worker threads are created.
+
+    Args:
+        io_class: One of IO_PRIORITY_CLASSES
+
+    Returns:
+        True if the priority was applied, False if unsupported here
+    """
+    ioprio_class, level = IO_PRIORITY_CLASSES[io_class]
+    syscall_number = _IOPRIO_SET_SYSCALLS.get(platform.machine().lower())
+    if platform.system() != "Linux" or syscall_number is None:
+        logger.warning(
+            f"I/O priority is not supported on {platform.system()} "
+            f"{platform.machine()}; continuing at normal priority"
+        )
+        return False
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    value = (ioprio_class << _IOPRIO_CLASS_SHIFT) | level
+    if libc.syscall(syscall_number, _IOPRIO_WHO_PROCESS, 0, value) != 0:
+        errno = ctypes.get_errno()
+        logger.warning(f"Failed to set I/O priority: {os.strerror(errno)}")
+        return False
+    logger.debug(f"I/O priority set to {io_class}")
+    return True
+
+
+def _drop_cache(fd: int) -> None:
+    """
+    Advise the kernel that cached pages for an open file are no longer needed.
+
+    No-op on platforms without posix_fadvise.
+
+    Args:
+        fd: Open file descriptor
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def copy_file(
+    source: str,
+    dest: str,
+    algorithm: Optional[str] = None,
+    throttle: Optional[Throttle] = None,
+    make_parents: bool = True,
+    progress: Optional[Callable[[int], None]] = None,
+    mirrors: Sequence[str] = (),
+    sync: bool = False,
+    mirror_writer: Optional[Executor] = None,
+) -> Optional[str]:
+    """
+    Copy a file in chunks, optionally hashing its content in the same pass.
+
+    File times and permission bits are preserved so later runs can recognise
+    identical destination files (see is_identical). When hashing, the
+    destination is flushed to disk and evicted from the page cache so a
+    subsequent read-back (see hash_file) reads what was actually stored.
+
+    Mirrors receive the same chunks as dest from the single source read; each
+    chunk is written to all destinations concurrently. Callers copying many
+    files pass a mirror_writer pool shared by all of them, since starting
+    threads per file can cost more than copying a small file.
+
+    Args:
+        source: Source file path
+        dest: Destination file path
+        algorithm: Optional hashlib algorithm name
+        throttle: Optional shared bandwidth/IOPS limits
+        make_parents: Create missing parent directories. Callers that created
+            destination directories up front pass False to skip the check.
+        progress: Optional callback receiving the byte count of each chunk
+            written, so progress advances during large files
+        mirrors: Additional destination file paths
+        sync: Flush destinations to disk before returning (always done when
+            hashing)
+        mirror_writer: Executor with a worker per mirror for the mirror
+            writes; one is created for this file when None
+
+    Returns:
+        Hex digest of the source content, or None when not hashing
+    """
+    dests = [dest, *mirrors]
+    if make_parents:
+        for path in dests:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = hashlib.new(algorithm) if algorithm else None
+
+    with ExitStack() as stack:
+        src = stack.enter_context(open(source, "rb"))
+        outputs = [stack.enter_context(open(path, "wb")) for path in dests]
+        writer = None
+        if mirrors:
+            writer = mirror_writer or stack.enter_context(
+                ThreadPoolExecutor(max_workers=len(mirrors))
+            )
+        while True:
+            chunk = src.read(config.COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            if throttle is not None:
+                throttle.acquire(len(chunk), ops=1 + len(outputs))
+            if hasher is not None:
+                hasher.update(chunk)
+            if writer is not None:
+                pending = [writer.submit(out.write, chunk) for out in outputs[1:]]
+                outputs[0].write(chunk)
+                for future in pending:
+                    future.result()
+            else:
+                outputs[0].write(chunk)
+            if progress is not None:
+                progress(len(chunk))
+        if hasher is not None or sync:
+            for out in outputs:
+                out.flush()
+                os.fsync(out.fileno())
+                if hasher is not None:
+                    _drop_cache(out.fileno())
+
+    for path in dests:
+        shutil.copystat(source, path)
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def hash_file(
+    path: str,
+    algorithm: str = config.VERIFY_HASH_ALGORITHM,
+    throttle: Optional[Throttle] = None,
+) -> str:
+    """
+    Hash a file's content without leaving it in the page cache.
+
+    Args:
+        path: File path
+        algorithm: hashlib algorithm name
+        throttle: Optional shared bandwidth/IOPS limits
+
+    Returns:
+        Hex digest of the file content
+    """
+    hasher = hashlib.new(algorithm)
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        while True:
+            chunk = os.read(fd, config.COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            if throttle is not None:
+                throttle.acquire(len(chunk))
+            hasher.update(chunk)
+        _drop_cache(fd)
+    finally:
+        os.close(fd)
+    return hasher.hexdigest()
+
+
+def copy_file_verified(
+    source: str,
+    dest: str,
+    algorithm: str = config.VERIFY_HASH_ALGORITHM,
+    throttle: Optional[Throttle] = None,
+    make_parents: bool = True,
+    progress: Optional[Callable[[int], None]] = None,
+    mirrors: Sequence[str] = (),
+    mirror_writer: Optional[Executor] = None,
+) -> str:
+    """
+    Copy a file and verify every destination's content matches the source.
+
+    Args:
+        source: Source file path
+        dest: Destination file path
+        algorithm: hashlib algorithm name
+        throttle: Optional shared bandwidth/IOPS limits
+        make_parents: Create missing parent directories
+        progress: Optional per-chunk byte callback (see copy_file)
+        mirrors: Additional destination file paths (see copy_file)
+        mirror_writer: Optional shared pool for mirror writes (see copy_file)
+
+    Returns:
+        Hex digest of the verified content
+
+    Raises:
+        OSError: If any destination's content does not match the source
+    """
+    source_digest = copy_file(
+        source,
+        dest,
+        algorithm,
+        throttle,
+        make_parents,
+        progress,
+        mirrors,
+        mirror_writer=mirror_writer,
+    )
+    for path in [dest, *mirrors]:
+        dest_digest = hash_file(path, algorithm, throttle)
+        if source_digest != dest_digest:
+            raise OSError(
+                f"Checksum mismatch for {path} "
+                f"({algorithm} {dest_digest} != {source_digest})"
+            )
+        logger.debug(f"Verified {path} ({algorithm} {source_digest})")
+    return dest_digest
+
+
+def is_identical(
+    source: str,
+    dest: str,
+    algorithm: Optional[str] = None,
+    throttle: Optional[Throttle] = None,
+    source_size: Optional[int] = None,
+    source_mtime_ns: Optional[int] = None,
+) -> bool:
+    """
+    Check whether a destination file already holds the source content.
+
+    Files match when size and modification time agree (within
+    config.IDENTICAL_MTIME_WINDOW_SECONDS). When an algorithm is given, the
+    content hashes must also match.
+
+    Args:
+        source: Source file path
+        dest: Destination file path
+        algorithm: Optional hashlib algorithm name for a content comparison
+        throttle: Optional shared bandwidth/IOPS limits for the comparison
+        source_size: Source size if already known (skips a stat of source)
+        source_mtime_ns: Source mtime in ns if already known
+
+    Returns:
+        True if dest exists and is identical to source
+    """
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    if source_size is None or source_mtime_ns is None:
+        source_stat = os.stat(source)
+        source_size, source_mtime_ns = source_stat.st_size, source_stat.st_mtime_ns
+
+    if source_size != dest_stat.st_size:
+        return False
+    mtime_delta = abs(source_mtime_ns - dest_stat.st_mtime_ns) / 1e9
+    if mtime_delta > config.IDENTICAL_MTIME_WINDOW_SECONDS:
+        return False
+    if algorithm:
+        return hash_file(source, algorithm, throttle) == hash_file(
+            dest, algorithm, throttle
+        )
+    return True
+
+
+def create_directories(directories: Iterable[str]) -> int:
+    """
+    Create a set of directories in one ordered batch.
+
+    Directories are created parents first. The first directory of a branch is
+    made with os.makedirs, which locates the nearest existing ancestor; every
+    directory below one already created or confirmed is made with a single
+    mkdir. Failures are logged and skipped so copies into other directories
+    can proceed.
+
+    Args:
+        directories: Directory paths (duplicates allowed)
+
+    Returns:
+        Number of directories created (a branch made by one os.makedirs call
+        counts once)
+    """
+    known: Set[str] = set()
+    created = 0
+    for directory in sorted(set(directories), key=lambda d: (d.count(os.sep), d)):
+        # Walk up to the nearest directory already known to exist
+        missing = []
+        current = directory
+        while current not in known and os.path.dirname(current) != current:
+            missing.append(current)
+            current = os.path.dirname(current)
+        try:
+            if current in known:
+                for path in reversed(missing):
+                    try:
+                        os.mkdir(path)
+                        created += 1
+                    except FileExistsError:
+                        pass
+                    known.add(path)
+            else:
+                if not os.path.isdir(directory):
+                    os.makedirs(directory, exist_ok=True)
+                    created += 1
+                known.update(missing)
+        except OSError as e:
+            logger.error(f"Failed to create directory {directory}: {e}")
+    return created
+
+
+def fsync_directory(path: str) -> None:
+    """
+    Flush a directory's entries to disk so renames and new files persist.
+
+    Platforms that cannot open directories (Windows) are skipped.
+
+    Args:
+        path: Directory path
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def publish_directory(staging: str, final: str) -> None:
+    """
+    Atomically move a fully written staging directory to its final path.
+
+    Every directory in the staging tree is flushed first so the published
+    tree is complete on disk, then the staging directory is renamed and the
+    parent flushed to persist the rename. Watchers of the parent see either
+    nothing or the whole directory.
+
+    Args:
+        staging: Staging directory on the same filesystem as final
+        final: Final directory path, which must not exist yet
+
+    Raises:
+        OSError: If final already exists or the rename fails
+    """
+    for dirpath, _, _ in os.walk(staging, topdown=False):
+        fsync_directory(dirpath)
+    if os.path.lexists(final):
+        raise FileExistsError(f"Cannot publish {staging}: {final} already exists")
+    os.rename(staging, final)
+    fsync_directory(os.path.dirname(final))
+
+
+def remove_tree(
+    path: str,
+    workers: int = config.DEFAULT_WORKERS,
+    unlink: Optional[Callable[[str], None]] = None,
+) -> int:
+    """
+    Remove a directory tree, unlinking files in parallel.
+
+    Files are unlinked across a pool of worker threads (each unlink is an
+    independent round trip on network filesystems), then directories are
+    removed bottom-up. Symlinks are removed, never followed.
+
+    Args:
+        path: Directory tree to remove
+        workers: Number of worker threads for unlinking files
+        unlink: Function removing one file, wrapped for tracing (default:
+            os.unlink)
+
+    Returns:
+        Number of files removed
+
+    Raises:
+        OSError: If any file or directory could not be removed
+    """
+    if unlink is None:
+        unlink = os.unlink
+    files: List[str] = []
+    directories = [path]
+    pending = [path]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    pending.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    errors: List[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(unlink, f): f for f in files}
+        for future, file_path in futures.items():
+            try:
+                future.result()
+            except OSError as e:
+                errors.append(f"{file_path}: {e}")
+
+    if not errors:
+        for directory in sorted(
+            directories, key=lambda d: d.count(os.sep), reverse=True
+        ):
+            try:
+                os.rmdir(directory)
+            except OSError as e:
+                errors.append(f"{directory}: {e}")
+                break
+
+    if errors:
+        raise OSError(
+            f"Failed to remove {len(errors)} entries under {path}; first: {errors[0]}"
+        )
+    return len(files)
@@ -0,0 +1,140 @@
+"""
+Peak memory of the metadata cache for a large synthetic archive.
+
+Builds metadata for N synthetic frames (default 1,000,000; see synthetic.py)
+three ways, each in a fresh interpreter so peak RSS is not shared between
+them:
+
+- dict: path -> dict of every normalized header for the whole archive, as a
+  single ap_common.get_metadata call returns it
+- load: the real load_metadata path, with get_metadata answering each
+  per-target batch from the synthetic tree; the peak of a run's loading phase
+- store: MetadataStore fed one frame at a time, keeping only
+  config.ALL_REQUIRED_KEYWORDS; what a run holds once loading is done
+
+Usage:
+    python benchmarks/bench_metadata_memory.py [--frames N]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+from ap_move_light_to_data import config, move_lights_to_data  # noqa: E402
+from ap_move_light_to_data.capacity import format_bytes  # noqa: E402
+from ap_move_light_to_data.metadata_store import MetadataStore  # noqa: E402
+
+# Headers ap_common normalizes besides the ones matching needs; they differ
+# per frame and make up most of the loader's dict
+EXTRA_HEADERS = (
+    "datetime",
+    "targetname",
+    "optic",
+    "focallen",
+    "ra",
+    "dec",
+    "ccd-temp",
+    "hfr",
+    "stars",
+    "rms",
+)
+
+
+def frames_with_extras(
+    root: str, spec: synthetic.TreeSpec
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """synthetic.iter_frames with the per-frame headers ap_common also keeps."""
+    for i, (path, metadata) in enumerate(synthetic.iter_frames(root, spec)):
+        for extra in EXTRA_HEADERS:
+            metadata[extra] = f"{extra}-{i}"
+        yield path, metadata
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load_through_load_metadata(spec: synthetic.TreeSpec) -> MetadataStore:
+    """Run load_metadata over empty target directories standing in for spec."""
+    one_target = replace(spec, targets=1)
+
+    def get_metadata(dirs: list, recursive: bool, **kwargs: Any) -> Dict:
+        # The root batch holds no frames; each target batch one target's worth
+        return dict(frames_with_extras(dirs[0], one_target)) if recursive else {}
+
+    with tempfile.TemporaryDirectory() as root:
+        for t in range(spec.targets):
+            os.mkdir(os.path.join(root, f"T{t:04d}"))
+        with mock.patch.object(
+            move_lights_to_data.ap_common, "get_metadata", side_effect=get_metadata
+        ):
+            cache = move_lights_to_data.load_metadata([Path(root)], quiet=True)
+    assert cache is not None
+    return cache
+
+
+def run_mode(mode: str, frames: int) -> None:
+    """Build the cache in one mode and print its peak RSS in bytes."""
+    spec = synthetic.TreeSpec.for_frames(frames)
+    root = os.path.join(os.sep, "data")
+    cache: Any
+    if mode == "dict":
+        cache = dict(frames_with_extras(root, spec))
+    elif mode == "load":
+        cache = load_through_load_metadata(spec)
+    elif mode == "store":
+        cache = MetadataStore(
+            config.ALL_REQUIRED_KEYWORDS,
+            path_key=synthetic.NORMALIZED_HEADER_FILENAME,
+        )
+        cache.update(frames_with_extras(root, spec))
+    else:
+        cache = None
+    print(peak_rss_bytes())
+    del cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=["baseline", "dict", "load", "store"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.frames)
+        return
+
+    peaks = {}
+    for mode in ("baseline", "dict", "load", "store"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--frames", str(args.frames)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        peaks[mode] = int(output.strip())
+
+    frames = synthetic.TreeSpec.for_frames(args.frames).frames
+    print(f"{frames:,} frames")
+    print(f"  interpreter baseline: {format_bytes(peaks['baseline'])}")
+    for mode in ("dict", "load", "store"):
+        used = peaks[mode] - peaks["baseline"]
+        print(f"  {mode:<20}: {format_bytes(peaks[mode])} peak (+{format_bytes(used)})")
+
+
+if __name__ == "__main__":
+    main()
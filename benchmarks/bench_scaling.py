@@ -0,0 +1,225 @@
+"""
+Scaling benchmarks for the analysis and move steps.
+
+For each archive size, builds a synthetic tree (see synthetic.py) and times:
+
+- check: check_light_directories over every light directory
+- check-parallel: check_light_directories_parallel with --check-workers
+  processes (only when --check-workers is above 1)
+- organize: organize_into_movable_groups on the check results
+- full: process_light_directories moving a header-only tree on disk (only up
+  to --full-max frames, since it writes every file)
+
+The analysis benchmarks use an injected metadata cache, so they measure
+matching alone; the full run reads real headers with --real-metadata and
+otherwise injects the cache too. Results are written as JSON for comparison
+between commits.
+
+Usage:
+    python benchmarks/bench_scaling.py [--sizes 1000 10000 ...] [--output FILE]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+from ap_move_light_to_data import __version__, config  # noqa: E402
+from ap_move_light_to_data import move_lights_to_data  # noqa: E402
+from ap_move_light_to_data.metadata_store import MetadataStore  # noqa: E402
+
+SCHEMA_VERSION = 1
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def timed(function: Callable[[], Any]) -> Dict[str, Any]:
+    """Run a function once and return its result and wall-clock seconds."""
+    start = time.perf_counter()
+    value = function()
+    return {"value": value, "seconds": time.perf_counter() - start}
+
+
+def bench_analysis(
+    frames: int, spec: synthetic.TreeSpec, check_workers: int = 1
+) -> List[Dict[str, Any]]:
+    """Time the check and organize steps on an injected metadata cache."""
+    root = os.path.join(os.sep, "bench", "10_Blink")
+    cache = MetadataStore.from_metadata(
+        synthetic.metadata_cache(root, spec),
+        keys=config.ALL_REQUIRED_KEYWORDS,
+        path_key=synthetic.NORMALIZED_HEADER_FILENAME,
+    )
+    light_dirs = sorted(
+        {
+            os.path.dirname(path)
+            for path, metadata in cache.items()
+            if metadata[config.NORMALIZED_HEADER_TYPE] == synthetic.TYPE_LIGHT
+        }
+    )
+    check = timed(
+        lambda: move_lights_to_data.check_light_directories(
+            light_dirs, Path(root), False, False, True, cache
+        )
+    )
+    organize = timed(
+        lambda: move_lights_to_data.organize_into_movable_groups(
+            check["value"], Path(root)
+        )
+    )
+    runs = [
+        {
+            "benchmark": "check",
+            "frames": frames,
+            "light_dirs": len(light_dirs),
+            "seconds": check["seconds"],
+        },
+        {
+            "benchmark": "organize",
+            "frames": frames,
+            "groups": len(organize["value"]["movable_groups"]),
+            "seconds": organize["seconds"],
+        },
+    ]
+    if check_workers > 1:
+        parallel = timed(
+            lambda: move_lights_to_data.check_light_directories_parallel(
+                light_dirs, Path(root), False, False, True, cache, check_workers
+            )
+        )
+        runs.append(
+            {
+                "benchmark": "check-parallel",
+                "frames": frames,
+                "workers": check_workers,
+                "seconds": parallel["seconds"],
+            }
+        )
+    return runs
+
+
+def bench_full(
+    frames: int, spec: synthetic.TreeSpec, real_metadata: bool
+) -> Dict[str, Any]:
+    """Time a complete move of a header-only tree on disk."""
+    with tempfile.TemporaryDirectory(prefix="ap-bench-") as tmp:
+        source = os.path.join(os.path.realpath(tmp), "10_Blink")
+        dest = os.path.join(os.path.realpath(tmp), "20_Data")
+        synthetic.write_tree(source, spec)
+
+        def run() -> dict:
+            return move_lights_to_data.process_light_directories(
+                source, dest, ".*", quiet=True
+            )
+
+        if real_metadata:
+            result = timed(run)
+        else:
+            cache = synthetic.metadata_cache(source, spec)
+            with mock.patch.object(
+                move_lights_to_data.ap_common, "get_metadata", return_value=cache
+            ):
+                result = timed(run)
+    return {
+        "benchmark": "full",
+        "frames": frames,
+        "moved": result["value"]["moved"],
+        "timings": result["value"].get("timings", {}),
+        "seconds": result["seconds"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--full-max",
+        type=int,
+        default=10_000,
+        help="largest size to run the on-disk full benchmark at (default: 10000)",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=600.0,
+        help="skip larger sizes of a benchmark once one run exceeds this",
+    )
+    parser.add_argument(
+        "--real-metadata",
+        action="store_true",
+        help="read headers with ap_common in the full benchmark",
+    )
+    parser.add_argument(
+        "--missing-flats-every",
+        type=int,
+        default=4,
+        help="leave every Nth date without flats (default: 4)",
+    )
+    parser.add_argument(
+        "--check-workers",
+        type=int,
+        default=1,
+        help="also time the sharded check with this many processes",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    over_budget: Set[str] = set()
+    for frames in sorted(args.sizes):
+        spec = synthetic.TreeSpec.for_frames(
+            frames, missing_flats_every=args.missing_flats_every
+        )
+        runs: List[Dict[str, Any]] = []
+        analysis = ["check", "organize"]
+        if args.check_workers > 1:
+            analysis.append("check-parallel")
+        if over_budget.intersection(analysis):
+            for name in analysis:
+                runs.append({"benchmark": name, "frames": frames, "skipped": True})
+        else:
+            runs.extend(bench_analysis(frames, spec, args.check_workers))
+        if frames <= args.full_max:
+            if "full" in over_budget:
+                runs.append({"benchmark": "full", "frames": frames, "skipped": True})
+            else:
+                runs.append(bench_full(frames, spec, args.real_metadata))
+        for run in runs:
+            if run.get("seconds", 0) > args.max_seconds:
+                over_budget.add(run["benchmark"])
+            if run.get("skipped"):
+                print(f"{run['benchmark']:<16}{frames:>10,} frames  skipped")
+            else:
+                print(
+                    f"{run['benchmark']:<16}{frames:>10,} frames "
+                    f"{run['seconds']:10.3f}s"
+                )
+        results.extend(runs)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Startup cost of the command-line tool.
+
+Runs each scenario in fresh interpreters and reports wall-clock time (best and
+median of --runs) plus the import cost measured by `python -X importtime`:
+
+- help: `python -m ap_move_light_to_data --help`
+- import: `import ap_move_light_to_data`
+- import-app: `import ap_move_light_to_data.move_lights_to_data`, the full
+  import cost of a real run (for comparison)
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--output FILE]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from ap_move_light_to_data import __version__
+
+SCHEMA_VERSION = 1
+
+SCENARIOS = {
+    "help": ["-m", "ap_move_light_to_data", "--help"],
+    "import": ["-c", "import ap_move_light_to_data"],
+    "import-app": ["-c", "import ap_move_light_to_data.move_lights_to_data"],
+}
+
+
+def wall_seconds(args: List[str]) -> float:
+    """Run the interpreter once and return its wall-clock seconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def import_times(args: List[str]) -> Dict[str, Any]:
+    """
+    Import cost of one run from `python -X importtime`.
+
+    Returns:
+        Dict with total import microseconds, module count and the cumulative
+        microseconds of ap_common (0 when it was not imported)
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    ).stderr
+    total_us = 0
+    modules = 0
+    ap_common_us = 0
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        total_us += int(self_us)
+        modules += 1
+        if name.strip() == "ap_common":
+            ap_common_us = int(cumulative_us)
+    return {"import_us": total_us, "modules": modules, "ap_common_us": ap_common_us}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for name, scenario in SCENARIOS.items():
+        times = [wall_seconds(scenario) for _ in range(args.runs)]
+        result = {
+            "benchmark": name,
+            "runs": args.runs,
+            "best_seconds": min(times),
+            "median_seconds": statistics.median(times),
+            **import_times(scenario),
+        }
+        results.append(result)
+        print(
+            f"{name:<12}{result['best_seconds'] * 1000:8.1f} ms best "
+            f"{result['median_seconds'] * 1000:8.1f} ms median  "
+            f"{result['modules']:4} modules, ap_common "
+            f"{result['ap_common_us'] / 1000:.1f} ms"
+        )
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
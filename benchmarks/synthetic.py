@@ -0,0 +1,192 @@
+"""
+Synthetic astrophotography trees for benchmarks.
+
+Builds TARGET/DATE/FILTER trees shaped like a blink directory:
+
+    <root>/T0001/DATE_2026-01-01/FILTER_Ha_EXP_300/LIGHT_0000.fits
+    <root>/T0001/DATE_2026-01-01/FILTER_Ha_EXP_300/FLAT_0000.fits
+    <root>/T0001/DATE_2026-01-01/DARK_0000.fits
+    <root>/T0001/DATE_2026-01-01/BIAS_0000.fits
+
+Frames can be written to disk with minimal FITS headers, or produced as an
+in-memory metadata cache in the shape ap_common.get_metadata returns, to
+benchmark the analysis without any header I/O.
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Tuple
+
+from ap_common.constants import (
+    NORMALIZED_HEADER_DATE,
+    NORMALIZED_HEADER_FILENAME,
+    TYPE_BIAS,
+    TYPE_DARK,
+    TYPE_FLAT,
+    TYPE_LIGHT,
+)
+
+from ap_move_light_to_data import config
+
+FILTERS = ("L", "R", "G", "B", "Ha", "OIII", "SII")
+
+# Raw FITS keyword for each normalized header (as written by capture software)
+FITS_KEYWORDS = {
+    config.NORMALIZED_HEADER_TYPE: "IMAGETYP",
+    config.NORMALIZED_HEADER_CAMERA: "INSTRUME",
+    config.NORMALIZED_HEADER_SETTEMP: "SET-TEMP",
+    config.NORMALIZED_HEADER_GAIN: "GAIN",
+    config.NORMALIZED_HEADER_OFFSET: "OFFSET",
+    config.NORMALIZED_HEADER_READOUTMODE: "READOUTM",
+    config.NORMALIZED_HEADER_EXPOSURESECONDS: "EXPOSURE",
+    config.NORMALIZED_HEADER_FILTER: "FILTER",
+    NORMALIZED_HEADER_DATE: "DATE-OBS",
+}
+
+FITS_BLOCK = 2880
+FITS_CARD = 80
+
+
+@dataclass(frozen=True)
+class TreeSpec:
+    """Shape of a synthetic tree; counts are per directory level."""
+
+    targets: int = 2
+    dates: int = 5
+    filters: int = 3
+    lights: int = 20
+    flats: int = 10
+    darks: int = 10
+    bias: int = 0
+    light_exposure: float = 300.0
+    # Every Nth date has no flats, leaving its light directories incomplete
+    missing_flats_every: int = 0
+
+    @property
+    def frames_per_target(self) -> int:
+        """Frames under one target directory."""
+        per_filter = self.lights + self.flats
+        return self.dates * (self.filters * per_filter + self.darks + self.bias)
+
+    @property
+    def frames(self) -> int:
+        """Frames in the whole tree (ignoring missing_flats_every)."""
+        return self.targets * self.frames_per_target
+
+    @classmethod
+    def for_frames(cls, frames: int, **overrides: Any) -> "TreeSpec":
+        """Spec with enough targets for about the given number of frames."""
+        base = cls(**overrides)
+        targets = max(1, round(frames / base.frames_per_target))
+        return cls(**{**asdict(base), "targets": targets})
+
+
+def iter_frames(root: str, spec: TreeSpec) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Generate (path, normalized metadata) for every frame of a tree.
+
+    Args:
+        root: Source root directory the paths are built under
+        spec: Tree shape
+
+    Yields:
+        Path and metadata dict, as in ap_common.get_metadata results
+    """
+    common = {
+        config.NORMALIZED_HEADER_CAMERA: "ASI2600MM",
+        config.NORMALIZED_HEADER_SETTEMP: -10.0,
+        config.NORMALIZED_HEADER_GAIN: 100,
+        config.NORMALIZED_HEADER_OFFSET: 50,
+        config.NORMALIZED_HEADER_READOUTMODE: "0",
+    }
+
+    def frame(
+        path: str, frame_type: str, exposure: float, headers: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        metadata = dict(common)
+        metadata.update(headers)
+        metadata[config.NORMALIZED_HEADER_TYPE] = frame_type
+        metadata[config.NORMALIZED_HEADER_EXPOSURESECONDS] = exposure
+        metadata[NORMALIZED_HEADER_FILENAME] = path
+        return path, metadata
+
+    for t in range(spec.targets):
+        target_dir = os.path.join(root, f"T{t:04d}")
+        for d in range(spec.dates):
+            date = f"2026-{1 + d // 28:02d}-{1 + d % 28:02d}"
+            date_dir = os.path.join(target_dir, f"DATE_{date}")
+            dated = {NORMALIZED_HEADER_DATE: date}
+            for i in range(spec.darks):
+                path = os.path.join(date_dir, f"DARK_{i:04d}.fits")
+                yield frame(path, TYPE_DARK, spec.light_exposure, dated)
+            for i in range(spec.bias):
+                path = os.path.join(date_dir, f"BIAS_{i:04d}.fits")
+                yield frame(path, TYPE_BIAS, 0.0, dated)
+            skip_flats = spec.missing_flats_every and d % spec.missing_flats_every == 0
+            for f in range(spec.filters):
+                filter_name = FILTERS[f % len(FILTERS)]
+                filter_dir = os.path.join(
+                    date_dir, f"FILTER_{filter_name}_EXP_{spec.light_exposure:g}"
+                )
+                filtered = {**dated, config.NORMALIZED_HEADER_FILTER: filter_name}
+                for i in range(spec.lights):
+                    path = os.path.join(filter_dir, f"LIGHT_{i:04d}.fits")
+                    yield frame(path, TYPE_LIGHT, spec.light_exposure, filtered)
+                for i in range(0 if skip_flats else spec.flats):
+                    path = os.path.join(filter_dir, f"FLAT_{i:04d}.fits")
+                    yield frame(path, TYPE_FLAT, 2.5, filtered)
+
+
+def metadata_cache(root: str, spec: TreeSpec) -> Dict[str, Dict[str, Any]]:
+    """Build the metadata cache for a tree without touching the disk."""
+    return dict(iter_frames(root, spec))
+
+
+def fits_header(metadata: Dict[str, Any]) -> bytes:
+    """
+    Encode a minimal FITS primary header (no data) for a frame.
+
+    Args:
+        metadata: Normalized metadata; keys without a FITS keyword are skipped
+
+    Returns:
+        Header padded to a whole 2880-byte block
+    """
+    cards = ["SIMPLE  =                    T", "BITPIX  =                    8"]
+    cards.append("NAXIS   =                    0")
+    for key, keyword in FITS_KEYWORDS.items():
+        if key not in metadata:
+            continue
+        value = metadata[key]
+        if isinstance(value, str):
+            cards.append(f"{keyword:<8}= '{value:<8}'")
+        else:
+            cards.append(f"{keyword:<8}= {value:>20}")
+    cards.append("END")
+    header = "".join(card.ljust(FITS_CARD) for card in cards).encode("ascii")
+    padding = -len(header) % FITS_BLOCK
+    return header + b" " * padding
+
+
+def write_tree(root: str, spec: TreeSpec) -> int:
+    """
+    Write a tree of header-only FITS files.
+
+    Args:
+        root: Source root directory (created if missing)
+        spec: Tree shape
+
+    Returns:
+        Number of files written
+    """
+    count = 0
+    created = set()
+    for path, metadata in iter_frames(root, spec):
+        directory = os.path.dirname(path)
+        if directory not in created:
+            os.makedirs(directory, exist_ok=True)
+            created.add(directory)
+        with open(path, "wb") as f:
+            f.write(fits_header(metadata))
+        count += 1
+    return count
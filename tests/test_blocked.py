@@ -0,0 +1,198 @@
+"""
+Tests for blocked module.
+"""
+
+import json
+import os
+
+import pytest
+
+from ap_move_light_to_data.blocked import (
+    BlockedIndex,
+    digest,
+    load_index,
+    signature,
+    write_index,
+)
+
+REQUIREMENTS = {
+    "darks": (("DARK", ["camera", "gain"]),),
+    "flats": (("FLAT", ["camera", "gain", "filter"]),),
+    "bias": (("BIAS", ["camera", "gain"]), ("DARK", ["camera", "gain", "exposure"])),
+}
+LIGHT = {
+    "type": "LIGHT",
+    "camera": "ASI2600MM",
+    "gain": 100,
+    "filter": "Ha",
+    "exposure": 300.0,
+}
+
+
+def _dir(*parts):
+    return os.sep.join(["", "data", *parts])
+
+
+def _frame(frame_type, **overrides):
+    metadata = dict(LIGHT, type=frame_type)
+    metadata.update(overrides)
+    return metadata
+
+
+def _index():
+    index = BlockedIndex(REQUIREMENTS, type_key="type")
+    index.record(
+        _dir("M31", "Ha"),
+        LIGHT,
+        [_dir("M31", "Ha"), _dir("M31"), _dir()],
+        ["flats"],
+    )
+    index.record(
+        _dir("M42", "Ha"),
+        dict(LIGHT, gain=0),
+        [_dir("M42", "Ha"), _dir("M42")],
+        ["darks"],
+    )
+    return index
+
+
+class TestSignature:
+    """Tests for signature function."""
+
+    def test_values_in_keyword_order(self):
+        """Missing keywords become None."""
+        assert signature({"gain": 100}, ["camera", "gain"]) == (None, 100)
+
+    def test_digest_follows_values(self):
+        """Rewritten headers change the digest; other keywords do not."""
+        assert digest(LIGHT, ["gain"]) == digest(dict(LIGHT, filter="R"), ["gain"])
+        assert digest(LIGHT, ["gain"]) != digest(dict(LIGHT, gain=0), ["gain"])
+
+
+class TestBlockedIndex:
+    """Tests for BlockedIndex class."""
+
+    def test_matching_frame_in_search_dir_unblocks(self):
+        """A flat with the light's signature in any search dir is a hit."""
+        index = _index()
+
+        for directory in (_dir("M31", "Ha"), _dir("M31"), _dir()):
+            path = os.path.join(directory, "flat.fits")
+            assert index.blocked_by(path, _frame("FLAT")) == {_dir("M31", "Ha")}
+
+    def test_frame_outside_search_dirs_ignored(self):
+        """Calibration elsewhere in the tree cannot satisfy the light."""
+        index = _index()
+
+        path = os.path.join(_dir("M42"), "flat.fits")
+        assert index.blocked_by(path, _frame("FLAT")) == set()
+
+    def test_signature_and_type_must_match(self):
+        """A different filter or frame type does not unblock."""
+        index = _index()
+        path = os.path.join(_dir("M31"), "new.fits")
+
+        assert index.blocked_by(path, _frame("FLAT", filter="OIII")) == set()
+        assert index.blocked_by(path, _frame("DARK")) == set()
+        assert index.blocked_by(path, _frame("LIGHT")) == set()
+
+    def test_exact_exposure_dark_unblocks_bias(self):
+        """A dark of the light's exposure removes the need for bias."""
+        index = BlockedIndex(REQUIREMENTS, type_key="type")
+        index.record(_dir("M31", "Ha"), LIGHT, [_dir("M31")], ["bias"])
+        path = os.path.join(_dir("M31"), "new.fits")
+
+        assert index.blocked_by(path, _frame("BIAS")) == {_dir("M31", "Ha")}
+        assert index.blocked_by(path, _frame("DARK", exposure=300)) == {
+            _dir("M31", "Ha")
+        }
+        assert index.blocked_by(path, _frame("DARK", exposure=60.0)) == set()
+
+    def test_affected_unions_frames(self):
+        """Several new frames report every directory they may unblock."""
+        index = _index()
+
+        affected = index.affected(
+            [
+                (os.path.join(_dir("M31"), "flat.fits"), _frame("FLAT")),
+                (os.path.join(_dir("M42"), "dark.fits"), _frame("DARK", gain=0)),
+            ]
+        )
+
+        assert affected == {_dir("M31", "Ha"), _dir("M42", "Ha")}
+
+    def test_record_replaces_and_discard_forgets(self):
+        """Re-recording drops old requirements; complete dirs leave the index."""
+        index = _index()
+        path = os.path.join(_dir("M31"), "flat.fits")
+
+        index.record(_dir("M31", "Ha"), LIGHT, [_dir("M31", "Ha")], ["darks"])
+        assert index.blocked_by(path, _frame("FLAT")) == set()
+        assert _dir("M31", "Ha") in index
+
+        index.record(_dir("M31", "Ha"), LIGHT, [_dir("M31", "Ha")], [])
+        assert _dir("M31", "Ha") not in index
+        assert len(index) == 1
+
+        index.discard(_dir("M42", "Ha"))
+        assert len(index) == 0
+
+
+class TestSavedIndex:
+    """Tests for write_index and load_index functions."""
+
+    STATE = {
+        "directories": {
+            _dir("M31", "Ha"): {
+                "missing": ["flats"],
+                "search_dirs": [_dir("M31", "Ha"), _dir("M31")],
+                "lights": "abc",
+            }
+        },
+        "calibration": {_dir("M31", "Ha"): {}, _dir("M31"): {"dark.fits": "d1"}},
+    }
+
+    def test_round_trip(self, tmp_path):
+        """A saved index loads back unchanged."""
+        path = str(tmp_path / "blocked.json")
+
+        write_index(self.STATE, path, scale_darks=False)
+
+        assert load_index(path, scale_darks=False) == self.STATE
+        assert not os.path.exists(path + ".tmp")
+
+    def test_other_scale_dark_setting_rejected(self, tmp_path):
+        """Statuses checked without --scale-dark do not apply with it."""
+        path = str(tmp_path / "blocked.json")
+        write_index(self.STATE, path, scale_darks=False)
+
+        with pytest.raises(ValueError, match="scale-dark"):
+            load_index(path, scale_darks=True)
+
+    @pytest.mark.parametrize(
+        "saved",
+        [
+            [],
+            {"version": 99},
+            {"version": 1, "scale_darks": False, "directories": []},
+            {
+                "version": 1,
+                "scale_darks": False,
+                "directories": {"/d": {"missing": "flats"}},
+                "calibration": {},
+            },
+            {
+                "version": 1,
+                "scale_darks": False,
+                "directories": {},
+                "calibration": {"/d": {"dark.fits": 1}},
+            },
+        ],
+    )
+    def test_malformed_index_rejected(self, tmp_path, saved):
+        """Foreign or corrupt files raise ValueError."""
+        path = tmp_path / "blocked.json"
+        path.write_text(json.dumps(saved))
+
+        with pytest.raises(ValueError):
+            load_index(str(path), scale_darks=False)
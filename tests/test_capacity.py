@@ -0,0 +1,275 @@
+"""
+Tests for capacity module.
+"""
+
+from collections import namedtuple
+from pathlib import Path
+
+from ap_move_light_to_data import capacity
+
+DiskUsage = namedtuple("DiskUsage", ["total", "used", "free"])
+
+
+def _files(root, *sizes_by_group):
+    """Build file dicts for groups "g0", "g1", ... on root's device."""
+    device = root.stat().st_dev
+    files = []
+    groups = []
+    for index, sizes in enumerate(sizes_by_group):
+        rel = Path(f"g{index}")
+        groups.append({"path": rel, "relative_path": rel})
+        for size in sizes:
+            files.append({"group": rel, "size": size, "device": device})
+    return files, groups
+
+
+class TestExistingAncestor:
+    """Tests for existing_ancestor function."""
+
+    def test_existing_path_returned(self, tmp_path):
+        """An existing path is its own anchor."""
+        assert capacity.existing_ancestor(tmp_path) == tmp_path
+
+    def test_missing_path_walks_up(self, tmp_path):
+        """A missing path resolves to its nearest existing parent."""
+        missing = tmp_path / "a" / "b" / "c"
+
+        assert capacity.existing_ancestor(missing) == tmp_path
+
+
+class TestPlanCapacity:
+    """Tests for plan_capacity function."""
+
+    def test_totals_bytes_per_group(self, tmp_path):
+        """Bytes are totalled per group and overall."""
+        files, groups = _files(tmp_path, [10, 20], [5])
+
+        plan = capacity.plan_capacity(files, groups, tmp_path, tmp_path / "dest")
+
+        assert plan["group_bytes"] == {"g0": 30, "g1": 5}
+        assert plan["file_count"] == 3
+        assert plan["total_bytes"] == 35
+
+    def test_consumes_iterator_once(self, tmp_path):
+        """A streaming iterator of files is enough to plan."""
+        files, groups = _files(tmp_path, [10, 20], [5])
+
+        plan = capacity.plan_capacity(
+            (f for f in files), groups, tmp_path, tmp_path / "dest"
+        )
+
+        assert plan["file_count"] == 3
+        assert plan["total_bytes"] == 35
+
+    def test_same_device_needs_two_largest_consecutive_groups(self, tmp_path):
+        """On one device only groups in flight at once need extra space."""
+        files, groups = _files(tmp_path, [100], [300], [50], [200])
+
+        plan = capacity.plan_capacity(files, groups, tmp_path, tmp_path / "dest")
+
+        assert plan["same_device"] is True
+        assert plan["required_bytes"] == 400
+
+    def test_different_device_needs_everything(self, tmp_path, mocker):
+        """Across devices every planned byte is new on the destination."""
+        files, groups = _files(tmp_path, [100], [300], [50])
+        real_stat = capacity.os.stat
+
+        def fake_stat(path, *args, **kwargs):
+            result = real_stat(path, *args, **kwargs)
+            if Path(path) == tmp_path / "dest":
+                return mocker.Mock(st_dev=result.st_dev + 1)
+            return result
+
+        (tmp_path / "dest").mkdir()
+        mocker.patch.object(capacity.os, "stat", side_effect=fake_stat)
+
+        plan = capacity.plan_capacity(files, groups, tmp_path, tmp_path / "dest")
+
+        assert plan["same_device"] is False
+        assert plan["required_bytes"] == 450
+
+    def test_mirrors_on_one_device_add_up(self, tmp_path):
+        """Destinations sharing a device need their combined space."""
+        files, groups = _files(tmp_path, [100], [300], [50])
+
+        plan = capacity.plan_capacity(
+            files, groups, tmp_path, tmp_path / "dest", [tmp_path / "backup"]
+        )
+
+        # The mirror is a permanent copy: in-flight 400 for dest, 450 for it
+        assert [d["required_bytes"] for d in plan["destinations"]] == [850, 850]
+        assert plan["required_bytes"] == 850
+
+    def test_files_already_copied_need_no_space(self, tmp_path):
+        """Only the bytes still to copy count towards each destination."""
+        files, groups = _files(tmp_path, [100, 200])
+        files[0]["to_copy"] = [0, 100]
+        files[1]["to_copy"] = [0, 0]
+
+        plan = capacity.plan_capacity(
+            files, groups, tmp_path, tmp_path / "dest", [tmp_path / "backup"]
+        )
+
+        assert plan["total_bytes"] == 300
+        assert [d["copy_bytes"] for d in plan["destinations"]] == [0, 100]
+        assert [d["required_bytes"] for d in plan["destinations"]] == [100, 100]
+
+    def test_any_full_mirror_refuses(self, tmp_path, mocker):
+        """The plan fails when any one destination lacks space."""
+        files, groups = _files(tmp_path, [10_000])
+        backup = tmp_path / "backup"
+        backup.mkdir()
+        real_stat = capacity.os.stat
+        real_usage = capacity.shutil.disk_usage
+
+        def fake_stat(path, *args, **kwargs):
+            result = real_stat(path, *args, **kwargs)
+            if Path(path) == backup:
+                return mocker.Mock(st_dev=result.st_dev + 1)
+            return result
+
+        def fake_usage(path):
+            if Path(path) == backup:
+                return DiskUsage(total=0, used=0, free=5_000)
+            return real_usage(path)
+
+        mocker.patch.object(capacity.os, "stat", side_effect=fake_stat)
+        mocker.patch.object(capacity.shutil, "disk_usage", side_effect=fake_usage)
+
+        plan = capacity.plan_capacity(files, groups, tmp_path, tmp_path, [backup])
+
+        assert [d["fits"] for d in plan["destinations"]] == [True, False]
+        assert plan["fits"] is False
+
+    def test_refuses_when_space_short(self, tmp_path, mocker):
+        """Plans larger than free space minus the reserve do not fit."""
+        files, groups = _files(tmp_path, [10_000])
+        mocker.patch.object(
+            capacity.shutil,
+            "disk_usage",
+            return_value=DiskUsage(total=0, used=0, free=5_000),
+        )
+
+        plan = capacity.plan_capacity(files, groups, tmp_path, tmp_path)
+
+        assert plan["free_bytes"] == 5_000
+        assert plan["fits"] is False
+
+    def test_empty_plan_always_fits(self, tmp_path, mocker):
+        """Nothing to copy never needs space."""
+        mocker.patch.object(
+            capacity.shutil,
+            "disk_usage",
+            return_value=DiskUsage(total=0, used=0, free=0),
+        )
+
+        plan = capacity.plan_capacity([], [], tmp_path, tmp_path)
+
+        assert plan["required_bytes"] == 0
+        assert plan["fits"] is True
+
+
+class TestRoomFor:
+    """Tests for room_for function."""
+
+    def test_room_everywhere(self, tmp_path, mocker):
+        """None when every destination has the bytes plus reserve free."""
+        mocker.patch.object(
+            capacity.shutil,
+            "disk_usage",
+            return_value=DiskUsage(total=0, used=0, free=10**12),
+        )
+
+        assert capacity.room_for([tmp_path, tmp_path / "new"], [10**6, 10**6]) is None
+
+    def test_first_short_destination(self, tmp_path, mocker):
+        """The first destination lacking room is reported with its free bytes."""
+        backup = tmp_path / "backup"
+        backup.mkdir()
+        mocker.patch.object(
+            capacity.shutil,
+            "disk_usage",
+            side_effect=lambda path: DiskUsage(
+                total=0, used=0, free=5_000 if Path(path) == backup else 10**12
+            ),
+        )
+
+        short = capacity.room_for([tmp_path, backup], [10_000, 10_000])
+
+        assert short == {"dest": backup, "required_bytes": 10_000, "free_bytes": 5_000}
+
+    def test_nothing_to_copy_always_fits(self, tmp_path, mocker):
+        """A destination that already holds every file needs no free space."""
+        mocker.patch.object(
+            capacity.shutil,
+            "disk_usage",
+            return_value=DiskUsage(total=0, used=0, free=0),
+        )
+
+        assert capacity.room_for([tmp_path], [0]) is None
+
+
+class TestFormatting:
+    """Tests for estimate and formatting helpers."""
+
+    def test_estimate_duration(self):
+        """Duration is bytes divided by throughput."""
+        assert capacity.estimate_duration(1000, 100) == 10.0
+        assert capacity.estimate_duration(1000, 0) == 0.0
+
+    def test_format_bytes(self):
+        """Byte counts use decimal units."""
+        assert capacity.format_bytes(999) == "999 B"
+        assert capacity.format_bytes(1500) == "1.5 KB"
+        assert capacity.format_bytes(300 * 1000**3) == "300.0 GB"
+
+    def test_format_duration(self):
+        """Durations are shown in the two largest units."""
+        assert capacity.format_duration(12) == "12s"
+        assert capacity.format_duration(185) == "3m 05s"
+        assert capacity.format_duration(3720) == "1h 02m"
+
+
+class TestCombinePlans:
+    """Tests for combine_plans function."""
+
+    def _plan(self, device, required_bytes, free_bytes):
+        return {
+            "file_count": 1,
+            "total_bytes": required_bytes,
+            "destinations": [
+                {
+                    "dest": Path(f"/dest{device}"),
+                    "device": device,
+                    "required_bytes": required_bytes,
+                    "free_bytes": free_bytes,
+                    "fits": True,
+                }
+            ],
+        }
+
+    def test_shared_device_needs_combined_space(self):
+        """Two plans that each fit alone can overflow a shared device."""
+        free = 15 * 10**9 + capacity.config.FREE_SPACE_RESERVE_BYTES
+        combined = capacity.combine_plans(
+            [self._plan(1, 10 * 10**9, free), self._plan(1, 10 * 10**9, free)]
+        )
+
+        assert combined["fits"] is False
+        assert combined["total_bytes"] == 20 * 10**9
+        assert combined["destinations"][0]["required_bytes"] == 20 * 10**9
+
+    def test_separate_devices_checked_independently(self):
+        """Plans on different devices only need their own space."""
+        free = 15 * 10**9 + capacity.config.FREE_SPACE_RESERVE_BYTES
+        combined = capacity.combine_plans(
+            [self._plan(1, 10 * 10**9, free), self._plan(2, 10 * 10**9, free)]
+        )
+
+        assert combined["fits"] is True
+        assert combined["file_count"] == 2
+
+    def test_no_plans_fit(self):
+        """Nothing to move always fits."""
+        assert capacity.combine_plans([])["fits"] is True
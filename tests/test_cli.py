@@ -0,0 +1,98 @@
+"""
+Tests for cli module and lazy package exports.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import ap_move_light_to_data
+from ap_move_light_to_data import cli, config, defaults, transfer
+
+
+def run_python(code):
+    """Run code in a fresh interpreter with this test run's import path."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+
+class TestLazyImports:
+    """Tests that startup does not load ap-common until a run needs it."""
+
+    def test_parser_does_not_import_ap_common(self):
+        """Building the parser and printing help leave ap-common unloaded."""
+        loaded = run_python(
+            "import contextlib, io, sys\n"
+            "from ap_move_light_to_data import cli\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try:\n"
+            "        cli.build_parser().parse_args(['--help'])\n"
+            "    except SystemExit:\n"
+            "        pass\n"
+            "print('ap_common' in sys.modules)\n"
+        )
+
+        assert loaded == ["False"]
+
+    def test_package_exports_load_on_access(self):
+        """Package exports import their module only when first used."""
+        loaded = run_python(
+            "import sys\n"
+            "import ap_move_light_to_data as package\n"
+            "name = 'ap_move_light_to_data.move_lights_to_data'\n"
+            "print(name in sys.modules)\n"
+            "package.process_light_directories\n"
+            "print(name in sys.modules)\n"
+        )
+
+        assert loaded == ["False", "True"]
+
+
+class TestPackageExports:
+    """Tests for the package's lazy __getattr__."""
+
+    def test_exports_resolve(self):
+        """Every name in __all__ resolves."""
+        for name in ap_move_light_to_data.__all__:
+            assert getattr(ap_move_light_to_data, name) is not None
+
+    def test_main_is_cli_main(self):
+        """The package and module entry points are the CLI's main."""
+        from ap_move_light_to_data import move_lights_to_data
+
+        assert ap_move_light_to_data.main is cli.main
+        assert move_lights_to_data.main is cli.main
+
+    def test_unknown_attribute(self):
+        """Unknown names raise AttributeError."""
+        with pytest.raises(AttributeError, match="no_such_name"):
+            ap_move_light_to_data.no_such_name
+
+    def test_dir_lists_exports(self):
+        """dir() includes exports not loaded yet."""
+        assert "check_light_directories" in dir(ap_move_light_to_data)
+
+
+class TestDefaults:
+    """Tests that parser defaults stay shared with the library."""
+
+    def test_reexported(self):
+        """config and transfer use the same defaults as the parser."""
+        assert config.DEFAULT_WORKERS == defaults.DEFAULT_WORKERS
+        assert config.DEFAULT_PATH_PATTERN == defaults.DEFAULT_PATH_PATTERN
+        assert transfer.IO_PRIORITY_CLASSES is defaults.IO_PRIORITY_CLASSES
+
+    def test_parser_defaults(self):
+        """The parser's defaults come from defaults.py."""
+        args = cli.build_parser().parse_args(["src", "dest"])
+
+        assert args.workers == defaults.DEFAULT_WORKERS
+        assert args.path_pattern == defaults.DEFAULT_PATH_PATTERN
@@ -53,7 +53,6 @@ class TestIntegrationCompleteScenarios:
                 "missing": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -76,6 +75,9 @@ class TestIntegrationCompleteScenarios:
             dest / "M31" / "2024-01-01" / "FILTER_B" / "lights" / "light_b.fits"
         ).exists()
         assert not date1.exists()
+        # The emptied TARGET is pruned; the source root is kept
+        assert not target.exists()
+        assert source.exists()
 
     def test_partial_target_moves_only_complete_dates(self, tmp_path, mocker):
         """Partial TARGET with mixed complete/incomplete DATEs moves only complete."""
@@ -133,7 +135,6 @@ class TestIntegrationCompleteScenarios:
             "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
             side_effect=mock_check_calibration,
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -149,9 +150,10 @@ class TestIntegrationCompleteScenarios:
         assert result["moved"] == 1
         assert (dest / "M31" / "2024-01-01" / "lights" / "light1.fits").exists()
         assert not (dest / "M31" / "2024-01-02").exists()
-        # DATE1 gone, DATE2 remains
+        # DATE1 gone, DATE2 remains, so TARGET is not pruned
         assert not date1.exists()
         assert date2.exists()
+        assert target.exists()
 
     def test_leaf_level_self_contained(self, tmp_path, mocker):
         """Leaf-level FILTER with its own calibration moves independently."""
@@ -187,7 +189,6 @@ class TestIntegrationCompleteScenarios:
                 "missing": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -206,6 +207,9 @@ class TestIntegrationCompleteScenarios:
         ).exists()
         assert (dest / "M31" / "2024-01-01" / "FILTER_R" / "dark.fits").exists()
         assert not filter_r.exists()
+        # DATE and TARGET left empty are pruned up to the source root
+        assert not (source / "M31").exists()
+        assert source.exists()
 
     def test_shared_calibration_blocks_complete_light(self, tmp_path, mocker):
         """Incomplete light blocks complete light when sharing calibration directory."""
@@ -259,7 +263,6 @@ class TestIntegrationCompleteScenarios:
             "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
             side_effect=mock_check_calibration,
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -276,6 +279,7 @@ class TestIntegrationCompleteScenarios:
         assert result["moved"] == 0
         assert not (dest / "M31").exists()
         assert date1.exists()  # Nothing moved
+        assert (filter_r / "lights" / "light_r.fits").exists()
 
     def test_path_pattern_excludes_complete_tree(self, tmp_path, mocker):
         """Path pattern filters out complete tree that doesn't match."""
@@ -314,7 +318,6 @@ class TestIntegrationCompleteScenarios:
                 "missing": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -332,6 +335,7 @@ class TestIntegrationCompleteScenarios:
         assert not (dest / "M31" / "reject").exists()
         assert not accept_dir.exists()
         assert reject_dir.exists()  # Not processed
+        assert (source / "M31").exists()  # Still holds reject
 
     def test_mixed_calibration_levels(self, tmp_path, mocker):
         """Mixed calibration levels: some self-contained, some shared."""
@@ -390,7 +394,6 @@ class TestIntegrationCompleteScenarios:
             "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
             side_effect=mock_check_calibration,
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -409,3 +412,4 @@ class TestIntegrationCompleteScenarios:
         assert (dest / "M31" / "2024-01-02" / "lights" / "light2.fits").exists()
         assert (dest / "M31" / "dark_target.fits").exists()
         assert not target.exists()
+        assert source.exists()
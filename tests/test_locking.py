@@ -0,0 +1,136 @@
+"""
+Tests for locking module.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from ap_move_light_to_data import config, locking
+
+pytestmark = pytest.mark.skipif(
+    locking.fcntl is None, reason="fcntl locks are not available"
+)
+
+
+@pytest.fixture
+def other_instance():
+    """Start another process holding a target's locks until the test ends."""
+    processes = []
+
+    def hold(roots, target):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+        code = (
+            "import sys\n"
+            "from ap_move_light_to_data import locking\n"
+            "locks = locking.TargetLocks()\n"
+            f"print(locks.acquire({[str(r) for r in roots]!r}, {target!r}))\n"
+            "sys.stdout.flush()\n"
+            "sys.stdin.read()\n"
+        )
+        process = subprocess.Popen(
+            [sys.executable, "-c", code],
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        processes.append(process)
+        assert process.stdout.readline().strip() == "True"
+        return process
+
+    yield hold
+    for process in processes:
+        process.communicate("")
+
+
+class TestGroupTarget:
+    """Tests for group_target."""
+
+    def test_first_component(self):
+        """The target is the first directory of the group's path."""
+        assert locking.group_target("M31/DATE_2024-01-01/FILTER_L") == "M31"
+        assert locking.group_target("M31") == "M31"
+
+    def test_source_root(self):
+        """A group at the source root has its own lock name."""
+        assert locking.group_target(".") == locking.ROOT_TARGET
+
+
+class TestTargetLocks:
+    """Tests for TargetLocks."""
+
+    def test_acquire_creates_lock_files(self, tmp_path):
+        """A lock file under every root names the holder."""
+        roots = [tmp_path / "source", tmp_path / "dest"]
+        with locking.TargetLocks() as locks:
+            assert locks.acquire(roots, "M31")
+            assert len(locks) == 2
+
+        for root in roots:
+            path = root / config.LOCK_DIR_NAME / "M31.lock"
+            assert path.read_text().split()[-1] == str(os.getpid())
+        assert len(locks) == 0
+
+    def test_reacquire_is_free(self, tmp_path):
+        """A target already held by this process is granted again."""
+        locks = locking.TargetLocks()
+
+        assert locks.acquire([tmp_path], "M31")
+        assert locks.acquire([tmp_path], "M31")
+        assert len(locks) == 1
+        locks.release_all()
+
+    def test_held_by_other_instance(self, tmp_path, other_instance):
+        """A target another process holds is refused and its holder named."""
+        other = other_instance([tmp_path], "M31")
+        locks = locking.TargetLocks()
+
+        assert not locks.acquire([tmp_path], "M31")
+        assert len(locks) == 0
+        assert locks.holder("M31").endswith(str(other.pid))
+        assert locks.acquire([tmp_path], "M42")
+        locks.release_all()
+
+    def test_shared_destination_excludes(self, tmp_path, other_instance):
+        """Different sources moving into one destination exclude each other."""
+        dest = tmp_path / "dest"
+        other_instance([tmp_path / "rig1", dest], "M31")
+        locks = locking.TargetLocks()
+
+        assert not locks.acquire([tmp_path / "rig2", dest], "M31")
+        # The rig2 lock taken before the refusal was given back
+        assert len(locks) == 0
+        other_instance([tmp_path / "rig2"], "M31")
+
+    def test_unwritable_root_not_locked(self, tmp_path, mocker, caplog):
+        """A root that cannot hold lock files is logged, not fatal."""
+        real_open = os.open
+        source = tmp_path / "source"
+
+        def read_only_source(path, *args, **kwargs):
+            if path.startswith(str(source)):
+                raise PermissionError(30, "Read-only file system")
+            return real_open(path, *args, **kwargs)
+
+        mocker.patch.object(locking.os, "open", side_effect=read_only_source)
+        locks = locking.TargetLocks()
+
+        assert locks.acquire([source, tmp_path / "dest"], "M31")
+        assert locks.acquire([source, tmp_path / "dest"], "M42")
+        assert len(locks) == 2
+        assert caplog.text.count("Cannot create lock files") == 1
+        locks.release_all()
+
+    def test_holder_unknown(self):
+        """A target never refused has no recorded holder."""
+        assert locking.TargetLocks().holder("M31") == "another instance"
+
+    def test_released_on_exit(self, tmp_path, other_instance):
+        """Another process can take a target once this one releases it."""
+        with locking.TargetLocks() as locks:
+            assert locks.acquire([tmp_path], "M31")
+
+        other_instance([tmp_path], "M31")
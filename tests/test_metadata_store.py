@@ -0,0 +1,155 @@
+"""
+Tests for metadata_store module.
+"""
+
+import os
+
+import pytest
+
+from ap_move_light_to_data.metadata_store import MetadataStore
+
+KEYS = ["type", "camera", "gain", "exposureseconds"]
+
+
+def _path(*parts):
+    return os.sep.join(["", "data", *parts])
+
+
+def _light(**overrides):
+    metadata = {
+        "type": "LIGHT",
+        "camera": "ASI2600MM",
+        "gain": 100,
+        "exposureseconds": 300.0,
+        "ra": 10.68,
+        "object": "M31",
+    }
+    metadata.update(overrides)
+    return metadata
+
+
+class TestMetadataStore:
+    """Tests for MetadataStore class."""
+
+    def test_mapping_behaves_like_dict(self):
+        """Lookups, membership, length and iteration match the source dict."""
+        source = {
+            _path("M31", "a.fits"): _light(),
+            _path("M31", "b.fits"): _light(gain=0),
+            _path("M42", "c.fits"): _light(type="DARK"),
+        }
+
+        store = MetadataStore.from_metadata(source, KEYS)
+
+        assert len(store) == 3
+        assert set(store) == set(source)
+        assert _path("M31", "a.fits") in store
+        assert _path("M31", "missing.fits") not in store
+        assert _path("M99", "a.fits") not in store
+        assert store[_path("M31", "b.fits")]["gain"] == 0
+        assert store.get(_path("M99", "a.fits")) is None
+        with pytest.raises(KeyError):
+            store[_path("M99", "a.fits")]
+
+    def test_only_kept_keywords_are_returned(self):
+        """Keywords not needed for matching are dropped."""
+        store = MetadataStore.from_metadata({_path("M31", "a.fits"): _light()}, KEYS)
+
+        assert store[_path("M31", "a.fits")] == {
+            "type": "LIGHT",
+            "camera": "ASI2600MM",
+            "gain": 100,
+            "exposureseconds": 300.0,
+        }
+
+    def test_missing_keywords_stay_missing(self):
+        """A keyword the file lacked is absent, not None."""
+        store = MetadataStore.from_metadata(
+            {_path("M31", "a.fits"): {"type": "LIGHT", "gain": None}}, KEYS
+        )
+
+        metadata = store[_path("M31", "a.fits")]
+
+        assert metadata == {"type": "LIGHT", "gain": None}
+        assert "camera" not in metadata
+
+    def test_path_key_holds_file_path(self):
+        """The path keyword is filled from the key, as the loader does."""
+        path = _path("M31", "a.fits")
+        store = MetadataStore.from_metadata({path: _light()}, KEYS, path_key="filename")
+
+        assert store[path]["filename"] == path
+        assert dict(store.items())[path]["filename"] == path
+
+    def test_items_match_lookups(self):
+        """items() yields the same pairs as key lookups."""
+        source = {_path("M31", f"{i}.fits"): _light(gain=i % 3) for i in range(10)}
+        store = MetadataStore.from_metadata(source, KEYS)
+
+        assert len(store.items()) == 10
+        assert list(store.items()) == [(path, store[path]) for path in store]
+
+    def test_identical_records_are_shared(self):
+        """Files differing only in name share one record and one directory."""
+        source = {_path("M31", f"{i}.fits"): _light() for i in range(100)}
+        source[_path("M42", "x.fits")] = _light(gain=0)
+
+        stats = MetadataStore.from_metadata(source, KEYS).stats()
+
+        assert stats == {"files": 101, "directories": 2, "records": 2, "values": 5}
+
+    def test_equal_values_of_different_types_are_kept_apart(self):
+        """1 and 1.0 are equal but stay distinct values."""
+        store = MetadataStore.from_metadata(
+            {
+                _path("M31", "a.fits"): {"gain": 1},
+                _path("M31", "b.fits"): {"gain": 1.0},
+            },
+            KEYS,
+        )
+
+        assert type(store[_path("M31", "a.fits")]["gain"]) is int
+        assert type(store[_path("M31", "b.fits")]["gain"]) is float
+
+    def test_string_values_are_interned(self):
+        """Equal strings from different files become one object."""
+        store = MetadataStore.from_metadata(
+            {
+                _path("M31", "a.fits"): {"camera": "".join(["ASI", "2600MM"])},
+                _path("M31", "b.fits"): {"camera": "".join(["ASI26", "00MM"])},
+            },
+            KEYS,
+        )
+
+        first = store[_path("M31", "a.fits")]["camera"]
+        second = store[_path("M31", "b.fits")]["camera"]
+
+        assert first is second
+
+    def test_replacing_a_file_keeps_count(self):
+        """Adding a path twice replaces its metadata."""
+        store = MetadataStore(KEYS)
+        store.add(_path("M31", "a.fits"), _light())
+        store.add(_path("M31", "a.fits"), _light(type="DARK"))
+
+        assert len(store) == 1
+        assert store[_path("M31", "a.fits")]["type"] == "DARK"
+
+    def test_slotted(self):
+        """The store has no per-instance dict."""
+        assert not hasattr(MetadataStore(KEYS), "__dict__")
+
+    def test_consume_empties_source(self):
+        """consume stores every file, in order, and leaves the dict empty."""
+        source = {
+            _path("M31", "a.fits"): _light(),
+            _path("M42", "b.fits"): _light(gain=0),
+        }
+        paths = list(source)
+
+        store = MetadataStore(KEYS)
+        store.consume(source)
+
+        assert source == {}
+        assert list(store) == paths
+        assert store[_path("M42", "b.fits")]["gain"] == 0
@@ -0,0 +1,107 @@
+"""
+Tests for metrics module.
+"""
+
+from ap_move_light_to_data import metrics
+
+
+def sample_results():
+    """Results as returned by process_light_directories."""
+    return {
+        "dir_count": 12,
+        "files_scanned": 400,
+        "moved": 3,
+        "copied": 90,
+        "skipped_identical": 2,
+        "verified": 0,
+        "skipped_stale": 0,
+        "bytes_copied": 1_000_000,
+        "copy_seconds": 4.0,
+        "skipped_no_darks": 1,
+        "skipped_no_flats": 2,
+        "skipped_no_bias": 0,
+        "errors": 0,
+        "timings": {"load": 1.5, "move.copy": 4.0},
+    }
+
+
+def samples(text):
+    """Map 'name{labels}' to its value string, skipping comments."""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            result[name] = value
+    return result
+
+
+class TestFormatMetrics:
+    """Tests for format_metrics function."""
+
+    def test_counts_and_throughput(self):
+        """Results become gauges, with throughput derived from copy time."""
+        text = metrics.format_metrics(sample_results(), timestamp=1700000000.0)
+        values = samples(text)
+
+        assert values["ap_move_light_to_data_last_run_timestamp_seconds"] == (
+            "1700000000.0"
+        )
+        assert values["ap_move_light_to_data_last_run_success"] == "1"
+        assert values["ap_move_light_to_data_dry_run"] == "0"
+        assert values["ap_move_light_to_data_files_scanned"] == "400"
+        assert values["ap_move_light_to_data_groups_moved"] == "3"
+        assert values["ap_move_light_to_data_bytes_copied"] == "1000000"
+        assert values["ap_move_light_to_data_copy_bytes_per_second"] == "250000.0"
+        assert text.endswith("\n")
+
+    def test_labelled_families(self):
+        """Incomplete directories and phases are labelled samples."""
+        values = samples(metrics.format_metrics(sample_results(), timestamp=0.0))
+
+        name = "ap_move_light_to_data_incomplete_directories"
+        assert values[f'{name}{{missing="darks"}}'] == "1"
+        assert values[f'{name}{{missing="flats"}}'] == "2"
+        assert values[f'{name}{{missing="bias"}}'] == "0"
+        name = "ap_move_light_to_data_phase_seconds"
+        assert values[f'{name}{{phase="move.copy"}}'] == "4.0"
+
+    def test_every_family_declared_once(self):
+        """Each metric has one HELP and TYPE gauge line."""
+        text = metrics.format_metrics(sample_results(), timestamp=0.0)
+        types = [line for line in text.splitlines() if line.startswith("# TYPE")]
+
+        assert len(types) == len(set(types))
+        assert all(line.endswith(" gauge") for line in types)
+
+    def test_errors_and_missing_keys(self):
+        """A failed run with partial results still renders."""
+        values = samples(
+            metrics.format_metrics({"errors": 2}, dry_run=True, timestamp=0.0)
+        )
+
+        assert values["ap_move_light_to_data_last_run_success"] == "0"
+        assert values["ap_move_light_to_data_dry_run"] == "1"
+        assert values["ap_move_light_to_data_errors"] == "2"
+        assert values["ap_move_light_to_data_copy_bytes_per_second"] == "0.0"
+
+    def test_label_values_escaped(self):
+        """Quotes and backslashes in labels are escaped."""
+        text = metrics.format_metrics({"timings": {'a"b\\c': 1.0}}, timestamp=0.0)
+
+        assert 'phase="a\\"b\\\\c"' in text
+
+
+class TestWriteMetricsFile:
+    """Tests for write_metrics_file function."""
+
+    def test_replaces_file(self, tmp_path):
+        """The file is replaced and no temporary file is left."""
+        path = tmp_path / "ap_move.prom"
+        path.write_text("old\n")
+
+        metrics.write_metrics_file(str(path), sample_results(), timestamp=0.0)
+
+        assert path.read_text() == metrics.format_metrics(
+            sample_results(), timestamp=0.0
+        )
+        assert [p.name for p in tmp_path.iterdir()] == ["ap_move.prom"]
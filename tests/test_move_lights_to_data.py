@@ -4,11 +4,23 @@ Tests for move_lights_to_data module.
 Generated By: Claude Code (Claude Sonnet 4.5)
 """
 
+import json
+import os
 import re
+import shutil
+import sys
+import time
 import pytest
 from pathlib import Path
+from ap_common.constants import TYPE_DARK, TYPE_FLAT, TYPE_LIGHT
 from ap_move_light_to_data import move_lights_to_data
 from ap_move_light_to_data.move_lights_to_data import EXIT_ERROR, EXIT_SUCCESS
+from ap_move_light_to_data.tracing import Tracer
+from ap_move_light_to_data.status import (
+    CalibrationStatus,
+    DirectoryStatus,
+    MovableGroup,
+)
 
 
 class TestBuildSearchDirs:
@@ -703,7 +715,6 @@ class TestProcessLightDirectories:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -841,7 +852,6 @@ class TestProcessLightDirectories:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -899,6 +909,7 @@ class TestProcessLightDirectories:
             },
         )
 
+        (source / "unrelated" / "empty").mkdir(parents=True)
         mock_cleanup = mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
@@ -912,14 +923,15 @@ class TestProcessLightDirectories:
         )
 
         assert result["moved"] == 1
-        # Verify cleanup was called with correct parameters
-        # (printStatus=False because quiet=True)
-        mock_cleanup.assert_called_once_with(
-            str(source), dryrun=False, printStatus=False
-        )
+        # Only the moved group's ancestors are pruned, up to (not including)
+        # the source root; the rest of the source tree is not walked
+        assert not (source / "parent").exists()
+        assert source.exists()
+        assert (source / "unrelated" / "empty").exists()
+        mock_cleanup.assert_not_called()
 
     def test_handles_move_permission_error(self, tmp_path, mocker):
-        """Permission error during copy is tracked and deletion skipped."""
+        """Permission error during copy keeps only the affected group."""
         source = tmp_path / "source"
         dest = tmp_path / "dest"
         tree1 = source / "tree1"
@@ -966,10 +978,9 @@ class TestProcessLightDirectories:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
-        # Mock ap_common.copy_file to raise PermissionError on first file
-        mock_copy = mocker.patch("ap_common.copy_file")
+        # Mock transfer.copy_file to raise PermissionError on first file
+        mock_copy = mocker.patch("ap_move_light_to_data.transfer.copy_file")
         mock_copy.side_effect = [PermissionError("Access denied"), None]
 
         result = move_lights_to_data.process_light_directories(
@@ -982,9 +993,11 @@ class TestProcessLightDirectories:
             scale_darks=False,
         )
 
-        # Copy failed for one file, so deletion should be skipped entirely
-        assert result["moved"] == 0
+        # Copy failed for tree1 only; tree2 is still committed
+        assert result["moved"] == 1
         assert result["errors"] == 1
+        assert (tree1 / "file1.fits").exists()
+        assert not tree2.exists()
 
     def test_handles_disk_full_error(self, tmp_path, mocker):
         """Disk full error during copy is tracked and deletion skipped."""
@@ -1022,10 +1035,9 @@ class TestProcessLightDirectories:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
-        # Mock ap_common.copy_file to raise OSError (disk full)
-        mock_copy = mocker.patch("ap_common.copy_file")
+        # Mock transfer.copy_file to raise OSError (disk full)
+        mock_copy = mocker.patch("ap_move_light_to_data.transfer.copy_file")
         mock_copy.side_effect = OSError("No space left on device")
 
         result = move_lights_to_data.process_light_directories(
@@ -1251,7 +1263,6 @@ class TestEdgeCases:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -1266,6 +1277,7 @@ class TestEdgeCases:
         assert result["moved"] == 1
         assert (dest / "目标M31" / "日期2024" / "file.fits").exists()
         assert not tree.exists()
+        assert not (source / "目标M31").exists()  # Emptied ancestor pruned
 
     def test_handles_paths_with_spaces(self, tmp_path, mocker):
         """Handles paths with spaces correctly."""
@@ -1304,7 +1316,6 @@ class TestEdgeCases:
                 "incomplete_dirs": [],
             },
         )
-        mocker.patch("ap_common.delete_empty_directories")
 
         result = move_lights_to_data.process_light_directories(
             str(source),
@@ -1319,6 +1330,7 @@ class TestEdgeCases:
         assert result["moved"] == 1
         assert (dest / "My Target" / "My Date" / "My Filter" / "my light.fits").exists()
         assert not tree.exists()
+        assert not (source / "My Target").exists()  # Emptied ancestors pruned
 
     def test_very_deep_hierarchy(self, tmp_path):
         """Handles very deep directory hierarchies (10+ levels)."""
@@ -1586,6 +1598,74 @@ class TestPrintSummary:
         assert "Darks:" in captured.out
         assert "Flats:" in captured.out
 
+    def test_print_summary_with_throughput(self, capsys):
+        """Prints bytes copied, duration and average throughput."""
+        results = {
+            "dir_count": 1,
+            "target_count": 1,
+            "date_count": 1,
+            "filter_count": 1,
+            "moved": 1,
+            "skipped_no_darks": 0,
+            "skipped_no_flats": 0,
+            "skipped_no_bias": 0,
+            "biases_needed": 0,
+            "bytes_copied": 3_000_000_000,
+            "copy_seconds": 60.0,
+            "errors": 0,
+        }
+
+        move_lights_to_data.print_summary(results)
+
+        captured = capsys.readouterr()
+        assert "Copied: 3.0 GB in 1m 00s (50.0 MB/s)" in captured.out
+
+    def test_print_summary_locked(self, capsys):
+        """Groups skipped for another instance's lock are reported."""
+        results = {
+            "dir_count": 2,
+            "target_count": 2,
+            "date_count": 2,
+            "filter_count": 2,
+            "moved": 1,
+            "skipped_no_darks": 0,
+            "skipped_no_flats": 0,
+            "skipped_no_bias": 0,
+            "biases_needed": 0,
+            "skipped_locked": 1,
+            "errors": 0,
+        }
+
+        move_lights_to_data.print_summary(results)
+
+        captured = capsys.readouterr()
+        assert "Locked by another instance: 1 group (re-run" in captured.out
+
+    def test_print_summary_timings(self, capsys):
+        """Phase timings are printed only when asked for."""
+        results = {
+            "dir_count": 1,
+            "target_count": 1,
+            "date_count": 1,
+            "filter_count": 1,
+            "skipped_no_darks": 0,
+            "skipped_no_flats": 0,
+            "skipped_no_bias": 0,
+            "biases_needed": 0,
+            "errors": 0,
+            "timings": {"load": 12.5, "move": 30.0, "move.copy": 25.0},
+        }
+
+        move_lights_to_data.print_summary(results)
+        assert "Timings:" not in capsys.readouterr().out
+
+        move_lights_to_data.print_summary(results, show_timings=True)
+        lines = capsys.readouterr().out.splitlines()
+        start = lines.index("Timings:")
+        assert lines[start + 1].split() == ["load", "12.50s"]
+        assert lines[start + 2].split() == ["move", "30.00s"]
+        assert lines[start + 3].startswith("    copy")
+
     def test_print_summary_with_bias(self, capsys):
         """Prints summary with bias metrics when scale_darks=True."""
         results = {
@@ -1789,6 +1869,82 @@ class TestMetadataCaching:
         call_args = mock_get_metadata.call_args
         assert str(source) in call_args[1]["dirs"]
 
+    def test_load_metadata_in_batches(self, tmp_path, mocker):
+        """Metadata is loaded and stored one first-level directory at a time."""
+        source = tmp_path / "source"
+        for target in ("M42", "M31"):
+            (source / target).mkdir(parents=True)
+        (source / "stray.fits").write_bytes(b"")
+        (source / move_lights_to_data.config.LOCK_DIR_NAME).mkdir()
+        held = []
+
+        def get_metadata(dirs, recursive, **kwargs):
+            # Batches already loaded are in the store, not in the loader's dict
+            held.append(len(store_spy.spy_return or ()))
+            path = os.path.join(dirs[0], "frame.fits")
+            return {path: {move_lights_to_data.NORMALIZED_HEADER_FILENAME: path}}
+
+        mock_get_metadata = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            side_effect=get_metadata,
+        )
+        store_spy = mocker.spy(move_lights_to_data, "MetadataStore")
+
+        cache = move_lights_to_data.load_metadata([source], quiet=True)
+
+        assert [
+            (call.kwargs["dirs"], call.kwargs["recursive"])
+            for call in mock_get_metadata.call_args_list
+        ] == [
+            ([str(source)], False),
+            ([str(source / "M31")], True),
+            ([str(source / "M42")], True),
+        ]
+        assert held == [0, 1, 2]
+        assert sorted(cache) == sorted(
+            os.path.join(d, "frame.fits")
+            for d in (str(source), str(source / "M31"), str(source / "M42"))
+        )
+
+    def test_load_metadata_failure_falls_back(self, tmp_path, mocker):
+        """A batch that fails to load leaves metadata to be read lazily."""
+        mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            side_effect=OSError("corrupt header"),
+        )
+
+        assert move_lights_to_data.load_metadata([tmp_path], quiet=True) is None
+
+
+class MainRunner:
+    """Runs main() on a temp source and destination with processing mocked."""
+
+    def __init__(self, tmp_path, mocker):
+        self.mocker = mocker
+        self.source = tmp_path / "source"
+        self.dest = tmp_path / "dest"
+        self.source.mkdir()
+        self.dest.mkdir()
+        self.process = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.process_light_directories",
+            return_value={"errors": 0},
+        )
+        self.summary = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.print_summary"
+        )
+
+    def __call__(self, *args):
+        """Run main() with source, dest and args on the command line."""
+        argv = ["ap-move-light-to-data", str(self.source), str(self.dest)]
+        self.mocker.patch("sys.argv", argv + [str(arg) for arg in args])
+        return move_lights_to_data.main()
+
+
+@pytest.fixture
+def run_main(tmp_path, mocker):
+    """MainRunner for command-line flag tests."""
+    return MainRunner(tmp_path, mocker)
+
 
 class TestMainCLIArguments:
     """Tests for CLI argument parsing in main() function.
@@ -1916,6 +2072,189 @@ class TestMainCLIArguments:
         call_args = mock_process.call_args
         assert call_args.args[4] is True  # dry_run parameter = True
 
+    def test_verify_flag(self, run_main):
+        """Test --verify flag is correctly passed."""
+        assert run_main("--verify") == EXIT_SUCCESS
+        assert run_main.process.call_args.kwargs["verify"] is True
+
+    def test_verify_default(self, run_main):
+        """Test verification is off when --verify is omitted."""
+        run_main()
+
+        assert run_main.process.call_args.kwargs["verify"] is False
+
+    def test_throttle_flags(self, run_main):
+        """Test --max-bytes-per-sec and --max-iops are correctly passed."""
+        result = run_main("--max-bytes-per-sec", "50000000", "--max-iops", "200")
+
+        assert result == EXIT_SUCCESS
+        call_args = run_main.process.call_args
+        assert call_args.kwargs["max_bytes_per_sec"] == 50000000
+        assert call_args.kwargs["max_iops"] == 200
+
+    def test_throttle_rejects_zero(self, run_main):
+        """Test --max-iops must be positive."""
+        with pytest.raises(SystemExit):
+            run_main("--max-iops", "0")
+
+    def test_workers_flag(self, run_main):
+        """Test --workers is correctly passed."""
+        run_main("--workers", "16")
+
+        assert run_main.process.call_args.kwargs["workers"] == 16
+
+    def test_multiple_destinations(self, tmp_path, run_main):
+        """Test extra destinations are passed as mirrors of the first."""
+        backup = tmp_path / "backup"
+
+        assert run_main(backup, "--verify") == EXIT_SUCCESS
+        call_args = run_main.process.call_args
+        assert call_args.args[1] == str(run_main.dest)
+        assert call_args.kwargs["mirror_dirs"] == [str(backup)]
+        assert call_args.kwargs["verify"] is True
+
+    def test_single_destination_has_no_mirrors(self, run_main):
+        """Test a single destination passes no mirrors."""
+        run_main()
+
+        assert run_main.process.call_args.args[1] == str(run_main.dest)
+        assert run_main.process.call_args.kwargs["mirror_dirs"] == []
+
+    def test_mirror_destination_not_directory(self, tmp_path, run_main):
+        """Test an extra destination that is a file is rejected."""
+        backup = tmp_path / "backup"
+        backup.write_text("not a directory")
+
+        assert run_main(backup) == EXIT_ERROR
+        run_main.process.assert_not_called()
+
+    def test_plan_flags(self, run_main):
+        """Test --plan-out and --apply-plan are correctly passed."""
+        run_main("--apply-plan", "morning.json", "--plan-out", "evening.json")
+
+        assert run_main.process.call_args.kwargs["apply_plan"] == "morning.json"
+        assert run_main.process.call_args.kwargs["plan_out"] == "evening.json"
+
+    def test_timings_flag(self, run_main):
+        """Test --timings is passed to print_summary."""
+        run_main("--timings")
+
+        assert run_main.summary.call_args.kwargs["show_timings"] is True
+
+    def test_metrics_file_flag(self, tmp_path, run_main):
+        """Test --metrics-file writes the run's results as metrics."""
+        metrics_file = tmp_path / "ap_move.prom"
+        run_main.process.return_value = {"errors": 0, "moved": 4}
+
+        run_main("--dryrun", "--metrics-file", metrics_file)
+
+        text = metrics_file.read_text()
+        assert "ap_move_light_to_data_groups_moved 4\n" in text
+        assert "ap_move_light_to_data_dry_run 1\n" in text
+
+    def test_check_workers_flag(self, run_main):
+        """Test --check-workers is passed to process_light_directories."""
+        run_main("--check-workers", "4")
+
+        assert run_main.process.call_args.kwargs["check_workers"] == 4
+
+    def test_check_workers_must_be_positive(self, run_main):
+        """Test --check-workers rejects zero."""
+        with pytest.raises(SystemExit):
+            run_main("--check-workers", "0")
+
+    def test_blocked_index_flag(self, tmp_path, run_main):
+        """Test --blocked-index is passed to process_light_directories."""
+        run_main("--blocked-index", tmp_path / "blocked.json")
+
+        assert run_main.process.call_args.kwargs["blocked_index"] == str(
+            tmp_path / "blocked.json"
+        )
+
+    def test_metrics_file_write_failure(self, tmp_path, mocker, run_main):
+        """An unwritable metrics file is logged and fails the exit code."""
+        log_error = mocker.patch("ap_move_light_to_data.cli.logger.error")
+        metrics_file = tmp_path / "missing" / "ap_move.prom"
+
+        exit_code = run_main("--dryrun", "--metrics-file", metrics_file)
+
+        assert exit_code == EXIT_ERROR
+        assert "Failed to write metrics file" in log_error.call_args.args[0]
+        run_main.summary.assert_called_once()
+
+    def test_trace_flag(self, tmp_path, run_main):
+        """Test --trace passes a tracer and writes its events."""
+        trace_file = tmp_path / "trace.json"
+
+        run_main("--trace", trace_file)
+
+        assert run_main.process.call_args.kwargs["tracer"] is not None
+        assert "traceEvents" in json.loads(trace_file.read_text())
+
+    def test_trace_write_failure(self, tmp_path, mocker, run_main):
+        """An unwritable trace file is logged and fails the exit code."""
+        log_error = mocker.patch("ap_move_light_to_data.cli.logger.error")
+
+        exit_code = run_main("--trace", tmp_path / "missing" / "trace.json")
+
+        assert exit_code == EXIT_ERROR
+        assert "Failed to write trace file" in log_error.call_args.args[0]
+        run_main.summary.assert_called_once()
+
+    def test_profile_flag(self, tmp_path, run_main, capsys):
+        """Test --profile writes stats and prints hotspots after the summary."""
+        stats_file = tmp_path / "run.prof"
+        run_main.summary.side_effect = lambda *args, **kwargs: print("SUMMARY")
+
+        run_main("--profile", stats_file)
+
+        assert stats_file.exists()
+        out = capsys.readouterr().out
+        assert out.index("SUMMARY") < out.index("Profile hotspots")
+
+    def test_pair_flag(self, tmp_path, run_main):
+        """Test --pair adds source/destination pairs, in order."""
+        dest = run_main.dest
+        rig2 = tmp_path / "rig2"
+        calib = tmp_path / "calib"
+        rig2.mkdir()
+        calib.mkdir()
+
+        run_main("--pair", rig2, dest / "rig2", "--pair", calib, dest / "calib")
+
+        assert run_main.process.call_args.kwargs["extra_pairs"] == [
+            (str(rig2), str(dest / "rig2")),
+            (str(calib), str(dest / "calib")),
+        ]
+
+    def test_pair_source_must_exist(self, tmp_path, run_main):
+        """A missing --pair source is rejected before processing."""
+        result = run_main("--pair", tmp_path / "missing", tmp_path / "dest2")
+
+        assert result == EXIT_ERROR
+        run_main.process.assert_not_called()
+
+    def test_pair_with_plan_rejected(self, tmp_path, run_main):
+        """--pair cannot be combined with move plans."""
+        with pytest.raises(SystemExit):
+            run_main(
+                "--pair",
+                run_main.source,
+                tmp_path / "dest2",
+                "--plan-out",
+                "plan.json",
+            )
+
+    def test_io_priority_flag(self, mocker, run_main):
+        """Test --io-priority lowers priority before processing."""
+        mock_priority = mocker.patch(
+            "ap_move_light_to_data.transfer.set_io_priority", return_value=True
+        )
+
+        run_main("--io-priority", "idle")
+
+        mock_priority.assert_called_once_with("idle")
+
     def test_quiet_flag(self, tmp_path, mocker):
         """Test --quiet flag is correctly passed."""
         source = tmp_path / "source"
@@ -2033,7 +2372,7 @@ class TestMainCLIArguments:
         assert call_args.args[5] is True  # quiet = True
         assert call_args.args[6] is True  # scale_darks = True
 
-    def test_error_exit_code(self, tmp_path, mocker):
+    def test_error_exit_code(self, tmp_path, mocker, analysis_steps):
         """Test EXIT_ERROR when process returns errors."""
         source = tmp_path / "source"
         dest = tmp_path / "dest"
@@ -2055,3 +2394,1669 @@ class TestMainCLIArguments:
 
         assert result == EXIT_ERROR
         mock_process.assert_called_once()
+
+
+@pytest.fixture
+def analysis_steps(mocker):
+    """Run the analysis steps on a temp-dir tree, mocking only metadata reads.
+
+    Returns a function taking light directories. Each is found under its
+    source and holds a light frame whose calibration is the dark*.fits and
+    flat*.fits files in the nearest directory (the light directory or a parent
+    below the source) holding any, so filtering, checking and grouping run for
+    real. Without calibration files, a dark in the light directory is assumed,
+    so the light directory is its own group.
+    """
+    light_dirs: list = []
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+        return_value={},
+    )
+
+    def find(root_dir, metadata_cache, debug=False):
+        return [d for d in light_dirs if d.startswith(str(root_dir) + os.sep)]
+
+    def check(light_metadata, search_dirs, metadata_cache, scale_darks, debug, quiet):
+        # search_dirs runs from the light directory up toward the source
+        darks, flats = (os.path.join(search_dirs[0], "dark.fits"),), ()
+        for directory in search_dirs:
+            found = sorted(p for p in Path(directory).glob("*.fits") if p.is_file())
+            if any(p.name.startswith(("dark", "flat")) for p in found):
+                darks = tuple(str(p) for p in found if p.name.startswith("dark"))
+                flats = tuple(str(p) for p in found if p.name.startswith("flat"))
+                break
+        return CalibrationStatus(
+            has_darks=True, has_flats=True, matched_darks=darks, matched_flats=flats
+        )
+
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.find_all_light_directories",
+        side_effect=find,
+    )
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.get_light_frames",
+        return_value={"light.fits": {}},
+    )
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
+        side_effect=check,
+    )
+
+    def mark(*paths):
+        light_dirs.extend(str(path) for path in paths)
+
+    return mark
+
+
+class TestVerifiedCopy:
+    """Tests for --verify handling in process_light_directories."""
+
+    def test_verified_move(self, tmp_path, mocker, analysis_steps):
+        """Verified files are counted and the source group is deleted."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light1.fits").write_bytes(b"one")
+        (tree / "light2.fits").write_bytes(b"two")
+        analysis_steps(tree)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            verify=True,
+        )
+
+        assert result["verified"] == 2
+        assert result["moved"] == 1
+        assert result["errors"] == 0
+        assert (dest / "tree" / "light1.fits").read_bytes() == b"one"
+        assert not tree.exists()
+
+    def test_checksum_mismatch_keeps_source(self, tmp_path, mocker, analysis_steps):
+        """A checksum mismatch is an error and the source is not deleted."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        analysis_steps(tree)
+        mocker.patch("ap_move_light_to_data.transfer.hash_file", return_value="corrupt")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            verify=True,
+        )
+
+        assert result["verified"] == 0
+        assert result["moved"] == 0
+        assert result["errors"] == 1
+        assert (tree / "light.fits").exists()
+
+
+class TestSkipIdentical:
+    """Tests for skipping files already identical at the destination."""
+
+    def test_rerun_copies_only_missing_files(self, tmp_path, mocker, analysis_steps):
+        """Files already copied by an earlier run are skipped, not re-copied."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        for name in ("a.fits", "b.fits", "c.fits"):
+            (tree / name).write_bytes(name.encode())
+        # Simulate an earlier run that copied a.fits and b.fits only
+        for name in ("a.fits", "b.fits"):
+            move_lights_to_data.transfer.copy_file(
+                str(tree / name), str(dest / "tree" / name)
+            )
+        analysis_steps(tree)
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["skipped_identical"] == 2
+        assert result["copied"] == 1
+        assert result["moved"] == 1
+        assert copy_spy.call_count == 1
+        assert (dest / "tree" / "c.fits").read_bytes() == b"c.fits"
+
+    def test_stale_destination_is_overwritten(self, tmp_path, mocker, analysis_steps):
+        """A destination file with different content is copied again."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"new frame")
+        (dest / "tree").mkdir(parents=True)
+        (dest / "tree" / "light.fits").write_bytes(b"old")
+        analysis_steps(tree)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["skipped_identical"] == 0
+        assert result["copied"] == 1
+        assert (dest / "tree" / "light.fits").read_bytes() == b"new frame"
+
+
+class TestPerGroupCommit:
+    """Tests for per-group copy/delete pipelining."""
+
+    def test_each_group_deleted_after_its_own_copy(
+        self, tmp_path, mocker, analysis_steps
+    ):
+        """A group's source is deleted only after all its files are copied."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree1 = source / "tree1"
+        tree2 = source / "tree2"
+        for tree in (tree1, tree2):
+            tree.mkdir(parents=True)
+            (tree / "a.fits").write_bytes(b"a")
+            (tree / "b.fits").write_bytes(b"b")
+        analysis_steps(tree1, tree2)
+
+        copied_when_deleted = {}
+        real_remove_tree = move_lights_to_data.transfer.remove_tree
+
+        def recording_remove_tree(path, workers):
+            rel = Path(path).name
+            copied_when_deleted[rel] = sorted(p.name for p in (dest / rel).iterdir())
+            return real_remove_tree(path, workers)
+
+        mocker.patch(
+            "ap_move_light_to_data.transfer.remove_tree",
+            side_effect=recording_remove_tree,
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 2
+        assert copied_when_deleted == {
+            "tree1": ["a.fits", "b.fits"],
+            "tree2": ["a.fits", "b.fits"],
+        }
+
+    def test_failed_group_does_not_block_others(self, tmp_path, mocker, analysis_steps):
+        """Copy errors in one group leave later groups free to move."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        bad = source / "bad"
+        good = source / "good"
+        for tree in (bad, good):
+            tree.mkdir(parents=True)
+            (tree / "light.fits").write_bytes(b"frame")
+        analysis_steps(bad, good)
+        real_copy = move_lights_to_data.transfer.copy_file
+
+        def failing_copy(src, dst, *args, **kwargs):
+            if Path(src).parent == bad:
+                raise OSError("I/O error")
+            return real_copy(src, dst, *args, **kwargs)
+
+        mocker.patch(
+            "ap_move_light_to_data.transfer.copy_file", side_effect=failing_copy
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 1
+        assert result["errors"] == 1
+        assert (bad / "light.fits").exists()
+        assert not good.exists()
+        assert (dest / "good" / "light.fits").exists()
+
+
+class TestCapacityPlanning:
+    """Tests for pre-flight capacity planning in process_light_directories."""
+
+    def test_refuses_unsatisfiable_plan(self, tmp_path, mocker, analysis_steps):
+        """Nothing is copied or deleted when the destination is too small."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"x" * 1000)
+        analysis_steps(tree)
+        mocker.patch(
+            "ap_move_light_to_data.capacity.shutil.disk_usage",
+            return_value=mocker.Mock(free=10),
+        )
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["errors"] == 1
+        assert result["moved"] == 0
+        assert result["bytes_planned"] == 1000
+        assert copy_spy.call_count == 0
+        assert (tree / "light.fits").exists()
+
+    def test_rerun_onto_nearly_full_destination(self, tmp_path, mocker, analysis_steps):
+        """Files already copied by an earlier run need no free space."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"x" * 1000)
+        (dest / "tree").mkdir(parents=True)
+        shutil.copy2(tree / "light.fits", dest / "tree" / "light.fits")
+        analysis_steps(tree)
+        mocker.patch(
+            "ap_move_light_to_data.capacity.shutil.disk_usage",
+            return_value=mocker.Mock(
+                free=move_lights_to_data.config.FREE_SPACE_RESERVE_BYTES + 100
+            ),
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["errors"] == 0
+        assert result["moved"] == 1
+        assert result["skipped_identical"] == 1
+        assert not tree.exists()
+        assert (dest / "tree" / "light.fits").read_bytes() == b"x" * 1000
+
+    def test_dry_run_reports_bytes_and_estimate(self, tmp_path, mocker, analysis_steps):
+        """Dry run logs planned bytes and an estimated duration."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"x" * 2500)
+        analysis_steps(tree)
+        info_spy = mocker.spy(move_lights_to_data.logger, "info")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", dry_run=True, quiet=True
+        )
+
+        logged = " ".join(str(call.args[0]) for call in info_spy.call_args_list)
+        assert result["bytes_planned"] == 2500
+        assert "(2.5 KB)" in logged
+        assert "estimated 0s" in logged
+
+    def test_stops_when_space_runs_out(self, tmp_path, mocker, analysis_steps):
+        """Groups after a destination runs out of room are not copied."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        first = source / "first"
+        second = source / "second"
+        for group in (first, second):
+            group.mkdir(parents=True)
+            (group / "light.fits").write_bytes(b"frame")
+        analysis_steps(first, second)
+        mocker.patch.object(
+            move_lights_to_data.capacity,
+            "room_for",
+            side_effect=[
+                None,
+                {"dest": dest, "required_bytes": 5, "free_bytes": 0},
+            ],
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        kept = [group for group in (first, second) if group.exists()]
+        assert result["moved"] == 1
+        assert result["errors"] == 1
+        assert len(kept) == 1
+        assert (kept[0] / "light.fits").exists()
+        assert not (dest / kept[0].name).exists()
+
+
+class TestThrottledCopy:
+    """Tests for bandwidth/IOPS limits in process_light_directories."""
+
+    def test_copies_share_one_throttle(self, tmp_path, mocker, analysis_steps):
+        """Every copy in a run is charged against the same throttle."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "a.fits").write_bytes(b"a")
+        (tree / "b.fits").write_bytes(b"b")
+        analysis_steps(tree)
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            max_bytes_per_sec=10**9,
+            max_iops=10**6,
+        )
+
+        throttles = {id(c.kwargs["throttle"]) for c in copy_spy.call_args_list}
+        throttle = copy_spy.call_args_list[0].kwargs["throttle"]
+        assert result["copied"] == 2
+        assert len(throttles) == 1
+        assert throttle.bytes.rate == 10**9
+        assert throttle.ops.rate == 10**6
+
+
+class TestDestinationDirectories:
+    """Tests for creating destination directories up front."""
+
+    def test_directories_created_once(self, tmp_path, mocker, analysis_steps):
+        """Destination directories are created in one batch, not per file."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        lights = tree / "FILTER_R" / "lights"
+        lights.mkdir(parents=True)
+        for i in range(20):
+            (lights / f"light_{i}.fits").write_bytes(b"frame")
+        (tree / "dark.fits").write_bytes(b"dark")
+        dest.mkdir()
+        analysis_steps(tree)
+        makedirs = mocker.spy(move_lights_to_data.transfer.os, "makedirs")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["copied"] == 21
+        assert makedirs.call_count == 1
+        assert (dest / "tree" / "FILTER_R" / "lights" / "light_0.fits").exists()
+
+    def test_create_destination_directories(self, tmp_path):
+        """Unique parent directories of all planned files are created."""
+        files = [
+            {"dest": str(tmp_path / "a" / "1.fits")},
+            {"dest": str(tmp_path / "a" / "2.fits")},
+            {"dest": str(tmp_path / "a" / "b" / "3.fits")},
+        ]
+
+        created = move_lights_to_data.create_destination_directories(files)
+
+        assert created == 2
+        assert (tmp_path / "a" / "b").is_dir()
+
+
+class TestParallelDeletion:
+    """Tests for parallel source group deletion."""
+
+    def test_group_deleted_with_configured_workers(
+        self, tmp_path, mocker, analysis_steps
+    ):
+        """Source groups are removed with the requested worker count."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        (tree / "sub").mkdir(parents=True)
+        (tree / "a.fits").write_bytes(b"a")
+        (tree / "sub" / "b.fits").write_bytes(b"b")
+        analysis_steps(tree)
+        remove_spy = mocker.spy(move_lights_to_data.transfer, "remove_tree")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True, workers=3
+        )
+
+        assert result["moved"] == 1
+        remove_spy.assert_called_once_with(str(tree), 3)
+        assert not tree.exists()
+
+    def test_delete_failure_counted_as_error(self, tmp_path, mocker, analysis_steps):
+        """A group that fails to delete is an error, not a move."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "a.fits").write_bytes(b"a")
+        analysis_steps(tree)
+        mocker.patch(
+            "ap_move_light_to_data.transfer.remove_tree",
+            side_effect=OSError("Device busy"),
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 0
+        assert result["errors"] == 1
+
+    def test_at_most_one_deletion_pending(self, tmp_path, mocker):
+        """A group copies only after the deletion two groups back finished."""
+        groups = []
+        for name in ("g0", "g1", "g2", "g3"):
+            (tmp_path / "source" / name).mkdir(parents=True)
+            (tmp_path / "source" / name / "a.fits").write_bytes(b"a")
+            groups.append({"path": tmp_path / "source" / name, "relative_path": name})
+        events = []
+
+        def copy_group(group_plan, *args, **kwargs):
+            events.append(f"copy {group_plan['relative_path']}")
+            return []
+
+        def delete_group(group_plan, workers, timer=None):
+            time.sleep(0.05)
+            events.append(f"deleted {group_plan['relative_path']}")
+            return 1
+
+        mocker.patch.object(move_lights_to_data, "copy_group", side_effect=copy_group)
+        mocker.patch.object(
+            move_lights_to_data, "delete_group", side_effect=delete_group
+        )
+
+        move_lights_to_data.move_groups(
+            groups,
+            tmp_path / "source",
+            tmp_path / "dest",
+            move_lights_to_data.new_results(),
+            quiet=True,
+        )
+
+        assert events.index("deleted g0") < events.index("copy g2")
+        assert events.index("deleted g1") < events.index("copy g3")
+
+
+class TestPruneEmptyAncestors:
+    """Tests for prune_empty_ancestors function."""
+
+    def test_stops_at_first_non_empty_directory(self, tmp_path):
+        """Pruning stops at an ancestor that still has content."""
+        source = tmp_path / "source"
+        target = source / "M31"
+        (target / "DATE_1" / "FILTER_R").mkdir(parents=True)
+        (target / "DATE_2").mkdir(parents=True)
+        (target / "DATE_2" / "light.fits").touch()
+
+        removed = move_lights_to_data.prune_empty_ancestors(
+            [target / "DATE_1" / "FILTER_R" / "group"], source
+        )
+
+        assert removed == 2
+        assert not (target / "DATE_1").exists()
+        assert (target / "DATE_2" / "light.fits").exists()
+
+    def test_shared_ancestor_removed_after_all_children(self, tmp_path):
+        """An ancestor shared by groups at different depths is pruned."""
+        source = tmp_path / "source"
+        target = source / "M31"
+        (target / "DATE_1" / "FILTER_R").mkdir(parents=True)
+        (target / "DATE_2").mkdir(parents=True)
+
+        removed = move_lights_to_data.prune_empty_ancestors(
+            [
+                target / "DATE_2" / "group_b",
+                target / "DATE_1" / "FILTER_R" / "group_a",
+            ],
+            source,
+        )
+
+        assert removed == 4
+        assert not target.exists()
+        assert source.exists()
+
+    def test_never_leaves_source(self, tmp_path):
+        """Paths outside the source root are ignored."""
+        source = tmp_path / "source"
+        source.mkdir()
+        (tmp_path / "elsewhere").mkdir()
+
+        removed = move_lights_to_data.prune_empty_ancestors(
+            [tmp_path / "elsewhere" / "group"], source
+        )
+
+        assert removed == 0
+        assert (tmp_path / "elsewhere").exists()
+
+
+class TestIterGroupFiles:
+    """Tests for streaming group file collection."""
+
+    def test_yields_paths_and_stat_fields(self, tmp_path):
+        """Each file carries destination path and its source stat values."""
+        group = tmp_path / "source" / "tree"
+        (group / "sub").mkdir(parents=True)
+        (group / "sub" / "light.fits").write_bytes(b"frame")
+        stat = (group / "sub" / "light.fits").stat()
+
+        files = list(
+            move_lights_to_data.iter_group_files(
+                {"path": str(group), "relative_path": "tree"}, tmp_path / "dest"
+            )
+        )
+
+        assert files == [
+            {
+                "source": str(group / "sub" / "light.fits"),
+                "dest": str(tmp_path / "dest" / "tree" / "sub" / "light.fits"),
+                "mirrors": [],
+                "group": "tree",
+                "size": 5,
+                "mtime_ns": stat.st_mtime_ns,
+                "inode": stat.st_ino,
+                "device": stat.st_dev,
+            }
+        ]
+
+    def test_streams_lazily(self, tmp_path, mocker):
+        """Nothing is listed until the generator is consumed."""
+        group = tmp_path / "tree"
+        group.mkdir()
+        (group / "a.fits").write_bytes(b"a")
+        scandir = mocker.spy(move_lights_to_data.os, "scandir")
+
+        files = move_lights_to_data.iter_files_in_groups(
+            [{"path": str(group), "relative_path": "tree"}], tmp_path / "dest"
+        )
+        assert scandir.call_count == 0
+
+        next(files)
+        assert scandir.call_count == 1
+
+    def test_missing_group_warns(self, tmp_path, mocker):
+        """A group that vanished is reported and yields nothing."""
+        warning = mocker.spy(move_lights_to_data.logger, "warning")
+
+        files = move_lights_to_data.collect_all_files_in_groups(
+            [{"path": str(tmp_path / "gone"), "relative_path": "gone"}], tmp_path
+        )
+
+        assert files == []
+        assert warning.call_count == 1
+
+    def test_unstattable_file_yielded_with_error(self, tmp_path):
+        """A dangling symlink is yielded with its error instead of raising."""
+        group = tmp_path / "tree"
+        group.mkdir()
+        (group / "light.fits").symlink_to(tmp_path / "missing.fits")
+
+        files = move_lights_to_data.collect_all_files_in_groups(
+            [{"path": str(group), "relative_path": "tree"}], tmp_path / "dest"
+        )
+
+        assert len(files) == 1
+        assert isinstance(files[0]["error"], FileNotFoundError)
+        assert files[0]["size"] == 0
+        assert files[0]["device"] is None
+
+    def test_lock_directory_left_out(self, tmp_path):
+        """A group at the source root does not carry the lock files along."""
+        lock_dir = tmp_path / move_lights_to_data.config.LOCK_DIR_NAME
+        lock_dir.mkdir()
+        (lock_dir / "__root__.lock").write_text("host 1\n")
+        (tmp_path / "light.fits").write_bytes(b"frame")
+
+        files = move_lights_to_data.collect_all_files_in_groups(
+            [{"path": str(tmp_path), "relative_path": "."}], tmp_path / "dest"
+        )
+
+        assert [f["source"] for f in files] == [str(tmp_path / "light.fits")]
+
+    def test_bytes_to_copy_skips_copied_files(self, tmp_path):
+        """Files identical in the group or staging directory need no bytes."""
+        group = tmp_path / "source" / "M31"
+        group.mkdir(parents=True)
+        (group / "a.fits").write_bytes(b"a" * 10)
+        (group / "b.fits").write_bytes(b"b" * 20)
+        dest = tmp_path / "dest"
+        backup = tmp_path / "backup"
+        # dest holds a.fits in place; backup holds b.fits in staging
+        (dest / "M31").mkdir(parents=True)
+        shutil.copy2(group / "a.fits", dest / "M31" / "a.fits")
+        staging = move_lights_to_data.staging_path(backup / "M31")
+        staging.mkdir(parents=True)
+        shutil.copy2(group / "b.fits", staging / "b.fits")
+        group_plan = {"path": str(group), "relative_path": Path("M31")}
+        files = sorted(
+            move_lights_to_data.iter_group_files(group_plan, dest, [backup]),
+            key=lambda f: f["source"],
+        )
+
+        totals = move_lights_to_data.set_bytes_to_copy(
+            group_plan, files, dest, [backup]
+        )
+
+        assert totals == [20, 10]
+        assert [f["to_copy"] for f in files] == [[0, 10], [20, 0]]
+
+    def test_unstattable_file_keeps_group(self, tmp_path, mocker, analysis_steps):
+        """A file that cannot be stat'ed fails its group, not the run."""
+        source = tmp_path / "source"
+        broken = source / "broken"
+        healthy = source / "healthy"
+        for group in (broken, healthy):
+            group.mkdir(parents=True)
+            (group / "light.fits").write_bytes(b"frame")
+        (broken / "flat.fits").symlink_to(tmp_path / "missing.fits")
+        analysis_steps(broken, healthy)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 1
+        assert result["errors"] == 1
+        assert (broken / "light.fits").exists()
+        assert not healthy.exists()
+
+    def test_dry_run_counts_without_collecting(self, tmp_path, mocker, analysis_steps):
+        """Dry run reports file counts from the streaming plan."""
+        source = tmp_path / "source"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        for i in range(3):
+            (tree / f"light_{i}.fits").write_bytes(b"frame")
+        analysis_steps(tree)
+        collect = mocker.spy(move_lights_to_data, "collect_all_files_in_groups")
+        info = mocker.spy(move_lights_to_data.logger, "info")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), ".*", dry_run=True, quiet=True
+        )
+
+        assert result["moved"] == 1
+        assert collect.call_count == 0
+        assert any("Would move 3 files" in c.args[0] for c in info.call_args_list)
+
+
+class TestCopyProgress:
+    """Tests for byte-based copy progress in process_light_directories."""
+
+    def test_progress_counts_bytes(self, tmp_path, mocker, analysis_steps):
+        """Copied bytes are tracked and identical files only advance progress."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"x" * 5000)
+        (tree / "light.json").write_bytes(b"{}")
+        (dest / "tree").mkdir(parents=True)
+        move_lights_to_data.transfer.copy_file(
+            str(tree / "light.json"), str(dest / "tree" / "light.json")
+        )
+        analysis_steps(tree)
+        skip = mocker.spy(move_lights_to_data.byte_progress.ByteProgress, "skip")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["bytes_planned"] == 5002
+        assert result["bytes_copied"] == 5000
+        assert result["copy_seconds"] >= 0
+        skip.assert_called_once_with(mocker.ANY, 2)
+
+
+class TestFanOutCopy:
+    """Tests for copying to several destinations in one pass."""
+
+    def test_all_destinations_receive_group(self, tmp_path, mocker, analysis_steps):
+        """Each file lands in every destination before the source goes."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        backup = tmp_path / "backup"
+        tree = source / "tree"
+        (tree / "lights").mkdir(parents=True)
+        (tree / "lights" / "light.fits").write_bytes(b"frame")
+        (tree / "dark.fits").write_bytes(b"dark")
+        analysis_steps(tree)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            verify=True,
+            mirror_dirs=[str(backup)],
+        )
+
+        assert result["moved"] == 1
+        assert result["copied"] == 2
+        assert result["bytes_copied"] == 9
+        for root in (dest, backup):
+            assert (root / "tree" / "lights" / "light.fits").read_bytes() == b"frame"
+            assert (root / "tree" / "dark.fits").read_bytes() == b"dark"
+        assert not tree.exists()
+
+    def test_one_mirror_writer_pool_per_group(self, tmp_path, mocker, analysis_steps):
+        """Mirror writes share one pool per group instead of one per file."""
+        source = tmp_path / "source"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        for i in range(5):
+            (tree / f"sidecar_{i}.xisf").write_bytes(b"s")
+        analysis_steps(tree)
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(tmp_path / "dest"),
+            path_pattern=".*",
+            quiet=True,
+            mirror_dirs=[str(tmp_path / "backup")],
+        )
+
+        writers = {id(c.kwargs["mirror_writer"]) for c in copy_spy.call_args_list}
+        assert result["copied"] == 5
+        assert len(writers) == 1
+        assert copy_spy.call_args_list[0].kwargs["mirror_writer"] is not None
+        assert (tmp_path / "backup" / "tree" / "sidecar_4.xisf").exists()
+
+    def test_failed_mirror_keeps_source(self, tmp_path, mocker, analysis_steps):
+        """A group is not deleted unless every destination succeeded."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        backup = tmp_path / "backup"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        # A file where the mirror's group directory should be
+        backup.mkdir()
+        (backup / "tree").write_text("in the way")
+        analysis_steps(tree)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            mirror_dirs=[str(backup)],
+        )
+
+        assert result["moved"] == 0
+        assert result["errors"] == 1
+        assert (tree / "light.fits").exists()
+
+    def test_copies_only_to_destinations_missing_file(
+        self, tmp_path, mocker, analysis_steps
+    ):
+        """A destination that already holds the file is not written again."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        backup = tmp_path / "backup"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        move_lights_to_data.transfer.copy_file(
+            str(tree / "light.fits"), str(dest / "tree" / "light.fits")
+        )
+        analysis_steps(tree)
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            path_pattern=".*",
+            quiet=True,
+            mirror_dirs=[str(backup)],
+        )
+
+        assert result["moved"] == 1
+        staged = backup / ".tree.ap-staging" / "light.fits"
+        assert copy_spy.call_args.args[1] == str(staged)
+        assert copy_spy.call_args.kwargs["mirrors"] == []
+        assert (backup / "tree" / "light.fits").read_bytes() == b"frame"
+
+
+class TestStagedPublication:
+    """Tests for copying groups into staging and renaming them into place."""
+
+    def test_group_copied_to_staging_then_renamed(
+        self, tmp_path, mocker, analysis_steps
+    ):
+        """Files are written under a hidden staging dir that is renamed."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "M31" / "DATE_1"
+        (tree / "lights").mkdir(parents=True)
+        (tree / "lights" / "light.fits").write_bytes(b"frame")
+        analysis_steps(tree)
+        copy_spy = mocker.spy(move_lights_to_data.transfer, "copy_file")
+        publish_spy = mocker.spy(move_lights_to_data.transfer, "publish_directory")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        staging = dest / "M31" / ".DATE_1.ap-staging"
+        assert result["moved"] == 1
+        assert copy_spy.call_args.args[1] == str(staging / "lights" / "light.fits")
+        assert copy_spy.call_args.kwargs["sync"] is True
+        publish_spy.assert_called_once_with(str(staging), str(dest / "M31" / "DATE_1"))
+        assert (dest / "M31" / "DATE_1" / "lights" / "light.fits").exists()
+        assert not staging.exists()
+
+    def test_existing_group_completed_in_place(self, tmp_path, mocker, analysis_steps):
+        """A group directory already at the destination is filled in place."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        (dest / "tree").mkdir(parents=True)
+        analysis_steps(tree)
+        publish_spy = mocker.spy(move_lights_to_data.transfer, "publish_directory")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 1
+        assert publish_spy.call_count == 0
+        assert (dest / "tree" / "light.fits").exists()
+
+    def test_failed_copy_is_not_published(self, tmp_path, mocker, analysis_steps):
+        """A partially copied group stays in staging and is resumed later."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "a.fits").write_bytes(b"a")
+        (tree / "b.fits").write_bytes(b"b")
+        analysis_steps(tree)
+        real_copy = move_lights_to_data.transfer.copy_file
+
+        def failing_copy(source_path, dest_path, **kwargs):
+            if source_path.endswith("b.fits"):
+                raise OSError("device error")
+            return real_copy(source_path, dest_path, **kwargs)
+
+        mocker.patch.object(
+            move_lights_to_data.transfer, "copy_file", side_effect=failing_copy
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 0
+        assert not (dest / "tree").exists()
+        assert (dest / ".tree.ap-staging" / "a.fits").exists()
+        assert (tree / "b.fits").exists()
+
+        mocker.patch.object(move_lights_to_data.transfer, "copy_file", real_copy)
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 1
+        assert result["skipped_identical"] == 1
+        assert (dest / "tree" / "b.fits").exists()
+        assert not (dest / ".tree.ap-staging").exists()
+
+    def test_missing_staging_is_an_error(self, tmp_path, mocker, analysis_steps):
+        """A staging directory gone before publication keeps the source."""
+        source = tmp_path / "source"
+        dest = tmp_path / "dest"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        analysis_steps(tree)
+        real_copy = move_lights_to_data.transfer.copy_file
+
+        def copy_then_lose_staging(source_path, dest_path, **kwargs):
+            copied = real_copy(source_path, dest_path, **kwargs)
+            shutil.rmtree(dest / ".tree.ap-staging")
+            return copied
+
+        mocker.patch.object(
+            move_lights_to_data.transfer,
+            "copy_file",
+            side_effect=copy_then_lose_staging,
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), path_pattern=".*", quiet=True
+        )
+
+        assert result["moved"] == 0
+        assert result["errors"] == 1
+        assert not (dest / "tree").exists()
+        assert (tree / "light.fits").exists()
+
+
+class TestMovePlan:
+    """Tests for writing and applying serialized move plans."""
+
+    def _tree(self, tmp_path):
+        source = tmp_path / "source"
+        tree = source / "tree"
+        tree.mkdir(parents=True)
+        (tree / "light.fits").write_bytes(b"frame")
+        (tree / "dark.fits").write_bytes(b"dark")
+        return source, tree
+
+    def test_dry_run_plan_then_apply(self, tmp_path, mocker, analysis_steps):
+        """A dry-run plan is applied later without re-running analysis."""
+        source, tree = self._tree(tmp_path)
+        dest = tmp_path / "dest"
+        plan_file = tmp_path / "plan.json"
+        analysis_steps(tree)
+
+        planned = move_lights_to_data.process_light_directories(
+            str(source),
+            str(dest),
+            ".*",
+            dry_run=True,
+            quiet=True,
+            plan_out=str(plan_file),
+        )
+        assert planned["moved"] == 1
+        assert (tree / "light.fits").exists()
+
+        find_mock = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.find_all_light_directories"
+        )
+        metadata_mock = mocker.patch("ap_common.get_metadata")
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", quiet=True, apply_plan=str(plan_file)
+        )
+
+        find_mock.assert_not_called()
+        metadata_mock.assert_not_called()
+        assert result["moved"] == 1
+        assert result["dir_count"] == planned["dir_count"]
+        assert (dest / "tree" / "light.fits").read_bytes() == b"frame"
+        assert not tree.exists()
+
+    def test_changed_group_skipped(self, tmp_path, mocker, analysis_steps):
+        """Groups whose files changed after planning are not moved."""
+        source, tree = self._tree(tmp_path)
+        dest = tmp_path / "dest"
+        plan_file = tmp_path / "plan.json"
+        analysis_steps(tree)
+        move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", dry_run=True, plan_out=str(plan_file)
+        )
+        (tree / "late_light.fits").write_bytes(b"new frame")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", quiet=True, apply_plan=str(plan_file)
+        )
+
+        assert result["moved"] == 0
+        assert result["skipped_stale"] == 1
+        assert result["errors"] == 0
+        assert (tree / "late_light.fits").exists()
+        assert not (dest / "tree").exists()
+
+    def test_plan_for_other_source_refused(self, tmp_path, mocker, analysis_steps):
+        """A plan made for a different source directory is not applied."""
+        source, tree = self._tree(tmp_path)
+        plan_file = tmp_path / "plan.json"
+        analysis_steps(tree)
+        move_lights_to_data.process_light_directories(
+            str(source),
+            str(tmp_path / "dest"),
+            ".*",
+            dry_run=True,
+            plan_out=str(plan_file),
+        )
+        other = tmp_path / "other"
+        other.mkdir()
+
+        result = move_lights_to_data.process_light_directories(
+            str(other), str(tmp_path / "dest"), ".*", apply_plan=str(plan_file)
+        )
+
+        assert result["errors"] == 1
+        assert result["moved"] == 0
+        assert (tree / "light.fits").exists()
+
+    def test_missing_plan_is_an_error(self, tmp_path):
+        """An unreadable plan file is reported, nothing moves."""
+        source = tmp_path / "source"
+        source.mkdir()
+
+        result = move_lights_to_data.process_light_directories(
+            str(source),
+            str(tmp_path / "dest"),
+            ".*",
+            apply_plan=str(tmp_path / "missing.json"),
+        )
+
+        assert result["errors"] == 1
+
+
+class TestTypedStatus:
+    """Tests for typed results from the check and organize steps."""
+
+    def test_check_light_directories_returns_directory_status(
+        self, tmp_path, analysis_steps
+    ):
+        """Each light dir gets a DirectoryStatus with shared interned paths."""
+        target = tmp_path / "src" / "M31"
+        for name in ("R", "G"):
+            (target / name).mkdir(parents=True)
+        (target / "dark.fits").write_bytes(b"d")
+        (target / "flat.fits").write_bytes(b"f")
+        analysis_steps(target / "R", target / "G")
+
+        status_map = move_lights_to_data.check_light_directories(
+            [str(target / "R"), str(target / "G")],
+            tmp_path / "src",
+            False,
+            False,
+            True,
+            {},
+        )
+
+        red, green = status_map[str(target / "R")], status_map[str(target / "G")]
+        assert isinstance(red, DirectoryStatus)
+        assert red.is_complete is True
+        assert red.calibration_files == frozenset(
+            {str(target / "dark.fits"), str(target / "flat.fits")}
+        )
+        # Matching builds new path strings per directory; they are interned
+        shared = {id(p) for p in red.calibration_files} & {
+            id(p) for p in green.calibration_files
+        }
+        assert len(shared) == 2
+
+    def test_organize_returns_movable_groups(self, tmp_path):
+        """Movable groups are MovableGroup instances."""
+        light_dir = tmp_path / "M31" / "lights"
+        status_map = {
+            str(light_dir): DirectoryStatus(
+                is_complete=True,
+                missing=(),
+                calibration_files=frozenset({str(tmp_path / "M31" / "dark.fits")}),
+            )
+        }
+
+        result = move_lights_to_data.organize_into_movable_groups(status_map, tmp_path)
+
+        group = result["movable_groups"][0]
+        assert isinstance(group, MovableGroup)
+        assert group.relative_path == Path("M31")
+
+
+class TestMultipleSources:
+    """Tests for moving several source/destination pairs in one run."""
+
+    def _sources(self, tmp_path, analysis_steps=None):
+        """Two rigs, each with one calibrated target."""
+        rig1 = tmp_path / "rig1"
+        rig2 = tmp_path / "rig2"
+        for rig, target in ((rig1, "M31"), (rig2, "M42")):
+            (rig / target / "lights").mkdir(parents=True)
+            (rig / target / "lights" / "light.fits").write_bytes(target.encode())
+            (rig / target / "dark.fits").write_bytes(b"d")
+            if analysis_steps is not None:
+                analysis_steps(rig.resolve() / target / "lights")
+        return rig1, rig2
+
+    def test_each_source_moves_to_its_destination(
+        self, tmp_path, mocker, analysis_steps
+    ):
+        """Every pair moves, with one metadata load shared by all sources."""
+        rig1, rig2 = self._sources(tmp_path, analysis_steps)
+        get_metadata = move_lights_to_data.ap_common.get_metadata
+        analyze = mocker.spy(move_lights_to_data, "analyze_light_directories")
+
+        result = move_lights_to_data.process_light_directories(
+            str(rig1),
+            str(tmp_path / "data1"),
+            ".*",
+            quiet=True,
+            extra_pairs=[(str(rig2), str(tmp_path / "data2"))],
+        )
+
+        assert result["moved"] == 2
+        assert result["errors"] == 0
+        data1 = tmp_path / "data1" / "M31"
+        data2 = tmp_path / "data2" / "M42"
+        assert (data1 / "lights" / "light.fits").read_bytes() == b"M31"
+        assert (data2 / "lights" / "light.fits").read_bytes() == b"M42"
+        assert not (rig1 / "M31").exists()
+        assert not (rig2 / "M42").exists()
+        assert [
+            (call.kwargs["dirs"], call.kwargs["recursive"])
+            for call in get_metadata.call_args_list
+        ] == [
+            ([str(rig1.resolve())], False),
+            ([str(rig1.resolve() / "M31")], True),
+            ([str(rig2.resolve())], False),
+            ([str(rig2.resolve() / "M42")], True),
+        ]
+        caches = [call.kwargs["metadata_cache"] for call in analyze.call_args_list]
+        assert caches[0] is caches[1]
+
+    def test_results_are_summed(self, tmp_path, analysis_steps):
+        """Counters from each source add up in the returned results."""
+        rig1, rig2 = self._sources(tmp_path, analysis_steps)
+
+        result = move_lights_to_data.process_light_directories(
+            str(rig1),
+            str(tmp_path / "data1"),
+            ".*",
+            dry_run=True,
+            quiet=True,
+            extra_pairs=[(str(rig2), str(tmp_path / "data2"))],
+        )
+
+        assert result["moved"] == 2
+        assert result["dir_count"] == 2
+        assert result["bytes_planned"] == 8
+        assert (rig1 / "M31" / "lights" / "light.fits").exists()
+
+    def test_plans_refused_with_pairs(self, tmp_path):
+        """Move plans describe one source, so pairs cannot use them."""
+        rig1, rig2 = self._sources(tmp_path)
+
+        result = move_lights_to_data.process_light_directories(
+            str(rig1),
+            str(tmp_path / "data1"),
+            ".*",
+            quiet=True,
+            plan_out=str(tmp_path / "plan.json"),
+            extra_pairs=[(str(rig2), str(tmp_path / "data2"))],
+        )
+
+        assert result["errors"] == 1
+        assert not (tmp_path / "plan.json").exists()
+
+    def test_lanes_follow_shared_devices(self):
+        """Moves sharing any device run in one lane; others get their own."""
+
+        def source_move(name, source_device, *dest_devices):
+            return {
+                "name": name,
+                "source_device": source_device,
+                "capacity": {"destinations": [{"device": d} for d in dest_devices]},
+            }
+
+        moves = [
+            source_move("rig1", 1, 10),
+            source_move("rig2", 2, 20),
+            source_move("calib", 3, 30),
+            # Shares rig1's destination and rig2's source: joins both lanes
+            source_move("rig3", 2, 10),
+        ]
+
+        lanes = move_lights_to_data.group_into_lanes(moves)
+
+        assert [[m["name"] for m in lane] for lane in lanes] == [
+            ["rig1", "rig2", "rig3"],
+            ["calib"],
+        ]
+
+
+class TestPhaseTimings:
+    """Tests for per-phase timings in process_light_directories results."""
+
+    def test_results_include_phase_timings(self, tmp_path, mocker, analysis_steps):
+        """Every analysis phase and move sub-phase is timed."""
+        source = tmp_path / "source"
+        group = source / "M31"
+        group.mkdir(parents=True)
+        (group / "light.fits").write_bytes(b"frame")
+        mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            return_value={},
+        )
+        analysis_steps(group)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), ".*", quiet=True
+        )
+
+        assert list(result["timings"]) == [
+            "load",
+            "collect",
+            "filter",
+            "check",
+            "organize",
+            "capacity",
+            "move",
+            "move.copy",
+            "move.delete",
+            "move.cleanup",
+            "report",
+        ]
+        assert all(seconds >= 0 for seconds in result["timings"].values())
+
+
+class TestRunMetricsResults:
+    """Tests for results used only by run metrics."""
+
+    def test_results_count_scanned_files(self, tmp_path, mocker, analysis_steps):
+        """Files whose metadata was loaded are counted for metrics."""
+        source = tmp_path / "source"
+        group = source / "M31"
+        group.mkdir(parents=True)
+        (group / "light.fits").write_bytes(b"frame")
+        mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            return_value={
+                str(group / name): {
+                    move_lights_to_data.NORMALIZED_HEADER_FILENAME: str(group / name)
+                }
+                for name in ("light.fits", "flat.fits", "dark.fits")
+            },
+        )
+        analysis_steps(group)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), ".*", dry_run=True, quiet=True
+        )
+
+        assert result["files_scanned"] == 3
+
+
+class TestTraceEvents:
+    """Tests for trace spans recorded by process_light_directories."""
+
+    def test_phases_and_file_spans(self, tmp_path, mocker, analysis_steps):
+        """Phases, file copies and per-file unlinks on workers are traced."""
+        source = tmp_path / "source"
+        group = source / "M31"
+        group.mkdir(parents=True)
+        for name in ("light1.fits", "light2.fits"):
+            (group / name).write_bytes(b"frame")
+        mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            return_value={},
+        )
+        analysis_steps(group)
+        tracer = Tracer()
+
+        move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), ".*", quiet=True, tracer=tracer
+        )
+
+        events = [event for event in tracer.events() if event["ph"] == "X"]
+        phases = [event["name"] for event in events if event["cat"] == "phase"]
+        assert {"load", "check", "move", "move.copy", "move.delete"} <= set(phases)
+        copies = [event for event in events if event["name"] == "copy"]
+        assert sorted(event["args"]["path"] for event in copies) == [
+            str(group / "light1.fits"),
+            str(group / "light2.fits"),
+        ]
+        unlinks = [event for event in events if event["name"] == "unlink"]
+        assert len(unlinks) == 2
+        assert {event["tid"] for event in unlinks}.isdisjoint(
+            {event["tid"] for event in copies}
+        )
+
+    def test_check_span_per_directory(self, tmp_path):
+        """Each light directory's check is its own span."""
+        tracer = Tracer()
+        light_dirs = [str(tmp_path / "M31"), str(tmp_path / "M42")]
+
+        move_lights_to_data.check_light_directories(
+            light_dirs,
+            tmp_path,
+            False,
+            False,
+            True,
+            {},
+            timer=move_lights_to_data.PhaseTimer(tracer=tracer),
+        )
+
+        checks = [e for e in tracer.events() if e["name"] == "check_dir"]
+        assert [e["args"]["dir"] for e in checks] == light_dirs
+
+
+def _patch_directory_checks(mocker):
+    """Mock per-directory matching: directories named "noflats" lack flats."""
+
+    def light_frames(directory, metadata_cache, debug=False):
+        return {f"{directory}/light.fits": {"dir": directory}}
+
+    def calibration(light_metadata, search_dirs, **kwargs):
+        complete = not light_metadata["dir"].endswith("noflats")
+        return CalibrationStatus(
+            has_darks=True,
+            has_flats=complete,
+            has_bias=False,
+            needs_bias=False,
+            matched_darks=(f"{search_dirs[-1]}/dark.fits",),
+            matched_flats=(f"{light_metadata['dir']}/flat.fits",) if complete else (),
+            matched_bias=(),
+            missing=() if complete else ("flats",),
+        )
+
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.get_light_frames",
+        side_effect=light_frames,
+    )
+    mocker.patch(
+        "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
+        side_effect=calibration,
+    )
+
+
+class TestParallelCheck:
+    """Tests for shard_by_target and check_light_directories_parallel."""
+
+    def test_shard_by_target(self, tmp_path):
+        """Directories are grouped by first-level target, order kept."""
+        dirs = [
+            str(tmp_path / "M31" / "a"),
+            str(tmp_path / "M42" / "a"),
+            str(tmp_path / "M31" / "b"),
+            str(tmp_path / "light"),
+            "/elsewhere/x",
+        ]
+
+        shards = move_lights_to_data.shard_by_target(dirs, tmp_path)
+
+        assert shards == [[dirs[0], dirs[2]], [dirs[1]], [dirs[3]], [dirs[4]]]
+
+    @pytest.mark.skipif(
+        not sys.platform.startswith("linux"),
+        reason="workers inherit the mocks only when forked",
+    )
+    def test_parallel_matches_serial(self, tmp_path, mocker):
+        """Sharded checks give the same statuses in the same order."""
+        _patch_directory_checks(mocker)
+        dirs = [
+            str(tmp_path / target / date / name)
+            for target in ("M31", "M42", "NGC7000")
+            for date in ("2026-01-01", "2026-01-02")
+            for name in ("L", "noflats")
+        ]
+
+        serial = move_lights_to_data.check_light_directories(
+            dirs, tmp_path, False, False, True, {}
+        )
+        parallel = move_lights_to_data.check_light_directories_parallel(
+            dirs, tmp_path, False, False, True, {}, workers=3
+        )
+
+        assert list(parallel) == list(serial) == dirs
+        assert parallel == serial
+
+    def test_single_worker_checks_in_process(self, tmp_path, mocker):
+        """One worker (or one target) does not start a process pool."""
+        _patch_directory_checks(mocker)
+        pool = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ProcessPoolExecutor"
+        )
+        dirs = [str(tmp_path / "M31" / "a"), str(tmp_path / "M42" / "a")]
+
+        statuses = move_lights_to_data.check_light_directories_parallel(
+            dirs, tmp_path, False, False, True, {}, workers=1
+        )
+        one_target = move_lights_to_data.check_light_directories_parallel(
+            dirs[:1], tmp_path, False, False, True, {}, workers=4
+        )
+
+        pool.assert_not_called()
+        assert list(statuses) == dirs
+        assert list(one_target) == dirs[:1]
+
+
+class TestTargetLocking:
+    """Tests for per-target locks taken before groups move."""
+
+    def _tree(self, tmp_path, analysis_steps):
+        """Two targets, each with one calibrated date."""
+        source = tmp_path / "source"
+        dates = []
+        for target in ("M31", "M42"):
+            date = source / target / "DATE_2024-01-01"
+            (date / "lights").mkdir(parents=True)
+            (date / "lights" / "light.fits").write_bytes(target.encode())
+            (date / "dark.fits").write_bytes(b"dark")
+            (date / "flat.fits").write_bytes(b"flat")
+            analysis_steps(date / "lights")
+            dates.append(date)
+        return source, dates
+
+    def test_locked_target_skipped(self, tmp_path, mocker, analysis_steps):
+        """A target held by another instance stays in place; others move."""
+        source, (m31, m42) = self._tree(tmp_path, analysis_steps)
+        dest = tmp_path / "dest"
+        acquire = mocker.patch.object(
+            move_lights_to_data.locking.TargetLocks,
+            "acquire",
+            side_effect=lambda roots, target: target != "M31",
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", quiet=True
+        )
+
+        assert result["skipped_locked"] == 1
+        assert result["moved"] == 1
+        assert result["errors"] == 0
+        assert (m31 / "lights" / "light.fits").exists()
+        assert not (dest / "M31").exists()
+        assert (dest / "M42" / "DATE_2024-01-01" / "lights" / "light.fits").exists()
+        assert not (source / "M42").exists()
+        assert acquire.call_args_list[0].args[0] == [
+            source.resolve(),
+            dest.resolve(),
+        ]
+
+    def test_group_moved_by_other_instance(self, tmp_path, mocker, analysis_steps):
+        """A group gone by the time its lock is granted is skipped."""
+        source, (m31, m42) = self._tree(tmp_path, analysis_steps)
+        dest = tmp_path / "dest"
+        real_acquire = move_lights_to_data.locking.TargetLocks.acquire
+
+        def other_instance_moved(locks, roots, target):
+            if target == "M31":
+                shutil.rmtree(m31)
+            return real_acquire(locks, roots, target)
+
+        mocker.patch.object(
+            move_lights_to_data.locking.TargetLocks,
+            "acquire",
+            autospec=True,
+            side_effect=other_instance_moved,
+        )
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", quiet=True
+        )
+
+        assert result["skipped_locked"] == 1
+        assert result["moved"] == 1
+        assert result["errors"] == 0
+        assert not (dest / "M31").exists()
+
+    def test_locks_released_after_run(self, tmp_path, mocker, analysis_steps):
+        """Lock files stay under every root but no lock outlives the run."""
+        source, _ = self._tree(tmp_path, analysis_steps)
+        dest = tmp_path / "dest"
+        backup = tmp_path / "backup"
+        release = mocker.spy(move_lights_to_data.locking.TargetLocks, "release_all")
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(dest), ".*", quiet=True, mirror_dirs=[str(backup)]
+        )
+
+        assert result["moved"] == 2
+        assert release.call_count == 1
+        lock_dir_name = move_lights_to_data.config.LOCK_DIR_NAME
+        for root in (source, dest, backup):
+            lock_dir = root / lock_dir_name
+            assert sorted(p.name for p in lock_dir.iterdir()) == [
+                "M31.lock",
+                "M42.lock",
+            ]
+        locks = move_lights_to_data.locking.TargetLocks()
+        assert locks.acquire([source, dest, backup], "M31")
+        locks.release_all()
+
+    def test_dry_run_takes_no_locks(self, tmp_path, analysis_steps):
+        """A dry run creates no lock files."""
+        source, _ = self._tree(tmp_path, analysis_steps)
+
+        result = move_lights_to_data.process_light_directories(
+            str(source), str(tmp_path / "dest"), ".*", dry_run=True, quiet=True
+        )
+
+        assert result["moved"] == 2
+        assert not (source / move_lights_to_data.config.LOCK_DIR_NAME).exists()
+
+
+class TestBlockedIndexRuns:
+    """Tests for reusing saved blocked directories across runs."""
+
+    @pytest.fixture
+    def archive(self, tmp_path, mocker):
+        """Frames by path, served by get_metadata; flats decide completeness.
+
+        Returns (frames, source, check mock). A light directory is complete
+        when a flat with its filter sits in one of its search directories.
+        """
+        config = move_lights_to_data.config
+        frames: dict = {}
+        source = (tmp_path / "src").resolve()
+
+        def get_metadata(dirs, recursive, **kwargs):
+            root = dirs[0]
+            return {
+                path: dict(metadata)
+                for path, metadata in frames.items()
+                if (
+                    path.startswith(root + os.sep)
+                    if recursive
+                    else os.path.dirname(path) == root
+                )
+            }
+
+        def check(light_metadata, search_dirs, metadata_cache, **kwargs):
+            flats = tuple(
+                path
+                for path, metadata in metadata_cache.items()
+                if os.path.dirname(path) in search_dirs
+                and metadata[config.NORMALIZED_HEADER_TYPE] == TYPE_FLAT
+                and metadata[config.NORMALIZED_HEADER_FILTER]
+                == light_metadata[config.NORMALIZED_HEADER_FILTER]
+            )
+            return CalibrationStatus(
+                has_darks=True,
+                has_flats=bool(flats),
+                matched_darks=(os.path.join(search_dirs[-1], "dark.fits"),),
+                matched_flats=flats,
+                missing=() if flats else ("flats",),
+            )
+
+        mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.ap_common.get_metadata",
+            side_effect=get_metadata,
+        )
+        checked = mocker.patch(
+            "ap_move_light_to_data.move_lights_to_data.check_calibration_for_light",
+            side_effect=check,
+        )
+        for target in ("M31", "M42"):
+            (source / target / "Ha").mkdir(parents=True)
+            self.add(frames, source / target / "Ha" / "light1.fits", TYPE_LIGHT)
+        return frames, source, checked
+
+    @staticmethod
+    def add(frames, path, frame_type, **headers):
+        config = move_lights_to_data.config
+        metadata = {
+            config.NORMALIZED_HEADER_TYPE: frame_type,
+            config.NORMALIZED_HEADER_CAMERA: "ASI2600MM",
+            config.NORMALIZED_HEADER_GAIN: 100,
+            config.NORMALIZED_HEADER_FILTER: "Ha",
+            config.NORMALIZED_HEADER_EXPOSURESECONDS: 300.0,
+        }
+        metadata.update(headers)
+        frames[str(path)] = metadata
+
+    def run(self, source, index_path):
+        return move_lights_to_data.process_light_directories(
+            str(source),
+            str(source.parent / "data"),
+            ".*",
+            dry_run=True,
+            quiet=True,
+            blocked_index=str(index_path),
+        )
+
+    def test_unchanged_blocked_directories_not_rechecked(self, tmp_path, archive):
+        """A second run reuses the saved statuses without checking."""
+        frames, source, checked = archive
+        index_path = tmp_path / "blocked.json"
+
+        first = self.run(source, index_path)
+        assert checked.call_count == 2
+        assert first["skipped_no_flats"] == 2
+        saved = json.loads(index_path.read_text())
+        assert sorted(saved["directories"]) == [
+            str(source / "M31" / "Ha"),
+            str(source / "M42" / "Ha"),
+        ]
+
+        checked.reset_mock()
+        second = self.run(source, index_path)
+
+        assert checked.call_count == 0
+        assert second["skipped_no_flats"] == 2
+        assert second["moved"] == 0
+        assert second["errors"] == 0
+
+    def test_new_matching_flat_rechecks_only_its_directory(self, tmp_path, archive):
+        """Flats re-check the directory waiting on them; other filters do not."""
+        frames, source, checked = archive
+        index_path = tmp_path / "blocked.json"
+        self.run(source, index_path)
+
+        self.add(frames, source / "M31" / "flat.fits", TYPE_FLAT)
+        self.add(
+            frames,
+            source / "M42" / "flat.fits",
+            TYPE_FLAT,
+            **{move_lights_to_data.config.NORMALIZED_HEADER_FILTER: "OIII"},
+        )
+        checked.reset_mock()
+        result = self.run(source, index_path)
+
+        assert [c.kwargs["search_dirs"][0] for c in checked.call_args_list] == [
+            str(source / "M31" / "Ha")
+        ]
+        assert result["moved"] == 1
+        assert result["skipped_no_flats"] == 1
+        saved = json.loads(index_path.read_text())
+        assert list(saved["directories"]) == [str(source / "M42" / "Ha")]
+
+    def test_changed_lights_or_removed_calibration_rechecked(self, tmp_path, archive):
+        """New lights, or calibration gone from a search directory, re-check."""
+        frames, source, checked = archive
+        index_path = tmp_path / "blocked.json"
+        self.add(frames, source / "M42" / "dark.fits", TYPE_DARK)
+        self.run(source, index_path)
+
+        self.add(frames, source / "M31" / "Ha" / "light2.fits", TYPE_LIGHT)
+        del frames[str(source / "M42" / "dark.fits")]
+        checked.reset_mock()
+        self.run(source, index_path)
+
+        assert checked.call_count == 2
+
+    def test_unreadable_index_checks_everything(self, tmp_path, archive):
+        """A corrupt index is ignored and replaced."""
+        frames, source, checked = archive
+        index_path = tmp_path / "blocked.json"
+        index_path.write_text("{")
+
+        result = self.run(source, index_path)
+
+        assert checked.call_count == 2
+        assert result["errors"] == 0
+        assert len(json.loads(index_path.read_text())["directories"]) == 2
@@ -0,0 +1,155 @@
+"""
+Tests for plan module.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ap_move_light_to_data import plan
+
+
+def _group(tmp_path):
+    """Create a group with two files and return its plan and file dicts."""
+    group = tmp_path / "source" / "M31"
+    (group / "lights").mkdir(parents=True)
+    (group / "lights" / "light.fits").write_bytes(b"frame")
+    (group / "dark.fits").write_bytes(b"dark")
+    files = []
+    for path in sorted(group.rglob("*.fits")):
+        stat = path.stat()
+        files.append(
+            {
+                "source": str(path),
+                "group": Path("M31"),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        )
+    return {"path": group, "relative_path": Path("M31")}, files
+
+
+def _results():
+    return {key: index for index, key in enumerate(plan.ANALYSIS_KEYS)}
+
+
+class TestGroupEntries:
+    """Tests for group_entries and fingerprint functions."""
+
+    def test_relative_sorted_entries(self, tmp_path):
+        """Entries are relative to the group, sorted, with "/" separators."""
+        group_plan, files = _group(tmp_path)
+
+        entries = plan.group_entries(group_plan["path"], reversed(files))
+
+        assert [e[0] for e in entries] == ["dark.fits", "lights/light.fits"]
+        assert entries[1][1] == 5
+
+    def test_fingerprint_changes_with_mtime(self, tmp_path):
+        """Touching a file changes the group fingerprint."""
+        group_plan, files = _group(tmp_path)
+        before = plan.fingerprint(plan.group_entries(group_plan["path"], files))
+        files[0]["mtime_ns"] += 1
+
+        after = plan.fingerprint(plan.group_entries(group_plan["path"], files))
+
+        assert before != after
+
+
+class TestPlanRoundTrip:
+    """Tests for build_plan, write_plan, load_plan and plan_groups."""
+
+    def test_round_trip(self, tmp_path):
+        """A written plan loads back with the same groups and counts."""
+        group_plan, files = _group(tmp_path)
+        built = plan.build_plan(
+            tmp_path / "source",
+            tmp_path / "dest",
+            [group_plan],
+            files,
+            [("/src/M33/DATE", ["darks"])],
+            _results(),
+            {"path_pattern": ".*"},
+        )
+        path = tmp_path / "plan.json"
+
+        plan.write_plan(built, str(path))
+        loaded = plan.load_plan(str(path))
+
+        assert loaded["groups"][0]["bytes"] == 9
+        assert loaded["analysis"] == _results()
+        assert loaded["incomplete_dirs"] == [["/src/M33/DATE", ["darks"]]]
+        groups = plan.plan_groups(loaded)
+        assert groups[0]["path"] == group_plan["path"]
+        assert groups[0]["relative_path"] == Path("M31")
+        assert groups[0]["fingerprint"] == built["groups"][0]["fingerprint"]
+        assert not (tmp_path / "plan.json.tmp").exists()
+
+    def test_edited_file_list_rejected(self, tmp_path):
+        """A file list that no longer matches its fingerprint is refused."""
+        group_plan, files = _group(tmp_path)
+        built = plan.build_plan(
+            tmp_path, tmp_path, [group_plan], files, [], _results(), {}
+        )
+        built["groups"][0]["files"].pop()
+        path = tmp_path / "plan.json"
+        plan.write_plan(built, str(path))
+
+        with pytest.raises(ValueError, match="corrupt"):
+            plan.load_plan(str(path))
+
+    def test_unknown_version_rejected(self, tmp_path):
+        """Files that are not plans of this version are refused."""
+        path = tmp_path / "plan.json"
+        path.write_text(json.dumps({"version": 999, "groups": []}))
+
+        with pytest.raises(ValueError, match="Unsupported"):
+            plan.load_plan(str(path))
+
+    @pytest.mark.parametrize(
+        "edit, key",
+        [
+            (lambda p: p.pop("groups"), "groups is missing"),
+            (lambda p: p.update(groups={}), "groups is not list"),
+            (lambda p: p["analysis"].pop("dir_count"), "analysis.dir_count"),
+            (lambda p: p["groups"][0].pop("files"), r"groups\[0\]\.files"),
+            (
+                lambda p: p["groups"][0]["files"][0].pop(),
+                r"groups\[0\]\.files\[0\]",
+            ),
+            (lambda p: p["groups"][0].update(fingerprint=None), "fingerprint"),
+            (lambda p: p["incomplete_dirs"].append("M33"), r"incomplete_dirs\[1\]"),
+        ],
+    )
+    def test_malformed_plan_rejected(self, tmp_path, edit, key):
+        """Hand-edited or truncated plans are refused, naming the key at fault."""
+        group_plan, files = _group(tmp_path)
+        built = plan.build_plan(
+            tmp_path,
+            tmp_path,
+            [group_plan],
+            files,
+            [("/src/M33", ["darks"])],
+            _results(),
+            {},
+        )
+        edit(built)
+        path = tmp_path / "plan.json"
+        plan.write_plan(built, str(path))
+
+        with pytest.raises(ValueError, match=key):
+            plan.load_plan(str(path))
+
+    def test_truncated_plan_rejected(self, tmp_path):
+        """A plan cut short mid-write is refused as invalid JSON."""
+        group_plan, files = _group(tmp_path)
+        built = plan.build_plan(
+            tmp_path, tmp_path, [group_plan], files, [], _results(), {}
+        )
+        path = tmp_path / "plan.json"
+        plan.write_plan(built, str(path))
+        path.write_text(path.read_text()[:50])
+
+        with pytest.raises(ValueError):
+            plan.load_plan(str(path))
@@ -0,0 +1,93 @@
+"""
+Tests for profiling module.
+"""
+
+import pstats
+
+import pytest
+
+from ap_move_light_to_data import profiling
+
+
+def busy(n):
+    """Function with measurable own time."""
+    return sum(i * i for i in range(n))
+
+
+class TestProfiled:
+    """Tests for profiled context manager."""
+
+    def test_disabled_without_path(self, tmp_path):
+        """No path means no profiler and no file."""
+        with profiling.profiled(None) as profiler:
+            busy(10)
+
+        assert profiler is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_writes_stats_file(self, tmp_path):
+        """The stats file can be read back with pstats."""
+        path = tmp_path / "run.prof"
+
+        with profiling.profiled(str(path)) as profiler:
+            busy(1000)
+
+        assert profiler is not None
+        names = {func[2] for func in pstats.Stats(str(path)).stats}
+        assert "busy" in names
+
+    def test_writes_stats_on_error(self, tmp_path):
+        """A failed run is still profiled."""
+        path = tmp_path / "run.prof"
+
+        with pytest.raises(RuntimeError):
+            with profiling.profiled(str(path)):
+                raise RuntimeError("boom")
+
+        assert path.exists()
+
+    def test_unwritable_stats_file_logged(self, tmp_path, caplog):
+        """A stats file that cannot be written does not fail the run."""
+        path = tmp_path / "missing" / "run.prof"
+
+        with profiling.profiled(str(path)) as profiler:
+            result = busy(10)
+
+        assert result == busy(10)
+        assert not path.exists()
+        assert "Failed to write profile stats" in caplog.text
+        profiling.print_hotspots(profiler, str(path), limit=1)
+
+
+class TestHotspots:
+    """Tests for hotspots and print_hotspots."""
+
+    def test_sorted_by_own_time_and_limited(self, tmp_path):
+        """Rows are largest own time first, at most limit of them."""
+        with profiling.profiled(str(tmp_path / "run.prof")) as profiler:
+            for _ in range(5):
+                busy(20000)
+
+        rows = profiling.hotspots(profiler, limit=3)
+        every_row = profiling.hotspots(profiler, limit=1000)
+
+        assert len(rows) == 3
+        assert rows == every_row[:3]
+        own = [row.own_seconds for row in every_row]
+        assert own == sorted(own, reverse=True)
+        busy_row = next(row for row in every_row if "(busy)" in row.function)
+        assert busy_row.function.startswith("test_profiling.py:")
+        assert busy_row.calls == 5
+
+    def test_print_hotspots(self, tmp_path, capsys):
+        """The table names the stats file and lists functions."""
+        path = str(tmp_path / "run.prof")
+        with profiling.profiled(path) as profiler:
+            busy(1000)
+
+        profiling.print_hotspots(profiler, path, limit=2)
+
+        lines = capsys.readouterr().out.splitlines()
+        assert path in lines[0]
+        assert lines[1].split() == ["own", "total", "calls", "function"]
+        assert len(lines) == 4
@@ -0,0 +1,126 @@
+"""
+Tests for progress module.
+"""
+
+import io
+
+from ap_move_light_to_data import progress
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TtyStream(io.StringIO):
+    """StringIO that claims to be a terminal."""
+
+    def isatty(self):
+        return True
+
+
+class TestByteProgress:
+    """Tests for ByteProgress class."""
+
+    def test_rate_and_eta(self):
+        """Rate is bytes over elapsed time; ETA covers the remaining bytes."""
+        clock = FakeClock()
+        bar = progress.ByteProgress(1000, stream=io.StringIO(), clock=clock)
+
+        clock.now = 2.0
+        bar.update(200)
+
+        assert bar.rate() == 100.0
+        assert bar.eta() == 8.0
+
+    def test_rate_uses_recent_window(self):
+        """Old samples fall out of the window so a slowdown shows quickly."""
+        clock = FakeClock()
+        bar = progress.ByteProgress(
+            10_000, stream=io.StringIO(), window_seconds=10.0, clock=clock
+        )
+
+        for second in range(1, 11):
+            clock.now = float(second)
+            bar.update(1000)
+        for second in range(11, 31):
+            clock.now = float(second)
+            bar.update(10)
+
+        assert bar.rate() < 20.0
+
+    def test_eta_unknown_before_any_bytes(self):
+        """No rate means no ETA."""
+        bar = progress.ByteProgress(1000, stream=io.StringIO(), clock=FakeClock())
+
+        assert bar.eta() is None
+        assert "ETA --" in bar.format_line()
+
+    def test_skip_advances_completion_not_rate(self):
+        """Skipped bytes count towards completion but not throughput."""
+        clock = FakeClock()
+        bar = progress.ByteProgress(1000, stream=io.StringIO(), clock=clock)
+
+        bar.skip(500)
+        clock.now = 1.0
+
+        assert bar.done_bytes == 500
+        assert bar.copied_bytes == 0
+        assert bar.rate() == 0.0
+        assert " 50.0%" in bar.format_line()
+
+    def test_redraws_on_terminal_at_refresh_interval(self):
+        """A terminal gets in-place redraws, limited by the refresh interval."""
+        clock = FakeClock()
+        stream = TtyStream()
+        bar = progress.ByteProgress(
+            1000, stream=stream, refresh_seconds=1.0, clock=clock
+        )
+
+        for step in range(10):
+            clock.now = step * 0.25
+            bar.update(10)
+
+        assert stream.getvalue().count("\r") == 3
+
+    def test_non_terminal_gets_final_line_only(self):
+        """Logs and pipes receive one summary line, not redraws."""
+        clock = FakeClock()
+        stream = io.StringIO()
+        bar = progress.ByteProgress(100, stream=stream, clock=clock)
+
+        clock.now = 1.0
+        bar.update(100)
+        bar.close()
+
+        assert stream.getvalue().count("\n") == 1
+        assert "100.0%" in stream.getvalue()
+        assert "\r" not in stream.getvalue()
+
+    def test_close_reports_throughput(self):
+        """Closing returns bytes copied, elapsed time and average rate."""
+        clock = FakeClock()
+        bar = progress.ByteProgress(
+            1000, enabled=False, stream=io.StringIO(), clock=clock
+        )
+
+        clock.now = 4.0
+        bar.update(1000)
+        stats = bar.close()
+
+        assert stats == {"bytes": 1000, "seconds": 4.0, "bytes_per_sec": 250.0}
+
+    def test_disabled_writes_nothing(self):
+        """Quiet runs produce no progress output."""
+        stream = TtyStream()
+        bar = progress.ByteProgress(100, enabled=False, stream=stream)
+
+        bar.update(100)
+        bar.close()
+
+        assert stream.getvalue() == ""
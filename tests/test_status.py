@@ -0,0 +1,78 @@
+"""
+Tests for status module.
+"""
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from ap_move_light_to_data import status
+
+
+class TestIntern:
+    """Tests for intern_paths function."""
+
+    def test_equal_paths_share_one_object(self):
+        """Equal path strings built separately end up as one object."""
+        first = status.intern_paths(["/data/M31/" + "dark.fits"])
+        second = status.intern_paths(["".join(["/data/M31/", "dark.fits"])])
+
+        assert next(iter(first)) is next(iter(second))
+        assert isinstance(first, frozenset)
+
+
+class TestCalibrationStatus:
+    """Tests for CalibrationStatus class."""
+
+    def test_complete_when_nothing_missing(self):
+        """Completeness is derived from the missing types."""
+        assert status.CalibrationStatus().is_complete is True
+        assert status.CalibrationStatus(missing=("darks",)).is_complete is False
+
+    def test_dict_style_access(self):
+        """Old dict reads keep working during the transition."""
+        cal = status.CalibrationStatus(
+            has_darks=True, matched_darks=("/d.fits",), missing=("flats",)
+        )
+
+        assert cal["has_darks"] is True
+        assert cal["matched_darks"] == ("/d.fits",)
+        assert cal["is_complete"] is False
+        assert "missing" in cal
+        assert cal.get("nope", 1) == 1
+        with pytest.raises(KeyError):
+            cal["nope"]
+
+    def test_slotted_and_frozen(self):
+        """Instances carry no __dict__ and cannot be modified."""
+        cal = status.CalibrationStatus()
+
+        assert not hasattr(cal, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            cal.has_darks = True  # type: ignore[misc]
+
+
+class TestGroupStatus:
+    """Tests for GroupStatus class."""
+
+    def test_can_move_requires_complete_and_self_contained(self):
+        """can_move is only true when both conditions hold."""
+        assert status.GroupStatus(is_complete=True).can_move is False
+        assert (
+            status.GroupStatus(is_complete=True, is_self_contained=True).can_move
+            is True
+        )
+        assert status.GroupStatus()["can_move"] is False
+
+
+class TestMovableGroup:
+    """Tests for MovableGroup class."""
+
+    def test_fields_and_compat(self):
+        """Groups read like the old group_plan dicts."""
+        group = status.MovableGroup(path=Path("/src/M31"), relative_path=Path("M31"))
+
+        assert group["path"] == Path("/src/M31")
+        assert group.get("fingerprint") is None
+        assert group.keys() == ("path", "relative_path", "fingerprint")
@@ -0,0 +1,83 @@
+"""
+Tests for timing module.
+"""
+
+import pytest
+
+from ap_move_light_to_data.timing import PhaseTimer
+from ap_move_light_to_data.tracing import Tracer
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPhaseTimer:
+    """Tests for PhaseTimer class."""
+
+    def test_phases_accumulate(self):
+        """Repeated phases add up."""
+        clock = FakeClock()
+        timer = PhaseTimer(clock=clock)
+
+        for _ in range(3):
+            with timer.phase("move.copy"):
+                clock.now += 2.0
+
+        assert timer.as_dict() == {"move.copy": 6.0}
+
+    def test_phases_ordered_by_start(self):
+        """A phase is listed before the sub-phases that finish inside it."""
+        clock = FakeClock()
+        timer = PhaseTimer(clock=clock)
+
+        with timer.phase("move"):
+            with timer.phase("move.copy"):
+                clock.now += 1.0
+            clock.now += 0.5
+        timer.add("report", 0.25)
+
+        assert timer.as_dict() == {"move": 1.5, "move.copy": 1.0, "report": 0.25}
+
+    def test_failed_phase_still_recorded(self):
+        """Time spent before an exception counts."""
+        clock = FakeClock()
+        timer = PhaseTimer(clock=clock)
+
+        with pytest.raises(OSError):
+            with timer.phase("load"):
+                clock.now += 4.0
+                raise OSError("disk gone")
+
+        assert timer.as_dict() == {"load": 4.0}
+
+    def test_phases_traced(self):
+        """With a tracer, phases and spans become trace events."""
+        tracer = Tracer()
+        timer = PhaseTimer(tracer=tracer)
+
+        with timer.phase("move"):
+            with timer.span("copy", category="file", path="a.fits"):
+                pass
+
+        events = [event for event in tracer.events() if event["ph"] == "X"]
+        assert [(e["name"], e["cat"]) for e in events] == [
+            ("copy", "file"),
+            ("move", "phase"),
+        ]
+        assert list(timer.as_dict()) == ["move"]
+
+    def test_span_without_tracer(self):
+        """Spans are no-ops and are not totalled without a tracer."""
+        timer = PhaseTimer()
+
+        with timer.span("copy"):
+            pass
+
+        assert timer.as_dict() == {}
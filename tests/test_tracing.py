@@ -0,0 +1,94 @@
+"""
+Tests for tracing module.
+"""
+
+import json
+import threading
+
+import pytest
+
+from ap_move_light_to_data.tracing import Tracer
+
+
+class FakeClock:
+    """Nanosecond clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def spans(tracer):
+    """Complete events only (no metadata)."""
+    return [event for event in tracer.events() if event["ph"] == "X"]
+
+
+class TestTracer:
+    """Tests for Tracer class."""
+
+    def test_span_records_complete_event(self):
+        """Spans have microsecond start and duration and their args."""
+        clock = FakeClock()
+        tracer = Tracer(clock=clock)
+
+        clock.now = 2_000
+        with tracer.span("copy", category="file", path="a.fits"):
+            clock.now = 7_000
+
+        (event,) = spans(tracer)
+        assert event["name"] == "copy"
+        assert event["cat"] == "file"
+        assert event["ts"] == 2.0
+        assert event["dur"] == 5.0
+        assert event["args"] == {"path": "a.fits"}
+
+    def test_span_recorded_on_error(self):
+        """A span that raises is still recorded."""
+        tracer = Tracer(clock=FakeClock())
+
+        with pytest.raises(OSError):
+            with tracer.span("unlink"):
+                raise OSError("busy")
+
+        assert [event["name"] for event in spans(tracer)] == ["unlink"]
+
+    def test_threads_named_once(self):
+        """Each thread gets its own id and one thread_name event."""
+        tracer = Tracer(clock=FakeClock())
+
+        def work():
+            for _ in range(2):
+                with tracer.span("unlink"):
+                    pass
+
+        worker = threading.Thread(target=work, name="deleter")
+        worker.start()
+        worker.join()
+        with tracer.span("check"):
+            pass
+
+        names = {
+            event["tid"]: event["args"]["name"]
+            for event in tracer.events()
+            if event["name"] == "thread_name"
+        }
+        assert sorted(names.values()) == ["MainThread", "deleter"]
+        tids = {event["name"]: event["tid"] for event in spans(tracer)}
+        assert names[tids["unlink"]] == "deleter"
+        assert names[tids["check"]] == "MainThread"
+
+    def test_write(self, tmp_path):
+        """The trace is a JSON object with traceEvents and no temp file left."""
+        tracer = Tracer(clock=FakeClock())
+        with tracer.span("load", category="phase"):
+            pass
+        path = tmp_path / "trace.json"
+
+        tracer.write(str(path))
+
+        trace = json.loads(path.read_text())
+        assert trace["traceEvents"] == tracer.events()
+        assert trace["traceEvents"][0]["name"] == "process_name"
+        assert [p.name for p in tmp_path.iterdir()] == ["trace.json"]
@@ -0,0 +1,508 @@
+"""
+Tests for transfer module.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from ap_move_light_to_data import transfer
+
+
+class TestCopyFile:
+    """Tests for copy_file function."""
+
+    def test_copies_content_and_returns_source_digest(self, tmp_path):
+        """Destination matches source and digest is of the source bytes."""
+        source = tmp_path / "src" / "light.fits"
+        source.parent.mkdir()
+        source.write_bytes(b"x" * 1000)
+        dest = tmp_path / "dest" / "nested" / "light.fits"
+
+        digest = transfer.copy_file(str(source), str(dest), "blake2b")
+
+        assert dest.read_bytes() == source.read_bytes()
+        assert digest == hashlib.blake2b(b"x" * 1000).hexdigest()
+
+    def test_reports_progress_per_chunk(self, tmp_path, mocker):
+        """Progress callback receives each chunk, including within one file."""
+        mocker.patch.object(transfer.config, "COPY_CHUNK_SIZE", 400)
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"x" * 1000)
+        chunks = []
+
+        transfer.copy_file(
+            str(source), str(tmp_path / "out.fits"), progress=chunks.append
+        )
+
+        assert chunks == [400, 400, 200]
+
+    def test_preserves_mtime(self, tmp_path):
+        """Destination keeps the source modification time."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"data")
+        dest = tmp_path / "out" / "light.fits"
+
+        transfer.copy_file(str(source), str(dest))
+
+        assert dest.stat().st_mtime == source.stat().st_mtime
+
+    def test_returns_none_without_algorithm(self, tmp_path):
+        """No digest is computed unless an algorithm is requested."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"data")
+        dest = tmp_path / "out" / "light.fits"
+
+        assert transfer.copy_file(str(source), str(dest)) is None
+        assert dest.read_bytes() == b"data"
+
+    def test_hashes_across_chunks(self, tmp_path, mocker):
+        """Files larger than one chunk are hashed completely."""
+        mocker.patch.object(transfer.config, "COPY_CHUNK_SIZE", 7)
+        payload = bytes(range(256)) * 3
+        source = tmp_path / "light.fits"
+        source.write_bytes(payload)
+        dest = tmp_path / "out" / "light.fits"
+
+        digest = transfer.copy_file(str(source), str(dest), "blake2b")
+
+        assert dest.read_bytes() == payload
+        assert digest == hashlib.blake2b(payload).hexdigest()
+
+    def test_sync_flushes_without_hashing(self, tmp_path, mocker):
+        """sync=True flushes the destination even when not hashing."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"data")
+        fsync_spy = mocker.spy(transfer.os, "fsync")
+
+        transfer.copy_file(str(source), str(tmp_path / "out.fits"), sync=True)
+
+        assert fsync_spy.call_count == 1
+
+    def test_mirrors_written_from_one_read(self, tmp_path, mocker):
+        """Every mirror receives the content; the source is read only once."""
+        mocker.patch.object(transfer.config, "COPY_CHUNK_SIZE", 7)
+        payload = bytes(range(256)) * 3
+        source = tmp_path / "light.fits"
+        source.write_bytes(payload)
+        dest = tmp_path / "data" / "light.fits"
+        mirrors = [tmp_path / "backup1" / "light.fits", tmp_path / "b2" / "l.fits"]
+        opened = mocker.patch.object(transfer, "open", wraps=open, create=True)
+
+        transfer.copy_file(str(source), str(dest), mirrors=[str(m) for m in mirrors])
+
+        for path in [dest, *mirrors]:
+            assert path.read_bytes() == payload
+            assert path.stat().st_mtime == source.stat().st_mtime
+        reads = [c for c in opened.call_args_list if c.args[1] == "rb"]
+        assert len(reads) == 1
+
+    def test_mirror_progress_counts_source_bytes(self, tmp_path):
+        """Progress reflects bytes read, not bytes times destinations."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"x" * 100)
+        chunks = []
+
+        transfer.copy_file(
+            str(source),
+            str(tmp_path / "a" / "light.fits"),
+            progress=chunks.append,
+            mirrors=[str(tmp_path / "b" / "light.fits")],
+        )
+
+        assert sum(chunks) == 100
+
+    def test_shared_mirror_writer(self, tmp_path, mocker):
+        """A caller's mirror-writer pool is used instead of a per-file one."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+        per_file_pool = mocker.spy(transfer, "ThreadPoolExecutor")
+
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for name in ("a", "b"):
+                transfer.copy_file(
+                    str(source),
+                    str(tmp_path / name / "dest.fits"),
+                    mirrors=[str(tmp_path / name / "mirror.fits")],
+                    mirror_writer=writer,
+                )
+
+        per_file_pool.assert_not_called()
+        assert (tmp_path / "b" / "mirror.fits").read_bytes() == b"frame"
+
+
+class TestHashFile:
+    """Tests for hash_file function."""
+
+    def test_matches_hashlib(self, tmp_path):
+        """Digest matches hashlib over the whole file."""
+        path = tmp_path / "file.fits"
+        path.write_bytes(b"abc" * 100)
+
+        assert transfer.hash_file(str(path)) == (
+            hashlib.blake2b(b"abc" * 100).hexdigest()
+        )
+
+    def test_empty_file(self, tmp_path):
+        """Empty file hashes to the empty digest."""
+        path = tmp_path / "empty.fits"
+        path.touch()
+
+        assert transfer.hash_file(str(path)) == hashlib.blake2b(b"").hexdigest()
+
+
+class TestCopyFileVerified:
+    """Tests for copy_file_verified function."""
+
+    def test_verified_copy(self, tmp_path):
+        """Matching read-back returns the digest."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+        dest = tmp_path / "out" / "light.fits"
+
+        digest = transfer.copy_file_verified(str(source), str(dest))
+
+        assert digest == hashlib.blake2b(b"frame").hexdigest()
+
+    def test_mismatch_raises(self, tmp_path, mocker):
+        """Read-back mismatch raises OSError."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+        dest = tmp_path / "out" / "light.fits"
+        mocker.patch.object(transfer, "hash_file", return_value="corrupt")
+
+        with pytest.raises(OSError, match="Checksum mismatch"):
+            transfer.copy_file_verified(str(source), str(dest))
+
+    def test_mirror_mismatch_raises(self, tmp_path, mocker):
+        """A bad read-back on any mirror fails the whole copy."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+        good = hashlib.blake2b(b"frame").hexdigest()
+        mocker.patch.object(transfer, "hash_file", side_effect=[good, "corrupt"])
+
+        with pytest.raises(OSError, match="backup"):
+            transfer.copy_file_verified(
+                str(source),
+                str(tmp_path / "data" / "light.fits"),
+                mirrors=[str(tmp_path / "backup" / "light.fits")],
+            )
+
+
+class TestIsIdentical:
+    """Tests for is_identical function."""
+
+    def _copy(self, tmp_path, payload=b"frame"):
+        source = tmp_path / "light.fits"
+        source.write_bytes(payload)
+        dest = tmp_path / "out" / "light.fits"
+        transfer.copy_file(str(source), str(dest))
+        return source, dest
+
+    def test_missing_destination(self, tmp_path):
+        """Missing destination is never identical."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+
+        assert not transfer.is_identical(str(source), str(tmp_path / "nope.fits"))
+
+    def test_same_size_and_mtime(self, tmp_path):
+        """Copied file with preserved mtime is identical."""
+        source, dest = self._copy(tmp_path)
+
+        assert transfer.is_identical(str(source), str(dest))
+
+    def test_different_size(self, tmp_path):
+        """Size mismatch is not identical."""
+        source, dest = self._copy(tmp_path)
+        dest.write_bytes(b"truncated frame")
+
+        assert not transfer.is_identical(str(source), str(dest))
+
+    def test_different_mtime(self, tmp_path):
+        """Modification time outside the window is not identical."""
+        source, dest = self._copy(tmp_path)
+        stat = source.stat()
+        os.utime(dest, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 * 10**9))
+
+        assert not transfer.is_identical(str(source), str(dest))
+
+    def test_hash_mismatch(self, tmp_path):
+        """Same size and mtime but different content fails a hash comparison."""
+        source, dest = self._copy(tmp_path)
+        stat = source.stat()
+        dest.write_bytes(b"FRAME")
+        os.utime(dest, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert transfer.is_identical(str(source), str(dest))
+        assert not transfer.is_identical(str(source), str(dest), "blake2b")
+
+    def test_known_source_stat_skips_stat(self, tmp_path, mocker):
+        """Source size and mtime passed in are used instead of a new stat."""
+        source, dest = self._copy(tmp_path)
+        stat = source.stat()
+        stat_spy = mocker.spy(transfer.os, "stat")
+
+        assert transfer.is_identical(
+            str(source),
+            str(dest),
+            source_size=stat.st_size,
+            source_mtime_ns=stat.st_mtime_ns,
+        )
+        assert [c.args[0] for c in stat_spy.call_args_list] == [str(dest)]
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket class."""
+
+    def test_rejects_non_positive_rate(self):
+        """Rate must be positive."""
+        with pytest.raises(ValueError):
+            transfer.TokenBucket(0)
+
+    def test_no_wait_within_capacity(self, mocker):
+        """Consuming within the available tokens does not sleep."""
+        sleep = mocker.patch.object(transfer.time, "sleep")
+        bucket = transfer.TokenBucket(rate=100)
+
+        assert bucket.consume(100) == 0.0
+        sleep.assert_not_called()
+
+    def test_debt_waits_for_refill(self, mocker):
+        """Consuming beyond capacity sleeps until the debt is repaid."""
+        mocker.patch.object(transfer.time, "monotonic", return_value=50.0)
+        sleep = mocker.patch.object(transfer.time, "sleep")
+        bucket = transfer.TokenBucket(rate=100)
+
+        wait = bucket.consume(250)
+
+        assert wait == pytest.approx(1.5)
+        sleep.assert_called_once_with(pytest.approx(1.5))
+
+    def test_refills_over_time(self, mocker):
+        """Tokens refill at the configured rate."""
+        clock = mocker.patch.object(transfer.time, "monotonic", return_value=0.0)
+        mocker.patch.object(transfer.time, "sleep")
+        bucket = transfer.TokenBucket(rate=100)
+        bucket.consume(100)
+
+        clock.return_value = 0.5
+
+        assert bucket.consume(50) == 0.0
+
+
+class TestThrottle:
+    """Tests for Throttle class."""
+
+    def test_unlimited_by_default(self):
+        """No limits means no buckets."""
+        throttle = transfer.Throttle()
+
+        assert throttle.bytes is None
+        assert throttle.ops is None
+        throttle.acquire(10**9)
+
+    def test_acquire_consumes_bytes_and_ops(self, mocker):
+        """Acquire takes from both buckets."""
+        throttle = transfer.Throttle(max_bytes_per_sec=1000, max_iops=10)
+        bytes_consume = mocker.patch.object(throttle.bytes, "consume")
+        ops_consume = mocker.patch.object(throttle.ops, "consume")
+
+        throttle.acquire(512, ops=2)
+
+        bytes_consume.assert_called_once_with(512)
+        ops_consume.assert_called_once_with(2)
+
+    def test_copy_file_acquires_per_chunk(self, tmp_path, mocker):
+        """Each chunk copied is charged against the throttle."""
+        mocker.patch.object(transfer.config, "COPY_CHUNK_SIZE", 4)
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"0123456789")
+        throttle = mocker.Mock()
+
+        transfer.copy_file(str(source), str(tmp_path / "out.fits"), throttle=throttle)
+
+        assert [c.args[0] for c in throttle.acquire.call_args_list] == [4, 4, 2]
+
+
+class TestSetIoPriority:
+    """Tests for set_io_priority function."""
+
+    def test_unsupported_platform(self, mocker):
+        """Non-Linux platforms report the priority was not applied."""
+        mocker.patch.object(transfer.platform, "system", return_value="Windows")
+
+        assert transfer.set_io_priority("idle") is False
+
+    def test_linux_syscall(self, mocker):
+        """On Linux the ioprio_set syscall is issued for this process."""
+        mocker.patch.object(transfer.platform, "system", return_value="Linux")
+        mocker.patch.object(transfer.platform, "machine", return_value="x86_64")
+        libc = mocker.Mock()
+        libc.syscall.return_value = 0
+        mocker.patch.object(transfer.ctypes, "CDLL", return_value=libc)
+
+        assert transfer.set_io_priority("idle") is True
+        libc.syscall.assert_called_once_with(251, 1, 0, 3 << 13)
+
+
+class TestCreateDirectories:
+    """Tests for create_directories function."""
+
+    def test_creates_nested_directories(self, tmp_path):
+        """All requested directories exist afterwards."""
+        dirs = [
+            str(tmp_path / "a" / "b" / "c"),
+            str(tmp_path / "a" / "b"),
+            str(tmp_path / "a" / "d"),
+        ]
+
+        created = transfer.create_directories(dirs + dirs)
+
+        assert created == 3  # a/b via makedirs, then a/b/c and a/d via mkdir
+        assert all(Path(d).is_dir() for d in dirs)
+
+    def test_children_use_single_mkdir(self, tmp_path, mocker):
+        """Only the first directory of a branch walks its ancestors."""
+        (tmp_path / "dest").mkdir()
+        makedirs = mocker.spy(transfer.os, "makedirs")
+        mkdir = mocker.spy(transfer.os, "mkdir")
+        root = tmp_path / "dest" / "M31"
+        dirs = [str(root)] + [str(root / f"FILTER_{i}" / "lights") for i in range(5)]
+
+        transfer.create_directories(dirs)
+
+        assert makedirs.call_count == 1
+        assert mkdir.call_count == 11  # 10 direct + 1 inside os.makedirs
+        assert (root / "FILTER_4" / "lights").is_dir()
+
+    def test_existing_directories_not_counted(self, tmp_path):
+        """Directories that already exist are not reported as created."""
+        (tmp_path / "exists").mkdir()
+
+        assert transfer.create_directories([str(tmp_path / "exists")]) == 0
+
+    def test_failure_does_not_stop_batch(self, tmp_path):
+        """A directory that cannot be created is skipped."""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("not a directory")
+        dirs = [str(blocker / "child"), str(tmp_path / "ok")]
+
+        created = transfer.create_directories(dirs)
+
+        assert created == 1
+        assert (tmp_path / "ok").is_dir()
+
+    def test_copy_without_parents_requires_directory(self, tmp_path):
+        """copy_file with make_parents=False does not create directories."""
+        source = tmp_path / "light.fits"
+        source.write_bytes(b"frame")
+
+        with pytest.raises(FileNotFoundError):
+            transfer.copy_file(
+                str(source), str(tmp_path / "missing" / "out.fits"), make_parents=False
+            )
+
+
+class TestPublishDirectory:
+    """Tests for publish_directory function."""
+
+    def test_renames_after_flushing(self, tmp_path, mocker):
+        """Staging tree is flushed, renamed, and the parent flushed."""
+        staging = tmp_path / ".group.ap-staging"
+        (staging / "sub").mkdir(parents=True)
+        (staging / "sub" / "light.fits").write_bytes(b"frame")
+        fsync_spy = mocker.spy(transfer, "fsync_directory")
+
+        transfer.publish_directory(str(staging), str(tmp_path / "group"))
+
+        assert (tmp_path / "group" / "sub" / "light.fits").read_bytes() == b"frame"
+        assert not staging.exists()
+        flushed = [c.args[0] for c in fsync_spy.call_args_list]
+        assert flushed == [str(staging / "sub"), str(staging), str(tmp_path)]
+
+    def test_refuses_existing_final(self, tmp_path):
+        """An existing final directory is never replaced."""
+        staging = tmp_path / ".group.ap-staging"
+        staging.mkdir()
+        (tmp_path / "group").mkdir()
+
+        with pytest.raises(FileExistsError):
+            transfer.publish_directory(str(staging), str(tmp_path / "group"))
+
+        assert staging.exists()
+
+
+class TestRemoveTree:
+    """Tests for remove_tree function."""
+
+    def test_removes_nested_tree(self, tmp_path):
+        """Files and directories are removed bottom-up."""
+        tree = tmp_path / "tree"
+        (tree / "a" / "b").mkdir(parents=True)
+        (tree / "root.fits").write_bytes(b"1")
+        (tree / "a" / "mid.fits").write_bytes(b"2")
+        (tree / "a" / "b" / "leaf.fits").write_bytes(b"3")
+
+        removed = transfer.remove_tree(str(tree), workers=4)
+
+        assert removed == 3
+        assert not tree.exists()
+
+    def test_does_not_follow_symlinks(self, tmp_path):
+        """Symlinked directories are unlinked, not descended into."""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "keep.fits").write_bytes(b"keep")
+        tree = tmp_path / "tree"
+        tree.mkdir()
+        (tree / "link").symlink_to(outside, target_is_directory=True)
+
+        transfer.remove_tree(str(tree))
+
+        assert not tree.exists()
+        assert (outside / "keep.fits").exists()
+
+    def test_custom_unlink(self, tmp_path):
+        """Files are removed through the given unlink function."""
+        tree = tmp_path / "tree"
+        (tree / "a").mkdir(parents=True)
+        (tree / "a" / "one.fits").write_bytes(b"1")
+        (tree / "two.fits").write_bytes(b"2")
+        unlinked = []
+
+        def recording_unlink(path):
+            unlinked.append(path)
+            transfer.os.unlink(path)
+
+        transfer.remove_tree(str(tree), workers=2, unlink=recording_unlink)
+
+        assert sorted(unlinked) == [
+            str(tree / "a" / "one.fits"),
+            str(tree / "two.fits"),
+        ]
+        assert not tree.exists()
+
+    def test_unlink_failure_raises_and_keeps_directories(self, tmp_path, mocker):
+        """Failed unlinks are reported and directories are left in place."""
+        tree = tmp_path / "tree"
+        tree.mkdir()
+        (tree / "a.fits").write_bytes(b"a")
+        (tree / "b.fits").write_bytes(b"b")
+        real_unlink = transfer.os.unlink
+
+        def flaky_unlink(path):
+            if path.endswith("a.fits"):
+                raise PermissionError("denied")
+            real_unlink(path)
+
+        mocker.patch.object(transfer.os, "unlink", side_effect=flaky_unlink)
+
+        with pytest.raises(OSError, match="Failed to remove 1 entries"):
+            transfer.remove_tree(str(tree))
+
+        assert (tree / "a.fits").exists()
+        assert not (tree / "b.fits").exists()